@@ -1,10 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Optional
-from workflows.research_graph import build_research_graph
-from db.session import get_db
+from workflows.research_graph import get_research_graph, research_config, research_inputs, run_research
+from core.resilience import dependency_stats
+from services.retriever import get_corpus, get_retrieval_cache
+from services.summarizer import get_llm_cache
+from services.jobs import JobQueueFull, ResearchJob, UserJobLimitExceeded, job_queue
+from db.session import SessionLocal, get_db
 from db import models
+import asyncio
+import json
 import logging
+from contextlib import contextmanager
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -18,34 +27,73 @@ class ChatResponse(BaseModel):
     result: str
     status: str = "success"
     message: Optional[str] = None
+    metadata: Optional[dict] = None
+
+class JobResponse(BaseModel):
+    job_id: str
+    session_id: int
+    status: str
+    result: Optional[ChatResponse] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+@router.get("/chat/cache-stats")
+def cache_stats():
+    corpus = get_corpus()
+    return {
+        "retrieval": get_retrieval_cache().stats(),
+        "llm": get_llm_cache().stats(),
+        "jobs": job_queue.stats(),
+        "corpus": corpus.stats() if corpus is not None else None,
+        "dependencies": dependency_stats(),
+    }
+
+def _response_metadata(state: dict) -> dict:
+    metadata = {"retrieval_timings": state.get("retrieval_timings") or {}}
+    if state.get("context_stats"):
+        metadata["context"] = state["context_stats"]
+    if state.get("reused_from"):
+        metadata["reused_from"] = state["reused_from"]
+    return metadata
+
+def _start_session(db, user_id: int, query: str) -> models.ResearchSession:
+    """Get or create the user and open a research session (blocking DB work)."""
+    user = db.query(models.User).filter(models.User.id == user_id).first()
+    if not user:
+        user = models.User(
+            id=user_id,
+            name=f"User {user_id}",
+            email=f"user{user_id}@example.com"
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+
+    session = models.ResearchSession(user_id=user_id, query=query)
+    db.add(session)
+    db.commit()
+    db.refresh(session)
+    return session
+
+def _record_error(db, session_id: int, error: str):
+    error_msg = models.Message(
+        session_id=session_id,
+        content=f"Error: {error}",
+        role="system"
+    )
+    db.add(error_msg)
+    db.commit()
 
 @router.post("/chat", response_model=ChatResponse)
-def chat(request: ChatRequest, db=Depends(get_db)):
+async def chat(request: ChatRequest, db=Depends(get_db)):
     try:
-        # Get or create user
-        user = db.query(models.User).filter(models.User.id == request.user_id).first()
-        if not user:
-            user = models.User(
-                id=request.user_id,
-                name=f"User {request.user_id}",
-                email=f"user{request.user_id}@example.com"
-            )
-            db.add(user)
-            db.commit()
-            db.refresh(user)
-
-        # Create research session
-        session = models.ResearchSession(user_id=request.user_id, query=request.query)
-        db.add(session)
-        db.commit()
-        db.refresh(session)
+        session = await run_in_threadpool(_start_session, db, request.user_id, request.query)
 
-        # Build and execute research graph
-        graph, initial_state = build_research_graph(db, request.user_id, request.query)
-        initial_state["session_id"] = session.id
-        
-        result = graph.invoke(initial_state)
-        summary = result.get("summary", "")
+        # Execute the shared research graph
+        result = await run_research(request.query, request.user_id, session.id)
+        summary = result.get("summary") or ""
         
         if not summary:
             logger.warning(f"No summary generated for session {session.id}")
@@ -55,7 +103,8 @@ def chat(request: ChatRequest, db=Depends(get_db)):
             session_id=session.id,
             result=summary,
             status="success",
-            message="Research completed successfully"
+            message="Research completed successfully",
+            metadata=_response_metadata(result)
         )
         
     except Exception as e:
@@ -63,13 +112,7 @@ def chat(request: ChatRequest, db=Depends(get_db)):
         # If we have a session, mark it with error
         try:
             if 'session' in locals():
-                error_msg = models.Message(
-                    session_id=session.id,
-                    content=f"Error: {str(e)}",
-                    role="system"
-                )
-                db.add(error_msg)
-                db.commit()
+                await run_in_threadpool(_record_error, db, session.id, str(e))
         except:
             pass
         
@@ -77,3 +120,163 @@ def chat(request: ChatRequest, db=Depends(get_db)):
             status_code=500,
             detail=f"Research processing failed: {str(e)}"
         )
+
+
+@router.post("/chat/sessions/{session_id}/resume", response_model=ChatResponse)
+async def resume_chat(session_id: int, db=Depends(get_db)):
+    """
+    Retry a session's research run. Work finished before a failure or restart
+    is taken from the session's checkpoint rather than redone.
+    """
+    session = await run_in_threadpool(
+        lambda: db.query(models.ResearchSession).filter(models.ResearchSession.id == session_id).first()
+    )
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    try:
+        result = await run_research(session.query, session.user_id, session.id)
+    except Exception as e:
+        logger.error(f"Error resuming session {session_id}: {str(e)}")
+        try:
+            await run_in_threadpool(_record_error, db, session.id, str(e))
+        except Exception:
+            pass
+        raise HTTPException(status_code=500, detail=f"Research processing failed: {str(e)}")
+
+    return ChatResponse(
+        session_id=session.id,
+        result=result.get("summary") or "Research completed but no summary was generated.",
+        status="success",
+        message="Research completed successfully",
+        metadata=_response_metadata(result)
+    )
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest, db=Depends(get_db)):
+    """
+    Streaming variant of /chat as Server-Sent Events.
+
+    Events: ``session`` (session id), ``source`` (one retrieval source
+    finished), ``token`` (a piece of the final summary), ``node`` (a graph
+    node completed), then ``done`` with the same payload as /chat, or ``error``.
+    """
+    try:
+        session = await run_in_threadpool(_start_session, db, request.user_id, request.query)
+    except Exception as e:
+        logger.error(f"Error starting streaming chat: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Research processing failed: {str(e)}")
+
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def emit(event: str, data: dict):
+        await queue.put(_sse(event, data))
+
+    async def run_graph():
+        try:
+            final_state = {}
+            config = research_config(request.user_id, session.id, emit=emit)
+            async for step in get_research_graph().astream(research_inputs(request.query), config=config):
+                for node, update in step.items():
+                    if node == "__end__":
+                        final_state = update
+                        continue
+                    await emit("node", {"node": node, "status": "completed"})
+
+            summary = final_state.get("summary") or "Research completed but no summary was generated."
+            await emit("done", ChatResponse(
+                session_id=session.id,
+                result=summary,
+                status="success",
+                message="Research completed successfully",
+                metadata=_response_metadata(final_state)
+            ).model_dump())
+        except Exception as e:
+            logger.error(f"Error in streaming chat: {str(e)}")
+            try:
+                await run_in_threadpool(_record_error, db, session.id, str(e))
+            except Exception:
+                pass
+            await emit("error", {"detail": f"Research processing failed: {str(e)}"})
+        finally:
+            await queue.put(None)
+
+    async def event_stream():
+        task = asyncio.create_task(run_graph())
+        try:
+            yield _sse("session", {"session_id": session.id})
+            while (item := await queue.get()) is not None:
+                yield item
+        finally:
+            # Client went away before the run finished
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def run_research_job(job: ResearchJob) -> dict:
+    """Job-queue handler: run the graph for a queued job and return a ChatResponse dict."""
+    try:
+        result = await run_research(job.query, job.user_id, job.session_id)
+    except Exception as e:
+        def record():
+            with SessionLocal() as db:
+                _record_error(db, job.session_id, str(e))
+        try:
+            await run_in_threadpool(record)
+        except Exception:
+            pass
+        raise
+
+    return ChatResponse(
+        session_id=job.session_id,
+        result=result.get("summary") or "Research completed but no summary was generated.",
+        status="success",
+        message="Research completed successfully",
+        metadata=_response_metadata(result)
+    ).model_dump()
+
+@contextmanager
+def _job_admission_errors():
+    """Per-user limit -> 429; a full queue is the server's problem -> 503 with Retry-After."""
+    try:
+        yield
+    except UserJobLimitExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+@router.post("/chat/jobs", response_model=JobResponse, status_code=202)
+async def create_chat_job(request: ChatRequest, db=Depends(get_db)):
+    """Queue a research run and return its job id immediately."""
+    if not job_queue.running:
+        raise HTTPException(status_code=503, detail="Job queue is not running")
+    # Check the limits before creating a session that would never run
+    with _job_admission_errors():
+        job_queue.check_admission(request.user_id)
+
+    try:
+        session = await run_in_threadpool(_start_session, db, request.user_id, request.query)
+    except Exception as e:
+        logger.error(f"Error creating research job: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Research processing failed: {str(e)}")
+
+    with _job_admission_errors():
+        job = job_queue.submit(request.user_id, request.query, session.id)
+
+    return JobResponse(**job.to_dict())
+
+@router.get("/chat/jobs/{job_id}", response_model=JobResponse)
+def get_chat_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(**job.to_dict())
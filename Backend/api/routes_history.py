@@ -1,16 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.exc import SQLAlchemyError
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from db.session import get_db
 from db import models
+from datetime import datetime
+import base64
+import json
 import traceback
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
 class MessageModel(BaseModel):
     role: str
     content: str
@@ -22,75 +28,141 @@ class SessionModel(BaseModel):
     created_at: str
     messages: List[MessageModel]
 
+class SessionSummaryModel(BaseModel):
+    session_id: int
+    query: str
+    created_at: str
+    message_count: int = 0
+
+class SessionPage(BaseModel):
+    sessions: List[SessionSummaryModel]
+    next_cursor: Optional[str] = None
+
+class MessagePage(BaseModel):
+    messages: List[MessageModel]
+    next_cursor: Optional[str] = None
+
 @router.get("/health")
 def health_check():
     return {"status": "healthy", "message": "History API is working"}
 
+def _format_ts(value) -> str:
+    if not value:
+        return ""
+    try:
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    except Exception:
+        return str(value)
+
+def _encode_cursor(ts, row_id: int) -> str:
+    raw = json.dumps([ts.isoformat() if ts else None, row_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor: str):
+    try:
+        ts, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        return (datetime.fromisoformat(ts) if ts else None), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _cursor_key(ts_column, id_column, cursor: str):
+    """
+    (timestamp, id) to continue after. The timestamp is read back from the
+    cursor's row when it still exists, so the comparison uses the stored value
+    exactly (SQLite keeps server-default timestamps as text in another format
+    than bound parameters); the decoded timestamp is the fallback.
+    """
+    ts, row_id = _decode_cursor(cursor)
+    stored = select(ts_column).where(id_column == row_id).correlate(None).scalar_subquery()
+    return func.coalesce(stored, ts), row_id
+
+def _ensure_user(db, user_id: int):
+    user = db.query(models.User).filter(models.User.id == user_id).first()
+    if not user:
+        user = models.User(
+            id=user_id,
+            name=f"User {user_id}",
+            email=f"user{user_id}@example.com"
+        )
+        db.add(user)
+        db.commit()
+
+def _session_page(db, user_id: int, limit: int, cursor: Optional[str]):
+    """
+    One page of a user's sessions, newest first, using keyset pagination
+    on (created_at, id) so it is served by ix_research_sessions_user_id_created_at.
+    Returns (rows, next_cursor).
+    """
+    S = models.ResearchSession
+    q = (
+        db.query(S.id, S.query, S.created_at)
+        .filter(S.user_id == user_id)
+        .order_by(S.created_at.desc(), S.id.desc())
+    )
+    if cursor:
+        ts, row_id = _cursor_key(S.created_at, S.id, cursor)
+        q = q.filter(or_(S.created_at < ts, and_(S.created_at == ts, S.id < row_id)))
+
+    rows = q.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+def _message_dict(m) -> dict:
+    return {
+        "role": m.role or "assistant",
+        "content": m.content or "",
+        "timestamp": _format_ts(m.timestamp),
+    }
+
 @router.get("/history/{user_id}", response_model=List[SessionModel])
-def get_history(user_id: int, db=Depends(get_db)):
+def get_history(
+    user_id: int,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_messages: bool = True,
+    db=Depends(get_db),
+):
+    """
+    A page of sessions with their messages, newest first. The cursor for the
+    next page is returned in the X-Next-Cursor header (exposed to browsers via
+    CORS), so the body keeps its original list shape.
+    """
     try:
-        user = db.query(models.User).filter(models.User.id == user_id).first()
-        if not user:
-            user = models.User(
-                id=user_id,
-                name=f"User {user_id}",
-                email=f"user{user_id}@example.com"
+        _ensure_user(db, user_id)
+        rows, next_cursor = _session_page(db, user_id, limit, cursor)
+
+        # One query for the page's messages instead of a joinedload over every session
+        messages_by_session = {row.id: [] for row in rows}
+        if include_messages and rows:
+            M = models.Message
+            messages = (
+                db.query(M.session_id, M.role, M.content, M.timestamp)
+                .filter(M.session_id.in_(messages_by_session.keys()))
+                .order_by(M.session_id, M.timestamp, M.id)
+                .all()
             )
-            db.add(user)
-            db.commit()
-            db.refresh(user)
-
-        sessions = (
-            db.query(models.ResearchSession)
-            .options(joinedload(models.ResearchSession.messages))
-            .filter(models.ResearchSession.user_id == user_id)
-            .order_by(models.ResearchSession.created_at.desc())
-            .all()
-        )
+            for m in messages:
+                messages_by_session[m.session_id].append(_message_dict(m))
 
-        result = []
-        for s in sessions:
-            try:
-                created_at_str = ""
-                if s.created_at:
-                    try:
-                        created_at_str = s.created_at.strftime("%Y-%m-%d %H:%M:%S")
-                    except:
-                        created_at_str = str(s.created_at)
-
-                session_data = {
-                    "session_id": s.id,
-                    "query": s.query or "",
-                    "created_at": created_at_str,
-                    "messages": []
-                }
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
 
-                for m in s.messages:
-                    try:
-                        timestamp_str = ""
-                        if m.timestamp:
-                            try:
-                                timestamp_str = m.timestamp.strftime("%Y-%m-%d %H:%M:%S")
-                            except:
-                                timestamp_str = str(m.timestamp)
-
-                        message_data = {
-                            "role": m.role or "assistant", 
-                            "content": m.content or "", 
-                            "timestamp": timestamp_str
-                        }
-                        session_data["messages"].append(message_data)
-                    except Exception as e:
-                        print(f"Error processing message {m.id}: {e}")
-                        continue
-                
-                result.append(session_data)
-            except Exception as e:
-                print(f"Error processing session {s.id}: {e}")
-                continue
-        
-        return result
-        
+        return [
+            {
+                "session_id": row.id,
+                "query": row.query or "",
+                "created_at": _format_ts(row.created_at),
+                "messages": messages_by_session[row.id],
+            }
+            for row in rows
+        ]
+
+    except HTTPException:
+        raise
     except SQLAlchemyError as e:
         print(f"Database error in get_history: {e}")
         traceback.print_exc()
@@ -99,3 +171,68 @@ def get_history(user_id: int, db=Depends(get_db)):
         print(f"General error in get_history: {e}")
         traceback.print_exc()
         raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/history/{user_id}/sessions", response_model=SessionPage)
+def list_sessions(
+    user_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db=Depends(get_db),
+):
+    """Lightweight session list without message bodies, just their count."""
+    try:
+        rows, next_cursor = _session_page(db, user_id, limit, cursor)
+        counts = {}
+        if rows:
+            M = models.Message
+            counts = dict(
+                db.query(M.session_id, func.count(M.id))
+                .filter(M.session_id.in_([row.id for row in rows]))
+                .group_by(M.session_id)
+                .all()
+            )
+        return {
+            "sessions": [
+                {
+                    "session_id": row.id,
+                    "query": row.query or "",
+                    "created_at": _format_ts(row.created_at),
+                    "message_count": counts.get(row.id, 0),
+                }
+                for row in rows
+            ],
+            "next_cursor": next_cursor,
+        }
+    except SQLAlchemyError:
+        logger.exception("Database error in list_sessions")
+        raise HTTPException(status_code=500, detail="Database error")
+
+@router.get("/sessions/{session_id}/messages", response_model=MessagePage)
+def list_messages(
+    session_id: int,
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db=Depends(get_db),
+):
+    """Messages of one session, oldest first, keyset-paginated on (timestamp, id)."""
+    try:
+        M = models.Message
+        q = (
+            db.query(M.id, M.role, M.content, M.timestamp)
+            .filter(M.session_id == session_id)
+            .order_by(M.timestamp, M.id)
+        )
+        if cursor:
+            ts, row_id = _cursor_key(M.timestamp, M.id, cursor)
+            q = q.filter(or_(M.timestamp > ts, and_(M.timestamp == ts, M.id > row_id)))
+
+        rows = q.limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1].timestamp, rows[-1].id)
+
+        return {"messages": [_message_dict(m) for m in rows], "next_cursor": next_cursor}
+    except SQLAlchemyError:
+        logger.exception("Database error in list_messages")
+        raise HTTPException(status_code=500, detail="Database error")
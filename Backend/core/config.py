@@ -4,6 +4,108 @@ from functools import lru_cache
 class Settings(BaseSettings):
     OPENAI_API_KEY: str = ""
     DATABASE_URL: str = ""
+    ASYNC_DATABASE_URL: str = ""  # defaults to DATABASE_URL with an async driver
+
+    # Database pool
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection
+    DB_POOL_PRE_PING: bool = True
+    DB_ECHO: bool = False  # log every SQL statement
+
+    # Retrieval fan-out
+    RETRIEVAL_SOURCE_TIMEOUT: float = 20.0  # seconds per source
+    RETRIEVAL_DEADLINE: float = 30.0  # seconds for the whole fan-out
+
+    # Source providers
+    SOURCE_PROVIDERS: str = "live"  # "live", or "fixture" for deterministic offline sources
+    SOURCE_CONCURRENCY: dict = {"arxiv": 2, "wikipedia": 4, "web": 2}  # in-flight fetches per source
+    SOURCE_RATE_LIMITS: dict = {"arxiv": 1.0, "web": 1.0}  # max fetches per second per source
+    FIXTURE_LATENCY: float = 0.2  # seconds per fixture fetch
+    FIXTURE_WORDS: int = 2000  # words per fixture document
+
+    # Retries and circuit breakers for external dependencies
+    RETRY_MAX_ATTEMPTS: int = 3  # attempts per call, including the first
+    RETRY_BASE_DELAY: float = 0.5  # seconds; backoff is full-jitter exponential
+    RETRY_MAX_DELAY: float = 8.0
+    RETRY_BUDGET_RATIO: float = 0.2  # retries allowed per call over a 10 s window
+    BREAKER_FAILURE_THRESHOLD: int = 5  # consecutive failures before failing fast
+    BREAKER_RESET_TIMEOUT: float = 30.0  # seconds before a probe call is let through
+
+    # Retrieval cache
+    RETRIEVAL_CACHE_ENABLED: bool = True
+    RETRIEVAL_CACHE_PATH: str = "cache/retrieval.sqlite"  # empty = memory only
+    RETRIEVAL_CACHE_MEMORY_ENTRIES: int = 256
+    RETRIEVAL_CACHE_DISK_ENTRIES: int = 5000
+
+    # Local document corpus (arXiv papers, Wikipedia pages)
+    CORPUS_ENABLED: bool = True
+    CORPUS_PATH: str = "cache/corpus.sqlite"
+    CORPUS_OFFLINE: bool = False  # answer only from the local corpus, never hit the network
+    CORPUS_SEARCH_TTL: float = 24 * 3600  # seconds a remote search's result list is reused for the same query
+
+    # Document parsing
+    PARSE_POOL_SIZE: int = 2  # worker processes for PDF parsing; 0 = parse in the fetching thread
+
+    # LLM completion cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = "cache/llm.sqlite"  # empty = memory only
+    LLM_CACHE_MEMORY_ENTRIES: int = 512
+    LLM_CACHE_DISK_ENTRIES: int = 20000
+    LLM_CACHE_TTL: float = 30 * 24 * 3600  # seconds
+
+    # Summarization
+    SUMMARY_MODEL: str = "gpt-3.5-turbo"
+    SUMMARY_CHUNK_TOKENS: int = 2000  # tokens per map chunk
+    SUMMARY_CHUNK_OVERLAP: int = 100  # tokens shared by consecutive chunks
+    SUMMARY_MAX_CONCURRENCY: int = 4  # parallel chunk summaries per request
+    SUMMARY_REDUCE_MAX_CHARS: int = 8000  # max size of one reduce prompt's input
+    SUMMARY_PIPELINED: bool = False  # summarize each source as it arrives, then merge
+
+    # Passage selection between fetch and summarize
+    CONTEXT_RANKING_ENABLED: bool = True
+    CONTEXT_TOKEN_BUDGET: int = 6000  # max tokens of retrieved text sent to the summarizer
+    PASSAGE_MAX_WORDS: int = 150
+    PASSAGE_DEDUP_DISTANCE: int = 3  # SimHash bits within which passages count as duplicates
+    SOURCE_TEXT_MAX_CHARS: int = 2_000_000  # retrieved text read per request; 0 = unlimited
+    SOURCE_TEXT_TRUNCATION: str = "fair"  # "fair": equal share per source; "head": documents in order
+
+    # Critic and refine loop
+    CRITIC_MIN_GROUNDING: float = 0.2  # share of summary word pairs that must appear in the sources
+    CRITIC_MAX_REFINES: int = 1  # refine passes per request after a rejected review
+    CRITIC_REFINE_TOKEN_BUDGET: int = 6000  # prompt tokens all refine passes of a request may use
+
+    # Graph checkpoints, so failed or interrupted runs can resume
+    CHECKPOINT_ENABLED: bool = True
+    CHECKPOINT_PATH: str = "cache/checkpoints.sqlite"
+    CHECKPOINT_MAX_THREADS: int = 1000  # most recent sessions whose checkpoint is kept
+
+    # Background research jobs
+    JOB_WORKERS: int = 4
+    JOB_QUEUE_SIZE: int = 100
+    JOB_PER_USER_LIMIT: int = 3  # unfinished jobs per user
+    JOB_RETENTION: int = 1000  # finished jobs kept for polling
+
+    # Semantic reuse of earlier research
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_DIR: str = "cache/semantic"
+    SEMANTIC_CACHE_THRESHOLD: float = 0.9  # cosine similarity needed to reuse a summary
+    SEMANTIC_EMBEDDING_MODEL: str = ""  # sentence-transformers model; empty = hashing embedder
+    SEMANTIC_HASH_DIM: int = 512
+
+    # Startup
+    STARTUP_WARMUP: bool = True  # build the graph, LLM client and tokenizer before serving; off = on first use
+
+    # Observability
+    METRICS_ENABLED: bool = True  # Prometheus /metrics endpoint and request timing
+    OTEL_ENABLED: bool = False  # OpenTelemetry spans per graph node (needs opentelemetry-sdk)
+
+    # Persistence
+    PERSISTENCE_WRITE_BEHIND: bool = False  # batch turn writes across requests
+    PERSISTENCE_BATCH_SIZE: int = 50  # turns per write-behind flush
+    PERSISTENCE_FLUSH_INTERVAL: float = 1.0  # seconds between write-behind flushes
+    PERSISTENCE_FLUSH_RETRIES: int = 5  # failed flushes a batch is kept for before it is dropped
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,238 @@
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from prometheus_client.core import REGISTRY, CounterMetricFamily, GaugeMetricFamily
+
+from core.config import get_settings
+
+settings = get_settings()
+
+try:
+    from opentelemetry import trace
+    OTEL_AVAILABLE = True
+except ImportError:
+    OTEL_AVAILABLE = False
+
+_tracer = trace.get_tracer("research-agent") if OTEL_AVAILABLE and settings.OTEL_ENABLED else None
+
+# Seconds; from sub-millisecond cache hits up to the retrieval deadline
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+BYTES_BUCKETS = (1_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 5_000_000)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+HTTP_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+NODE_DURATION = Histogram(
+    "research_node_duration_seconds", "Research graph node latency", ["node"],
+    buckets=LATENCY_BUCKETS,
+)
+SOURCE_DURATION = Histogram(
+    "retrieval_source_duration_seconds", "Per-source retrieval latency", ["source", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+SOURCE_BYTES = Histogram(
+    "retrieval_source_bytes", "Text returned per source fetch", ["source"],
+    buckets=BYTES_BUCKETS,
+)
+LLM_CALLS = Counter("llm_calls_total", "LLM completions requested", ["model", "cached"])
+LLM_DURATION = Histogram(
+    "llm_call_duration_seconds", "LLM call latency (cache misses only)", ["model"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Histogram(
+    "llm_tokens", "Tokens per LLM call (cache misses only)", ["model", "kind"],
+    buckets=TOKEN_BUCKETS,
+)
+DB_DURATION = Histogram(
+    "db_query_duration_seconds", "Database round-trip latency", ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """OpenTelemetry span when OTEL_ENABLED and the SDK is installed; a no-op otherwise."""
+    if _tracer is None:
+        yield None
+        return
+    with _tracer.start_as_current_span(name, attributes=attributes) as current:
+        yield current
+
+
+def timed_node(name: str, node):
+    """Wrap an async graph node to record its duration. The wrapper keeps the node's signature."""
+    @wraps(node)
+    async def wrapper(state, **kwargs):
+        started = time.perf_counter()
+        with span(f"node.{name}"):
+            try:
+                return await node(state, **kwargs)
+            finally:
+                NODE_DURATION.labels(name).observe(time.perf_counter() - started)
+    return wrapper
+
+
+def _text_bytes(result) -> int:
+    if isinstance(result, str):
+        return len(result.encode("utf-8"))
+    if isinstance(result, list):
+        return sum(len(r.encode("utf-8")) for r in result if isinstance(r, str))
+    return 0
+
+
+def record_source(source: str, timing: dict, result=None):
+    SOURCE_DURATION.labels(source, timing["status"]).observe(timing["elapsed"])
+    if timing["status"] == "ok":
+        SOURCE_BYTES.labels(source).observe(_text_bytes(result))
+
+
+def record_llm_call(model: str, cached: bool, elapsed: float = 0.0,
+                    prompt_tokens: int = 0, completion_tokens: int = 0):
+    LLM_CALLS.labels(model, "true" if cached else "false").inc()
+    if not cached:
+        LLM_DURATION.labels(model).observe(elapsed)
+        LLM_TOKENS.labels(model, "prompt").observe(prompt_tokens)
+        LLM_TOKENS.labels(model, "completion").observe(completion_tokens)
+
+
+class _StatsCollector:
+    """
+    Reads cache and circuit-breaker stats at scrape time, so the hot path
+    pays nothing for them.
+    """
+
+    def describe(self):
+        # Lets the registry learn the metric names without calling collect(),
+        # which would open the caches at import time
+        yield GaugeMetricFamily("cache_hit_rate", "Hit rate since start", labels=["cache"])
+        yield GaugeMetricFamily("dependency_circuit_open", "", labels=["dependency"])
+        yield CounterMetricFamily("dependency_circuit_opened", "", labels=["dependency"])
+        yield CounterMetricFamily("dependency_retries", "", labels=["dependency"])
+
+    def collect(self):
+        # Imported here: these modules import this one
+        from core.resilience import dependency_stats
+        from services.retriever import get_retrieval_cache
+        from services.summarizer import get_llm_cache
+
+        hit_rate = GaugeMetricFamily("cache_hit_rate", "Hit rate since start", labels=["cache"])
+        hit_rate.add_metric(["retrieval"], get_retrieval_cache().stats().get("hit_rate", 0.0))
+        hit_rate.add_metric(["llm"], get_llm_cache().stats()["hit_rate"])
+        yield hit_rate
+
+        breaker = GaugeMetricFamily(
+            "dependency_circuit_open", "1 while the dependency's circuit breaker is not closed",
+            labels=["dependency"],
+        )
+        # Counters (exposed as *_total): they only grow, so rate() works on them
+        opened = CounterMetricFamily(
+            "dependency_circuit_opened", "Times the circuit breaker has opened", labels=["dependency"],
+        )
+        retries = CounterMetricFamily("dependency_retries", "Retries made", labels=["dependency"])
+        for name, stats in dependency_stats().items():
+            breaker.add_metric([name], 0 if stats["state"] == "closed" else 1)
+            opened.add_metric([name], stats["times_opened"])
+            retries.add_metric([name], stats["retries"])
+        yield breaker
+        yield opened
+        yield retries
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append((statement, time.perf_counter()))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _, started = conn.info["query_started"].pop()
+    operation = statement.split(None, 1)[0].upper() if statement.strip() else "OTHER"
+    DB_DURATION.labels(operation).observe(time.perf_counter() - started)
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start time so
+    # the stack doesn't grow and later queries don't pop the wrong entry
+    conn = context.connection
+    started = conn.info.get("query_started") if conn is not None else None
+    if started and started[-1][0] == context.statement:
+        started.pop()
+
+
+_DB_HOOKS = (
+    ("before_cursor_execute", _before_cursor_execute),
+    ("after_cursor_execute", _after_cursor_execute),
+    ("handle_error", _handle_error),
+)
+
+
+def _instrument_sqlalchemy():
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    for name, hook in _DB_HOOKS:
+        if not event.contains(Engine, name, hook):
+            event.listen(Engine, name, hook)
+
+
+def _uninstrument_sqlalchemy():
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    for name, hook in _DB_HOOKS:
+        if event.contains(Engine, name, hook):
+            event.remove(Engine, name, hook)
+
+
+_collector = None
+
+
+class _RequestMetricsMiddleware:
+    """
+    Records HTTP_DURATION per request. Plain ASGI rather than
+    @app.middleware("http"), which runs each request through an extra task
+    and response stream.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Route template, not the raw path, so ids don't explode label cardinality
+            path = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_DURATION.labels(scope["method"], path, str(status)).observe(time.perf_counter() - started)
+
+
+def setup_metrics(app):
+    """Add the request-latency middleware, DB hooks and the /metrics endpoint to the app."""
+    from starlette.responses import Response
+
+    global _collector
+    _instrument_sqlalchemy()
+    if _collector is None:
+        _collector = _StatsCollector()
+        REGISTRY.register(_collector)
+
+    app.add_middleware(_RequestMetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
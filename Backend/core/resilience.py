@@ -0,0 +1,298 @@
+import asyncio
+import inspect
+import random
+import threading
+import time
+from collections import deque
+from functools import wraps
+from typing import Callable, Optional
+
+from loguru import logger
+
+from core.config import get_settings
+
+settings = get_settings()
+
+# Exception class names that mean "the dependency is struggling", across
+# openai, httpx, requests, urllib3 and the stdlib, matched by name so none
+# of those packages has to be imported here.
+TRANSIENT_ERROR_NAMES = {
+    "APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError",
+    "ServiceUnavailableError", "ConnectError", "ConnectTimeout", "ReadTimeout", "ReadError",
+    "RemoteProtocolError", "PoolTimeout", "ConnectionError", "Timeout", "ChunkedEncodingError",
+    "RemoteDisconnected", "ProtocolError", "HTTPError", "HTTPTimeoutError", "DuckDuckGoSearchException",
+}
+TRANSIENT_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit breaker is open."""
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Classify an error as worth retrying (timeouts, connection problems, 429/5xx)."""
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if isinstance(exc, (TimeoutError, ConnectionError, asyncio.TimeoutError)):
+        return True
+    status = getattr(exc, "status_code", None) or getattr(exc, "status", None)
+    if isinstance(status, int):
+        return status in TRANSIENT_STATUS_CODES
+    return any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(exc).__mro__)
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter: sleep uniform(0, min(max_delay, base_delay * 2**attempt))."""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 retry_on: Callable[[BaseException], bool] = is_transient):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = retry_on
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class RetryBudget:
+    """
+    Caps retries at ``ratio`` of the calls seen in the last ``window`` seconds
+    (plus a small floor), so a failing dependency isn't hit with a multiple
+    of the normal load.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 3, window: float = 10.0):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._calls = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float):
+        for q in (self._calls, self._retries):
+            while q and q[0] <= now - self.window:
+                q.popleft()
+
+    def record_call(self):
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            self._calls.append(now)
+
+    def try_spend(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            if len(self._retries) >= self.min_retries + self.ratio * len(self._calls):
+                return False
+            self._retries.append(now)
+            return True
+
+
+class CircuitBreaker:
+    """
+    closed -> open after ``failure_threshold`` consecutive failures; open
+    rejects calls for ``reset_timeout`` seconds, then half_open lets one
+    probe through, which closes the circuit on success or reopens it.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def release(self):
+        """Give up a probe that ended without a verdict (e.g. the call was cancelled)."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+
+class Dependency:
+    """
+    An external service (arXiv, Wikipedia, OpenAI, ...) called through a
+    shared retry policy, retry budget and circuit breaker.
+
+    Only errors the policy classifies as transient are retried and count
+    against the breaker; anything else is raised immediately. A per-call
+    ``retry_on`` can narrow which transient errors are retried.
+    """
+
+    def __init__(self, name: str, policy: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None, budget: Optional[RetryBudget] = None):
+        self.name = name
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.budget = budget or RetryBudget()
+        self._stats = {"calls": 0, "failures": 0, "retries": 0, "budget_exhausted": 0, "short_circuited": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _before_attempt(self):
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open), failing fast")
+
+    def _after_failure(self, exc: BaseException, attempt: int, retry_on) -> Optional[float]:
+        """Record a failed attempt; return the backoff before the next one, or None to give up."""
+        if not self.policy.retry_on(exc):
+            # The dependency answered; the problem is the request, not its health
+            self.breaker.record_success()
+            return None
+        self._count("failures")
+        self.breaker.record_failure()
+        if not retry_on(exc) or attempt + 1 >= self.policy.max_attempts:
+            return None
+        if not self.budget.try_spend():
+            self._count("budget_exhausted")
+            return None
+        self._count("retries")
+        delay = self.policy.backoff(attempt)
+        logger.warning(f"{self.name} call failed ({type(exc).__name__}: {exc}); retrying in {delay:.2f}s")
+        return delay
+
+    def call(self, func: Callable, *args, retry_on=None, **kwargs):
+        """Call a blocking function with retries. Backoff sleeps the calling thread."""
+        retry_on = retry_on or self.policy.retry_on
+        self._count("calls")
+        self.budget.record_call()
+        attempt = 0
+        while True:
+            self._before_attempt()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                if not isinstance(e, Exception):
+                    # Cancelled or interrupted: no verdict on the dependency, but free the probe slot
+                    self.breaker.release()
+                    raise
+                delay = self._after_failure(e, attempt, retry_on)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def acall(self, func: Callable, *args, retry_on=None, **kwargs):
+        """Await a coroutine function with retries; backoff never blocks the event loop."""
+        retry_on = retry_on or self.policy.retry_on
+        self._count("calls")
+        self.budget.record_call()
+        attempt = 0
+        while True:
+            self._before_attempt()
+            try:
+                result = await func(*args, **kwargs)
+            except BaseException as e:
+                if not isinstance(e, Exception):
+                    # Cancelled or interrupted: no verdict on the dependency, but free the probe slot
+                    self.breaker.release()
+                    raise
+                delay = self._after_failure(e, attempt, retry_on)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(
+            state=self.breaker.state,
+            consecutive_failures=self.breaker.failures,
+            times_opened=self.breaker.times_opened,
+        )
+        return stats
+
+
+_dependencies: dict[str, Dependency] = {}
+_dependencies_lock = threading.Lock()
+
+
+def get_dependency(name: str) -> Dependency:
+    """Process-wide Dependency for ``name``, built from settings on first use."""
+    with _dependencies_lock:
+        if name not in _dependencies:
+            _dependencies[name] = Dependency(
+                name,
+                policy=RetryPolicy(
+                    max_attempts=settings.RETRY_MAX_ATTEMPTS,
+                    base_delay=settings.RETRY_BASE_DELAY,
+                    max_delay=settings.RETRY_MAX_DELAY,
+                ),
+                breaker=CircuitBreaker(
+                    failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+                    reset_timeout=settings.BREAKER_RESET_TIMEOUT,
+                ),
+                budget=RetryBudget(ratio=settings.RETRY_BUDGET_RATIO),
+            )
+        return _dependencies[name]
+
+
+def dependency_stats() -> dict:
+    with _dependencies_lock:
+        dependencies = list(_dependencies.values())
+    return {d.name: d.stats() for d in dependencies}
+
+
+def retry(dependency: str, retry_on: Optional[Callable[[BaseException], bool]] = None):
+    """
+    Decorator routing calls through ``get_dependency(dependency)``.
+    Works on both plain and ``async def`` functions.
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await get_dependency(dependency).acall(func, *args, retry_on=retry_on, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_dependency(dependency).call(func, *args, retry_on=retry_on, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,116 @@
+import logging
+import re
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+
+# An optional leading space plus up to four characters: close to what a BPE
+# token covers in English text
+_APPROXIMATE_TOKEN = re.compile(r"\s?\S{1,4}|\s+")
+
+
+class ApproximateEncoding:
+    """
+    Stand-in for a tiktoken encoding when the real one can't be loaded.
+    Counts roughly one token per four characters. A token's id is its start
+    offset in the text, which is enough for counting and chunking.
+    """
+
+    name = "approximate"
+
+    def encode_ordinary(self, text: str) -> list[int]:
+        return [m.start() for m in _APPROXIMATE_TOKEN.finditer(text)]
+
+    def encode_ordinary_batch(self, texts: list[str], num_threads: int = 8) -> list[list[int]]:
+        return [self.encode_ordinary(text) for text in texts]
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str = DEFAULT_MODEL):
+    """
+    Return the tiktoken encoder for a model, built once per process.
+    Unknown models fall back to cl100k_base.
+
+    tiktoken downloads the encoding on first use; offline hosts need
+    TIKTOKEN_CACHE_DIR pointing at a directory that already has it. If it
+    can't be loaded, an ApproximateEncoding is used (and cached) instead,
+    so token counts become estimates rather than requests failing.
+    """
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"Can't load the tiktoken encoding for {model} ({str(e)}); estimating tokens instead")
+        return ApproximateEncoding()
+
+
+def token_offsets(encoding, tokens: list[int]) -> list[int]:
+    """Start offset in the encoded text of each of ``tokens``."""
+    if isinstance(encoding, ApproximateEncoding):
+        return list(tokens)
+    _, offsets = encoding.decode_with_offsets(tokens)
+    return offsets
+
+
+# USD per 1K tokens as (prompt, completion); matched by longest model-name prefix
+MODEL_PRICES = {
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4": (0.03, 0.06),
+}
+
+
+def count_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    """
+    Count tokens in a text for cost estimation.
+    """
+    return len(get_encoding(model).encode_ordinary(text))
+
+
+def count_tokens_batch(texts: list[str], model: str = DEFAULT_MODEL, num_threads: int = 8) -> list[int]:
+    """
+    Count tokens for many texts at once using tiktoken's threaded batch encoder.
+    """
+    if not texts:
+        return []
+    encoded = get_encoding(model).encode_ordinary_batch(list(texts), num_threads=num_threads)
+    return [len(tokens) for tokens in encoded]
+
+
+def get_model_price(model: str) -> tuple[float, float]:
+    for name in sorted(MODEL_PRICES, key=len, reverse=True):
+        if model.startswith(name):
+            return MODEL_PRICES[name]
+    return MODEL_PRICES[DEFAULT_MODEL]
+
+
+def estimate_cost(prompt_tokens: int, completion_tokens: int = 0, model: str = DEFAULT_MODEL) -> float:
+    """
+    Estimated USD cost of a call with the given token counts.
+    """
+    prompt_price, completion_price = get_model_price(model)
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+
+def estimate_request_cost(prompts: list[str], model: str = DEFAULT_MODEL,
+                          completion_tokens_per_prompt: int = 300) -> dict:
+    """
+    Estimate the cost of dispatching a set of prompts before sending them.
+
+    Returns {"prompt_tokens", "completion_tokens", "cost"}.
+    """
+    prompt_tokens = sum(count_tokens_batch(prompts, model))
+    completion_tokens = completion_tokens_per_prompt * len(prompts)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cost": round(estimate_cost(prompt_tokens, completion_tokens, model), 6),
+    }
@@ -2,26 +2,20 @@ import logging
 import time
 from functools import wraps
 from loguru import logger
-import tiktoken
+from core.tokens import count_tokens, count_tokens_batch, estimate_cost, get_encoding  # noqa: F401
 
 logging.basicConfig(level=logging.INFO)
-logger.add("logs/app.log", rotation="1 MB", retention="7 days", level="INFO")
+# enqueue: writes go through a background thread instead of blocking the caller;
+# delay: the file isn't opened until the first message
+logger.add("logs/app.log", rotation="1 MB", retention="7 days", level="INFO", enqueue=True, delay=True)
 
 
-def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
-    """
-    Count tokens in a text for cost estimation.
-    """
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        encoding = tiktoken.get_encoding("cl100k_base")
-    return len(encoding.encode(text))
-
 
 def retry(max_retries=3, delay=2, backoff=2):
     """
     Retry decorator with exponential backoff.
+    For calls to external services prefer core.resilience.retry(dependency),
+    which adds jitter, a retry budget and a circuit breaker.
     """
     def decorator(func):
         @wraps(func)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from .session import Base
 
@@ -18,6 +18,9 @@ class ResearchSession(Base):
     user = relationship("User", back_populates="sessions")
     messages = relationship("Message", back_populates="session")
     summaries = relationship("Summary", back_populates="session")
+    __table_args__ = (
+        Index("ix_research_sessions_user_id_created_at", "user_id", "created_at"),
+    )
 
 class Message(Base):
     __tablename__ = "messages"
@@ -27,6 +30,9 @@ class Message(Base):
     content = Column(Text, nullable=False)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
     session = relationship("ResearchSession", back_populates="messages")
+    __table_args__ = (
+        Index("ix_messages_session_id_timestamp", "session_id", "timestamp"),
+    )
 
 class Summary(Base):
     __tablename__ = "summaries"
@@ -1,10 +1,47 @@
+from functools import lru_cache
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker , declarative_base
 from core.config import settings
 
 DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(DATABASE_URL , future = True , echo = True)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def _has_sized_pool(url: str) -> bool:
+    # In-memory SQLite (SingletonThreadPool) and aiosqlite (NullPool) reject pool sizing
+    if url.startswith("sqlite+aiosqlite"):
+        return False
+    return not (url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith("sqlite:")))
+
+
+def engine_options(url: str) -> dict:
+    """Pool and logging options from settings, limited to what the URL's pool accepts."""
+    options = {"echo": settings.DB_ECHO, "pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if _has_sized_pool(url):
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    return options
+
+
+def async_database_url(url: str) -> str:
+    """Map a sync URL onto its async driver (asyncpg / aiosqlite) unless one is configured."""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+engine = create_engine(DATABASE_URL , future = True , **engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -16,4 +53,28 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+@lru_cache(maxsize=1)
+def get_async_engine():
+    """AsyncEngine for the same database, created on first use (needs asyncpg or aiosqlite)."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = async_database_url(DATABASE_URL)
+    return create_async_engine(url, **engine_options(url))
+
+
+@lru_cache(maxsize=1)
+def get_async_sessionmaker():
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    return async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    """
+    Dependency function to get an AsyncSession for FastAPI
+    """
+    async with get_async_sessionmaker()() as db:
+        yield db
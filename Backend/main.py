@@ -3,14 +3,58 @@ import warnings
 warnings.filterwarnings("ignore", message=".*looks like you're parsing an HTML document with an XML parser.*", category=UserWarning)
 warnings.filterwarnings("ignore", message=".*No parser was explicitly specified.*", category=UserWarning)
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api import routes_chat, routes_history
+from core.config import get_settings
+from core.tokens import get_encoding
+from core.metrics import setup_metrics
+from workflows.research_graph import get_research_graph
+from services.jobs import job_queue
+from services.parsing import parse_pool
+from services.persistence import close_write_buffer, get_session_summaries
+from services.semantic_cache import get_semantic_cache
+from services.summarizer import get_llm
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+def warm_up():
+    """Build what the first request would otherwise pay for: the graph, the LLM client and the tokenizer."""
+    started = time.perf_counter()
+    get_research_graph()
+    get_llm()
+    get_encoding(get_settings().SUMMARY_MODEL)
+    logger.info(f"Warm-up done in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+def backfill_semantic_cache():
+    # Index existing sessions in the background until a backfill has finished once;
+    # sessions indexed meanwhile (or by an interrupted run) are skipped, not duplicated
+    cache = get_semantic_cache()
+    if cache is not None and not cache.index.is_backfilled():
+        asyncio.get_running_loop().run_in_executor(
+            None, lambda: cache.backfill(get_session_summaries())
+        )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if get_settings().STARTUP_WARMUP:
+        await asyncio.to_thread(warm_up)
+    backfill_semantic_cache()
+    job_queue.start(routes_chat.run_research_job)
+    yield
+    await job_queue.stop()
+    close_write_buffer()
+    parse_pool.shutdown()
 
 app = FastAPI(
     title="AI Research Orchestrator",
     description="A sophisticated AI-powered research orchestrator using LangChain and LangGraph",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -20,8 +64,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # history paging cursor; browsers hide other headers
 )
 
+if get_settings().METRICS_ENABLED:
+    setup_metrics(app)
+
 app.include_router(routes_chat.router, prefix="/api", tags=["chat"])
 app.include_router(routes_history.router, prefix="/api", tags=["history"])
 
@@ -0,0 +1,30 @@
+"""add history indexes
+
+Revision ID: 9fc9ab46e344
+Revises: fa895ab9eb83
+Create Date: 2026-10-17 09:12:40.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9fc9ab46e344'
+down_revision: Union[str, Sequence[str], None] = 'fa895ab9eb83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_research_sessions_user_id_created_at', 'research_sessions', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_messages_session_id_timestamp', 'messages', ['session_id', 'timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_messages_session_id_timestamp', table_name='messages')
+    op.drop_index('ix_research_sessions_user_id_created_at', table_name='research_sessions')
@@ -0,0 +1,94 @@
+import re
+from bisect import bisect_left
+from typing import Iterator
+
+from core.tokens import DEFAULT_MODEL, get_encoding, token_offsets
+
+PARAGRAPH_BREAK = "\n\n"
+SENTENCE_END = re.compile(r"[.!?][\"')\]]*(?=\s)")
+# Rough size of a token in English text, used to size encoding windows
+CHARS_PER_TOKEN = 4
+
+
+def _boundary_token(text: str, offsets: list[int], lo_tok: int, hi_tok: int) -> int:
+    """
+    Pick a cut point in tokens [lo_tok, hi_tok]: the last paragraph break,
+    else the last sentence end, else the last whitespace, else hi_tok itself.
+    Cuts land before the whitespace, since BPE tokens carry their leading space.
+    """
+    lo, hi = offsets[lo_tok], offsets[hi_tok]
+
+    cut = text.rfind(PARAGRAPH_BREAK, lo, hi)
+    if cut == -1:
+        last = None
+        for last in SENTENCE_END.finditer(text, lo, hi):
+            pass
+        if last is not None:
+            cut = last.end()
+        else:
+            cut = max(text.rfind(" ", lo, hi), text.rfind("\n", lo, hi))
+
+    if cut <= lo:
+        return hi_tok
+    tok = bisect_left(offsets, cut, lo_tok, hi_tok)
+    return tok if tok > lo_tok else hi_tok
+
+
+def iter_token_chunks(text: str, max_tokens: int = 2000, overlap: int = 100,
+                      model: str = DEFAULT_MODEL, boundary_slack: float = 0.2,
+                      window_chunks: int = 16) -> Iterator[str]:
+    """
+    Lazily split text into chunks of at most ``max_tokens`` tokens.
+
+    The text is encoded a window of about ``window_chunks`` chunks at a
+    time, so token offsets for a whole long text never exist at once;
+    chunks are cut on token offsets and sliced out of the window. Each cut
+    is moved back to the nearest paragraph/sentence/word boundary within the
+    last ``boundary_slack`` fraction of the chunk, and consecutive chunks
+    share ``overlap`` tokens.
+    """
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be positive")
+    if not 0 <= overlap < max_tokens:
+        raise ValueError("overlap must be in [0, max_tokens)")
+    if not text:
+        return
+
+    encoding = get_encoding(model)
+    slack = int(max_tokens * boundary_slack)
+    window = max_tokens * window_chunks * CHARS_PER_TOKEN
+    base = 0
+    while True:
+        limit = min(base + window, len(text))
+        last = limit == len(text)
+        segment = text if base == 0 and last else text[base:limit]
+        tokens = encoding.encode_ordinary(segment)
+        total = len(tokens)
+        if base == 0 and last and total <= max_tokens:
+            yield text
+            return
+
+        offsets = token_offsets(encoding, tokens)
+        offsets.append(len(segment))
+        del tokens
+
+        start = 0
+        while True:
+            end = min(start + max_tokens, total)
+            if end >= total and not last:
+                # The rest of the window is less than a chunk: re-encode from here
+                break
+            if end < total:
+                end = _boundary_token(segment, offsets, max(start + 1, end - slack), end)
+            chunk = segment[offsets[start]:offsets[end]]
+            if chunk.strip():
+                yield chunk
+            if end >= total:
+                return
+            start = max(end - overlap, start + 1)
+
+        if start == 0:
+            # Not even one chunk fit in the window
+            window *= 2
+        else:
+            base += offsets[start]
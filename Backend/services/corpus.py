@@ -0,0 +1,182 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass
+class CorpusDocument:
+    doc_id: str  # "<source>:<native id>", e.g. "arxiv:2101.00001v2" or "wikipedia:23862"
+    source: str
+    title: str
+    text: str
+    metadata: dict = field(default_factory=dict)
+
+
+def make_doc_id(source: str, native_id) -> str:
+    return f"{source}:{native_id}"
+
+
+def fts_query(text: str, match_all: bool = True) -> Optional[str]:
+    """Quote each word so user input can't inject FTS5 query syntax."""
+    terms = [f'"{t}"' for t in dict.fromkeys(_TERM.findall(text.lower()))]
+    if not terms:
+        return None
+    return (" AND " if match_all else " OR ").join(terms)
+
+
+class DocumentCorpus:
+    """
+    Local store of fetched source documents.
+
+    Full text is kept zlib-compressed in ``documents``; ``documents_fts`` is a
+    contentless FTS5 index over title and text sharing the same rowid, so the
+    text isn't stored twice. Documents are immutable once stored.
+
+    ``searches`` remembers which documents a remote search returned for a
+    query, so an exact repeat can be answered without asking the source again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            " rowid INTEGER PRIMARY KEY,"
+            " doc_id TEXT NOT NULL UNIQUE,"
+            " source TEXT NOT NULL,"
+            " title TEXT NOT NULL,"
+            " metadata TEXT NOT NULL,"
+            " content BLOB NOT NULL,"
+            " fetched_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_documents_source_title ON documents (source, title)"
+        )
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts"
+            " USING fts5(title, content, content='')"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS searches ("
+            " source TEXT NOT NULL,"
+            " query TEXT NOT NULL,"
+            " doc_ids TEXT NOT NULL,"
+            " searched_at REAL NOT NULL,"
+            " PRIMARY KEY (source, query))"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _row_to_document(row) -> CorpusDocument:
+        doc_id, source, title, metadata, content = row
+        return CorpusDocument(
+            doc_id=doc_id,
+            source=source,
+            title=title,
+            text=zlib.decompress(content).decode("utf-8"),
+            metadata=json.loads(metadata),
+        )
+
+    def add(self, documents: Iterable[CorpusDocument]) -> int:
+        """Store documents not already present; returns how many were new."""
+        added = 0
+        now = time.time()
+        with self._lock:
+            for doc in documents:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO documents (doc_id, source, title, metadata, content, fetched_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (doc.doc_id, doc.source, doc.title, json.dumps(doc.metadata),
+                     zlib.compress(doc.text.encode("utf-8")), now),
+                )
+                if cursor.rowcount:
+                    self._conn.execute(
+                        "INSERT INTO documents_fts (rowid, title, content) VALUES (?, ?, ?)",
+                        (cursor.lastrowid, doc.title, doc.text),
+                    )
+                    added += 1
+            self._conn.commit()
+        return added
+
+    def get(self, doc_id: str) -> Optional[CorpusDocument]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT doc_id, source, title, metadata, content FROM documents WHERE doc_id = ?",
+                (doc_id,),
+            ).fetchone()
+        return self._row_to_document(row) if row else None
+
+    def get_by_title(self, source: str, title: str) -> Optional[CorpusDocument]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT doc_id, source, title, metadata, content FROM documents"
+                " WHERE source = ? AND title = ?",
+                (source, title),
+            ).fetchone()
+        return self._row_to_document(row) if row else None
+
+    def search(self, query: str, source: Optional[str] = None, limit: int = 3,
+               match_all: bool = True) -> list[CorpusDocument]:
+        """Best BM25 matches for ``query``, optionally restricted to one source."""
+        match = fts_query(query, match_all)
+        if match is None:
+            return []
+        sql = (
+            "SELECT d.doc_id, d.source, d.title, d.metadata, d.content"
+            " FROM documents_fts JOIN documents d ON d.rowid = documents_fts.rowid"
+            " WHERE documents_fts MATCH ?"
+        )
+        params: list = [match]
+        if source:
+            sql += " AND d.source = ?"
+            params.append(source)
+        sql += " ORDER BY documents_fts.rank LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._row_to_document(row) for row in rows]
+
+    def record_search(self, source: str, query: str, doc_ids: list[str]):
+        """Remember the documents (in result order) a remote search returned."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO searches (source, query, doc_ids, searched_at) VALUES (?, ?, ?, ?)",
+                (source, query, json.dumps(doc_ids), time.time()),
+            )
+            self._conn.commit()
+
+    def recorded_search(self, source: str, query: str, max_age: float) -> Optional[list[CorpusDocument]]:
+        """
+        The documents an earlier remote search for exactly ``query`` returned,
+        or None if there was none within ``max_age`` seconds or one of its
+        documents is missing.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT doc_ids FROM searches WHERE source = ? AND query = ? AND searched_at >= ?",
+                (source, query, time.time() - max_age),
+            ).fetchone()
+        if row is None:
+            return None
+        documents = [self.get(doc_id) for doc_id in json.loads(row[0])]
+        return None if None in documents else documents
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, COUNT(*), SUM(LENGTH(content)) FROM documents GROUP BY source"
+            ).fetchall()
+        return {source: {"documents": count, "compressed_bytes": size or 0} for source, count, size in rows}
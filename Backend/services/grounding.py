@@ -0,0 +1,56 @@
+import re
+
+from services.passages import tokenize
+
+_WHITESPACE = re.compile(r"\s")
+
+# Characters of source text tokenized at a time, so no word list for the whole text is built
+SOURCE_BLOCK_CHARS = 1 << 20
+
+
+def _ngrams(words: list[str], n: int):
+    return zip(*(words[k:] for k in range(n)))
+
+
+def _iter_word_blocks(text: str, block_chars: int):
+    """tokenize() over the text a block at a time; blocks end on whitespace so no word is split."""
+    start = 0
+    while start < len(text):
+        end = min(start + block_chars, len(text))
+        if end < len(text):
+            cut = max(text.rfind(" ", start, end), text.rfind("\n", start, end))
+            if cut <= start:
+                # A word longer than the block: extend to the next whitespace
+                match = _WHITESPACE.search(text, end)
+                cut = match.start() if match else len(text)
+            end = cut
+        yield tokenize(text[start:end])
+        start = end
+
+
+def grounding_score(summary: str, sources: str, n: int = 2, block_chars: int = SOURCE_BLOCK_CHARS) -> float:
+    """
+    Share of the summary's word n-grams (stopwords dropped) that also occur in
+    the sources. Low values suggest content the sources don't support.
+    A summary too short to have n-grams scores 1.0.
+
+    The sources are scanned in blocks and the scan stops once every n-gram
+    has been found, so memory stays proportional to the summary.
+    """
+    summary_ngrams = list(_ngrams(tokenize(summary), n))
+    if not summary_ngrams:
+        return 1.0
+
+    missing = set(summary_ngrams)
+    tail, source_words = [], 0
+    for words in _iter_word_blocks(sources, block_chars):
+        source_words += len(words)
+        # The last n-1 words carry over, so n-grams spanning two blocks are seen
+        words = tail + words
+        missing.difference_update(_ngrams(words, n))
+        if not missing:
+            break
+        tail = words[len(words) - (n - 1):] if n > 1 else []
+    if source_words < n:
+        return 0.0
+    return sum(1 for gram in summary_ngrams if gram not in missing) / len(summary_ngrams)
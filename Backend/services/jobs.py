@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+from core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """The queue is at capacity; the caller should retry later."""
+
+
+class UserJobLimitExceeded(Exception):
+    """The user already has the maximum number of unfinished jobs."""
+
+
+@dataclass
+class ResearchJob:
+    user_id: int
+    query: str
+    session_id: int
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"  # queued | running | completed | failed
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "session_id": self.session_id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class ResearchJobQueue:
+    """
+    In-process job queue drained by a fixed pool of asyncio worker tasks.
+
+    Submissions are rejected (rather than queued without bound) when the
+    queue is full or the user already has ``per_user_limit`` unfinished jobs.
+    Finished jobs are kept for polling up to ``retention`` entries.
+    """
+
+    def __init__(self, workers: int, max_queue: int, per_user_limit: int, retention: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.per_user_limit = per_user_limit
+        self.retention = retention
+        self._jobs: OrderedDict[str, ResearchJob] = OrderedDict()
+        self._active_per_user = defaultdict(int)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        self._handler: Optional[Callable[[ResearchJob], Awaitable[Any]]] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self, handler: Callable[[ResearchJob], Awaitable[Any]]):
+        """Start the worker tasks on the running event loop."""
+        if self._tasks:
+            return
+        self._handler = handler
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Research job queue started with {self.workers} workers")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def check_admission(self, user_id: int) -> None:
+        """
+        Cheap pre-check so callers can refuse before doing any setup work.
+        Raises UserJobLimitExceeded or JobQueueFull like submit() would.
+        """
+        if self._queue is None:
+            raise RuntimeError("Job queue is not running")
+        if self._active_per_user.get(user_id, 0) >= self.per_user_limit:
+            raise UserJobLimitExceeded(
+                f"User {user_id} already has {self.per_user_limit} research jobs in progress"
+            )
+        if self._queue.full():
+            raise JobQueueFull("Research job queue is full, try again later")
+
+    def submit(self, user_id: int, query: str, session_id: int) -> ResearchJob:
+        self.check_admission(user_id)
+
+        job = ResearchJob(user_id=user_id, query=query, session_id=session_id)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFull("Research job queue is full, try again later")
+
+        self._active_per_user[user_id] += 1
+        self._jobs[job.id] = job
+        self._trim()
+        return job
+
+    def get(self, job_id: str) -> Optional[ResearchJob]:
+        return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        counts = defaultdict(int)
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return {
+            "workers": len(self._tasks),
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue": self.max_queue,
+            **counts,
+        }
+
+    def _trim(self):
+        # Drop the oldest finished jobs once over the retention limit
+        excess = len(self._jobs) - self.retention
+        if excess <= 0:
+            return
+        for job_id in [j.id for j in self._jobs.values() if j.status in ("completed", "failed")][:excess]:
+            del self._jobs[job_id]
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                job.result = await self._handler(job)
+                job.status = "completed"
+            except asyncio.CancelledError:
+                job.status = "failed"
+                job.error = "Cancelled during shutdown"
+                raise
+            except Exception as e:
+                logger.error(f"Research job {job.id} failed: {str(e)}")
+                job.status = "failed"
+                job.error = str(e)
+            finally:
+                job.finished_at = time.time()
+                self._active_per_user[job.user_id] -= 1
+                if self._active_per_user[job.user_id] <= 0:
+                    del self._active_per_user[job.user_id]
+                self._queue.task_done()
+
+
+job_queue = ResearchJobQueue(
+    workers=settings.JOB_WORKERS,
+    max_queue=settings.JOB_QUEUE_SIZE,
+    per_user_limit=settings.JOB_PER_USER_LIMIT,
+    retention=settings.JOB_RETENTION,
+)
@@ -0,0 +1,225 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from core.metrics import record_llm_call
+from core.resilience import is_transient
+from core.tokens import count_tokens
+from services.retrieval_cache import SqliteCacheTier
+
+logger = logging.getLogger(__name__)
+
+
+def make_prompt_key(model: str, temperature: float, prompt: str) -> str:
+    """Hash of model + temperature + exact prompt text."""
+    payload = json.dumps(
+        {"model": model, "temperature": temperature, "prompt": prompt},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _client_identity(client) -> tuple[str, float]:
+    # ChatOpenAI exposes model_name/temperature; fakes in tests may not
+    model = getattr(client, "model_name", None) or getattr(client, "model", None) or type(client).__name__
+    temperature = getattr(client, "temperature", 0.0) or 0.0
+    return str(model), float(temperature)
+
+
+def _record_completion(client, prompt: str, text: str, started: float):
+    # Metrics only: the completion has already succeeded, so nothing here may fail the call
+    try:
+        model, _ = _client_identity(client)
+        record_llm_call(
+            model,
+            cached=False,
+            elapsed=time.perf_counter() - started,
+            prompt_tokens=count_tokens(prompt, model),
+            completion_tokens=count_tokens(text, model),
+        )
+    except Exception as e:
+        logger.warning(f"Could not record LLM call metrics: {str(e)}")
+
+
+async def _ainvoke(client, prompt: str) -> str:
+    return (await client.ainvoke(prompt)).content.strip()
+
+
+class LLMCache:
+    """
+    Completion cache in front of a chat model client.
+
+    Completions are stored as plain text, keyed on the prompt hash, in a
+    memory LRU backed by an optional SQLite table.
+    """
+
+    def __init__(self, max_memory_entries: int = 512, disk_path: Optional[str] = None,
+                 max_disk_entries: int = 20000, ttl: float = 30 * 24 * 3600,
+                 enabled: bool = True, dependency=None):
+        self.enabled = enabled
+        # Optional core.resilience.Dependency that model calls (not cache hits) go through
+        self.dependency = dependency
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self._memory = OrderedDict()  # key -> (text, expires_at)
+        self._lock = threading.Lock()
+        self._disk = SqliteCacheTier(disk_path, max_disk_entries, table="llm_cache") if disk_path else None
+        self._stats = {"hits": 0, "misses": 0, "bypassed": 0, "evictions": 0}
+
+    def _memory_lookup(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > time.time():
+                    self._memory.move_to_end(key)
+                    return entry[0]
+                del self._memory[key]
+        return None
+
+    def _disk_lookup(self, key: str) -> Optional[str]:
+        entry = self._disk.get(key)
+        if entry is None:
+            return None
+        self._remember(key, *entry)
+        return entry[0]
+
+    def _remember(self, key: str, text: str, expires_at: float):
+        with self._lock:
+            self._memory[key] = (text, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def _store(self, key: str, model: str, text: str):
+        expires_at = time.time() + self.ttl
+        self._remember(key, text, expires_at)
+        if self._disk is not None:
+            self._disk.set(key, model, text, expires_at)
+
+    async def _astore(self, key: str, model: str, text: str):
+        # The SQLite write and its eviction run off the event loop
+        expires_at = time.time() + self.ttl
+        self._remember(key, text, expires_at)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.set, key, model, text, expires_at)
+
+    def _key(self, client, prompt: str, bypass: bool):
+        """Return (key, model); key is None when the cache is skipped."""
+        if bypass or not self.enabled:
+            with self._lock:
+                self._stats["bypassed"] += 1
+            return None, None
+        model, temperature = _client_identity(client)
+        return make_prompt_key(model, temperature, prompt), model
+
+    def _count(self, cached: Optional[str]):
+        with self._lock:
+            self._stats["hits" if cached is not None else "misses"] += 1
+
+    def _check(self, client, prompt: str, bypass: bool):
+        """Return (key, model, cached_text); key is None when the cache is skipped."""
+        key, model = self._key(client, prompt, bypass)
+        if key is None:
+            return None, None, None
+        cached = self._memory_lookup(key)
+        if cached is None and self._disk is not None:
+            cached = self._disk_lookup(key)
+        self._count(cached)
+        return key, model, cached
+
+    async def _acheck(self, client, prompt: str, bypass: bool):
+        """Async variant of _check() that reads the disk tier in a worker thread."""
+        key, model = self._key(client, prompt, bypass)
+        if key is None:
+            return None, None, None
+        cached = self._memory_lookup(key)
+        if cached is None and self._disk is not None:
+            cached = await asyncio.to_thread(self._disk_lookup, key)
+        self._count(cached)
+        return key, model, cached
+
+    def complete(self, client, prompt: str, bypass: bool = False) -> str:
+        """
+        Return the stripped completion for ``prompt`` from ``client``.
+        With ``bypass`` the model is always called and the result is not stored.
+        """
+        key, model, cached = self._check(client, prompt, bypass)
+        if cached is not None:
+            record_llm_call(model, cached=True)
+            return cached
+        started = time.perf_counter()
+        if self.dependency is not None:
+            text = self.dependency.call(lambda: client.invoke(prompt).content.strip())
+        else:
+            text = client.invoke(prompt).content.strip()
+        _record_completion(client, prompt, text, started)
+        if key is not None:
+            self._store(key, model, text)
+        return text
+
+    async def acomplete(self, client, prompt: str, bypass: bool = False) -> str:
+        """Async variant of complete() using ``client.ainvoke``."""
+        key, model, cached = await self._acheck(client, prompt, bypass)
+        if cached is not None:
+            record_llm_call(model, cached=True)
+            return cached
+        started = time.perf_counter()
+        if self.dependency is not None:
+            text = await self.dependency.acall(_ainvoke, client, prompt)
+        else:
+            text = await _ainvoke(client, prompt)
+        _record_completion(client, prompt, text, started)
+        if key is not None:
+            await self._astore(key, model, text)
+        return text
+
+    async def astream_complete(self, client, prompt: str, on_token, bypass: bool = False) -> str:
+        """
+        Like acomplete(), but streams the completion through ``client.astream``
+        and awaits ``on_token(piece)`` for each piece. A cache hit is emitted
+        as a single piece.
+        """
+        key, model, cached = await self._acheck(client, prompt, bypass)
+        if cached is not None:
+            record_llm_call(model, cached=True)
+            await on_token(cached)
+            return cached
+        started = time.perf_counter()
+        pieces = []
+
+        async def stream():
+            async for chunk in client.astream(prompt):
+                if chunk.content:
+                    pieces.append(chunk.content)
+                    await on_token(chunk.content)
+
+        if self.dependency is not None:
+            # A retry after tokens reached the caller would repeat them
+            await self.dependency.acall(stream, retry_on=lambda e: not pieces and is_transient(e))
+        else:
+            await stream()
+        text = "".join(pieces).strip()
+        _record_completion(client, prompt, text, started)
+        if key is not None:
+            await self._astore(key, model, text)
+        return text
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self._disk is not None:
+            self._disk.clear()
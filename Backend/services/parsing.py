@@ -0,0 +1,71 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+from core.config import get_settings
+
+settings = get_settings()
+
+
+def pdf_to_text(path: str) -> str:
+    """Extract the text of a PDF file. Runs in a parse worker process."""
+    import fitz
+
+    with fitz.open(path) as pdf:
+        return "".join(page.get_text() for page in pdf)
+
+
+class ParsePool:
+    """
+    Runs CPU-bound document parsing in worker processes, so a large PDF
+    doesn't hold the API process's GIL while other requests wait.
+
+    Workers are spawned on first use. At most ``2 * max_workers`` parses
+    are queued or running; further callers block until one finishes.
+    Arguments and results are pickled across the process boundary, so pass
+    file paths rather than file contents. ``max_workers=0`` parses in the
+    calling thread instead.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(max(1, 2 * max_workers))
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: forking a process that runs threads can deadlock the child
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def run(self, func: Callable, *args):
+        """Call ``func(*args)`` in a worker process and wait for the result. ``func`` must be module-level."""
+        if self.max_workers <= 0:
+            return func(*args)
+        with self._slots:
+            executor = self._get_executor()
+            try:
+                return executor.submit(func, *args).result()
+            except BrokenProcessPool:
+                # A worker died (e.g. crashed on a malformed file); start fresh ones next time
+                with self._lock:
+                    if self._executor is executor:
+                        self._executor = None
+                executor.shutdown(wait=False)
+                raise
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+parse_pool = ParsePool(max_workers=settings.PARSE_POOL_SIZE)
@@ -0,0 +1,310 @@
+import hashlib
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from core.tokens import count_tokens, count_tokens_batch
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_PARAGRAPH = re.compile(r"\n\s*\n")
+
+TRUNCATION_POLICIES = ("fair", "head")
+# Passages tokenized per batch, so token lists for the whole corpus never coexist
+TOKEN_BATCH_SIZE = 256
+
+# Too common to help either near-duplicate detection or ranking
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this "
+    "to was were which with".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [w for w in _WORD.findall(text.lower()) if w not in STOPWORDS]
+
+
+@dataclass(slots=True)
+class Document:
+    source: str
+    index: int  # position of the document within its source
+    text: str
+    truncated: bool = False
+
+
+@dataclass(slots=True)
+class Passage:
+    source: str
+    doc_index: int  # position of the document within its source
+    position: int  # position of the passage within its document
+    text: str
+    score: float = 0.0
+    tokens: int = 0
+
+
+# ---------------------------------------------------------------------------
+# Near-duplicate detection
+# ---------------------------------------------------------------------------
+
+def simhash(text: str, shingle: int = 3) -> int:
+    """64-bit SimHash over word shingles; near-identical texts differ in few bits."""
+    words = tokenize(text)
+    if len(words) < shingle:
+        features = [" ".join(words)] if words else []
+    else:
+        features = [" ".join(words[i:i + shingle]) for i in range(len(words) - shingle + 1)]
+    if not features:
+        return 0
+
+    counts = Counter(features)
+    digests = b"".join(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest() for f in counts)
+    # One row of 64 bits per feature, most significant bit first
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(len(counts), 8), axis=1)
+    weights = np.fromiter(counts.values(), dtype=np.int64, count=len(counts)) @ (2 * bits.astype(np.int64) - 1)
+    return int.from_bytes(np.packbits(weights > 0).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class SimHashIndex:
+    """
+    Finds an earlier fingerprint within ``max_distance`` bits. The 64 bits are
+    split into ``max_distance + 1`` bands; two fingerprints that close must
+    agree exactly on at least one band, so only band collisions are compared.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        width = math.ceil(64 / bands)
+        self._bands = [(i * width, min(width, 64 - i * width)) for i in range(bands)]
+        self._buckets: dict[tuple[int, int], list[int]] = {}
+
+    def _keys(self, fingerprint: int):
+        for i, (shift, width) in enumerate(self._bands):
+            yield i, (fingerprint >> shift) & ((1 << width) - 1)
+
+    def seen(self, fingerprint: int) -> bool:
+        """True if a near-duplicate was already added; otherwise add this one."""
+        for key in self._keys(fingerprint):
+            for other in self._buckets.get(key, ()):
+                if hamming(fingerprint, other) <= self.max_distance:
+                    return True
+        for key in self._keys(fingerprint):
+            self._buckets.setdefault(key, []).append(fingerprint)
+        return False
+
+
+# ---------------------------------------------------------------------------
+# Splitting and ranking
+# ---------------------------------------------------------------------------
+
+def split_passages(text: str, max_words: int = 150) -> list[str]:
+    """
+    Split a document on paragraph breaks, packing short paragraphs together
+    and cutting long ones into ``max_words`` word windows.
+    """
+    passages, current, size = [], [], 0
+    for paragraph in _PARAGRAPH.split(text):
+        words = paragraph.split()
+        if not words:
+            continue
+        if size + len(words) > max_words and current:
+            passages.append(" ".join(current))
+            current, size = [], 0
+        while len(words) > max_words:
+            passages.append(" ".join(words[:max_words]))
+            words = words[max_words:]
+        current.extend(words)
+        size += len(words)
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+def bm25_scores(query: str, passages: list[str], k1: float = 1.5, b: float = 0.75) -> list[float]:
+    """Okapi BM25 score of each passage against the query, with the passages as the corpus."""
+    query_terms = set(tokenize(query))
+    if not passages or not query_terms:
+        return [0.0] * len(passages)
+
+    docs = [Counter(tokenize(p)) for p in passages]
+    lengths = [sum(d.values()) for d in docs]
+    avg_length = (sum(lengths) / len(lengths)) or 1.0
+    n = len(docs)
+    idf = {}
+    for term in query_terms:
+        df = sum(1 for d in docs if term in d)
+        idf[term] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    scores = []
+    for doc, length in zip(docs, lengths):
+        score = 0.0
+        for term in query_terms:
+            tf = doc.get(term)
+            if tf:
+                score += idf[term] * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / avg_length))
+        scores.append(score)
+    return scores
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+def _iter_raw_documents(docs: dict) -> Iterator[Document]:
+    for source, content in docs.items():
+        if isinstance(content, list):
+            for i, text in enumerate(content):
+                if isinstance(text, str) and text.strip():
+                    yield Document(source, i, text)
+        elif isinstance(content, str) and content.strip():
+            yield Document(source, 0, content)
+
+
+def _fair_shares(sizes: dict[str, int], max_chars: int) -> dict[str, int]:
+    """Split max_chars evenly across sources; what a small source doesn't use goes to the others."""
+    shares, remaining = {}, max_chars
+    pending = sorted(sizes, key=sizes.get)
+    while pending:
+        source = pending.pop(0)
+        shares[source] = min(sizes[source], remaining // (len(pending) + 1))
+        remaining -= shares[source]
+    return shares
+
+
+def _truncate(text: str, limit: int) -> str:
+    """Cut text to at most ``limit`` characters, at the last whitespace when there is one."""
+    cut = max(text.rfind(" ", 0, limit + 1), text.rfind("\n", 0, limit + 1))
+    return text[:cut if cut > limit // 2 else limit].rstrip()
+
+
+def iter_documents(docs: dict, max_chars: int = 0, truncation: str = "fair") -> Iterator[Document]:
+    """
+    Documents in afan_out_retrieve's result shape, as Document records, in
+    source order. Nothing is copied unless a document has to be truncated.
+
+    With ``max_chars`` set, at most that many characters are yielded in
+    total. ``truncation`` decides who loses text: "fair" gives every source
+    an equal share (unused share goes to the others), "head" keeps documents
+    in order until the cap is hit. The document that crosses its limit is
+    cut at a word boundary and marked ``truncated``; the rest are dropped.
+    """
+    if truncation not in TRUNCATION_POLICIES:
+        raise ValueError(f"Unknown truncation policy: {truncation}")
+    if max_chars <= 0:
+        yield from _iter_raw_documents(docs)
+        return
+
+    if truncation == "fair":
+        sizes = {}
+        for document in _iter_raw_documents(docs):
+            sizes[document.source] = sizes.get(document.source, 0) + len(document.text)
+        limits = _fair_shares(sizes, max_chars)
+    else:
+        limits = None
+
+    remaining = max_chars
+    current = None
+    for document in _iter_raw_documents(docs):
+        if limits is not None and document.source != current:
+            current = document.source
+            remaining = limits.get(current, 0)
+        if remaining <= 0:
+            continue
+        if len(document.text) > remaining:
+            document.text = _truncate(document.text, remaining)
+            document.truncated = True
+            remaining = 0
+        else:
+            remaining -= len(document.text)
+        if document.text:
+            yield document
+
+
+def select_passages(query: str, docs: dict, token_budget: int = 6000, max_words: int = 150,
+                    dedup_distance: int = 3, min_score: float = 0.0, model: Optional[str] = None,
+                    max_chars: int = 0, truncation: str = "fair") -> tuple[list[Passage], dict]:
+    """
+    Turn retrieved documents into the passages worth summarizing.
+
+    Near-duplicate documents and passages are dropped (SimHash), the rest
+    are ranked by BM25 against the query and taken best-first until
+    ``token_budget`` is used. Selected passages come back in document order
+    so the summarizer still reads them in context. ``max_chars`` and
+    ``truncation`` cap the input as in iter_documents().
+
+    Returns (passages, stats) where stats has documents/passages/duplicates/
+    truncated counts and tokens_in/tokens_out.
+    """
+    token_kwargs = {"model": model} if model else {}
+    doc_index = SimHashIndex(dedup_distance)
+    passage_index = SimHashIndex(dedup_distance)
+    passages = []
+    stats = {"documents": 0, "passages": 0, "duplicates": 0, "truncated": 0, "tokens_in": 0}
+
+    for document in iter_documents(docs, max_chars, truncation):
+        stats["documents"] += 1
+        stats["truncated"] += document.truncated
+        # One document's tokens at a time, rather than the whole corpus's
+        stats["tokens_in"] += count_tokens(document.text, **token_kwargs)
+        if doc_index.seen(simhash(document.text)):
+            stats["duplicates"] += 1
+            continue
+        for position, chunk in enumerate(split_passages(document.text, max_words)):
+            if passage_index.seen(simhash(chunk)):
+                stats["duplicates"] += 1
+                continue
+            passages.append(Passage(document.source, document.index, position, chunk))
+
+    for start in range(0, len(passages), TOKEN_BATCH_SIZE):
+        batch = passages[start:start + TOKEN_BATCH_SIZE]
+        for passage, tokens in zip(batch, count_tokens_batch([p.text for p in batch], **token_kwargs)):
+            passage.tokens = tokens
+    for passage, score in zip(passages, bm25_scores(query, [p.text for p in passages])):
+        passage.score = score
+
+    selected, used = [], 0
+    for passage in sorted(passages, key=lambda p: p.score, reverse=True):
+        if passage.score < min_score and selected:
+            break
+        if used + passage.tokens > token_budget:
+            continue
+        selected.append(passage)
+        used += passage.tokens
+
+    order = {source: n for n, source in enumerate(docs)}
+    selected.sort(key=lambda p: (order.get(p.source, 0), p.doc_index, p.position))
+    stats.update(passages=len(passages), selected=len(selected), tokens_out=used)
+    return selected, stats
+
+
+def format_documents(documents: Iterable[Document]) -> Iterator[str]:
+    """
+    Pieces of the raw (unranked) summarizer input: each source's documents
+    under its header. Meant for ``"".join``, which sizes the result once.
+    """
+    current = None
+    for document in documents:
+        if document.source != current:
+            yield f"\n--- {document.source.upper()} ---\n"
+            current = document.source
+        else:
+            yield "\n"
+        yield document.text
+
+
+def format_passages(passages: list[Passage]) -> str:
+    """Render passages under per-source headers, as the summarizer expects."""
+    parts, current = [], None
+    for passage in passages:
+        if passage.source != current:
+            current = passage.source
+            parts.append(f"\n--- {current.upper()} ---")
+        parts.append(passage.text)
+    return "\n".join(parts)
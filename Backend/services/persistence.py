@@ -1,6 +1,16 @@
+import logging
+import threading
+from typing import Optional
+
+from sqlalchemy import func, insert
+
+from core.config import get_settings
 from db.session import SessionLocal
 from db import models
 
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
 
 def save_message(session_id: int, content: str, role: str = "user"):
     with SessionLocal() as db:
@@ -20,6 +30,157 @@ def save_summary(session_id: int, summary: str):
         return summ
 
 
+def _turn_rows(session_id: int, query: str, summary: Optional[str], critic_review: Optional[dict],
+               include_query: bool = True):
+    messages = [{"session_id": session_id, "content": query, "role": "user"}] if include_query else []
+    summaries = []
+    if summary:
+        messages.append({"session_id": session_id, "content": summary, "role": "assistant"})
+        summaries.append({"session_id": session_id, "summary": summary})
+    if critic_review:
+        verdict = "ok" if critic_review.get("ok", True) else "rejected"
+        messages.append({
+            "session_id": session_id,
+            "content": f"{verdict}: {critic_review.get('reason', '')}",
+            "role": "critic",
+        })
+    return messages, summaries
+
+
+def _bulk_insert(messages: list[dict], summaries: list[dict]):
+    # One transaction, executemany inserts, no refresh round-trips
+    with SessionLocal.begin() as db:
+        if messages:
+            db.execute(insert(models.Message), messages)
+        if summaries:
+            db.execute(insert(models.Summary), summaries)
+
+
+def save_research_turn(session_id: int, query: str, summary: Optional[str] = None,
+                       critic_review: Optional[dict] = None, include_query: bool = True):
+    """
+    Write a whole research turn (user message, assistant message, summary and
+    optional critic review) in a single transaction. ``include_query=False``
+    leaves out the user message, for a retry whose question is already stored.
+    """
+    _bulk_insert(*_turn_rows(session_id, query, summary, critic_review, include_query))
+
+
+class WriteBehindBuffer:
+    """
+    Collects research turns and writes them in batches from a background
+    thread, flushing every ``flush_interval`` seconds or once ``batch_size``
+    turns are waiting. A batch that fails to write goes back to the front of
+    the buffer and is retried on the following flushes; it is dropped (and
+    logged) only after ``max_retries`` failures in a row. Turns still buffered
+    when the process dies are lost.
+    """
+
+    def __init__(self, batch_size: int = 50, flush_interval: float = 1.0, max_retries: int = 5):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._failures = 0
+        self._messages: list[dict] = []
+        self._summaries: list[dict] = []
+        self._turns = 0
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="persistence-flusher", daemon=True)
+        self._thread.start()
+
+    def add(self, session_id: int, query: str, summary: Optional[str] = None,
+            critic_review: Optional[dict] = None, include_query: bool = True):
+        messages, summaries = _turn_rows(session_id, query, summary, critic_review, include_query)
+        with self._cond:
+            self._messages.extend(messages)
+            self._summaries.extend(summaries)
+            self._turns += 1
+            if self._turns >= self.batch_size:
+                self._cond.notify()
+
+    def flush(self) -> bool:
+        """Write everything buffered; returns False if the write failed."""
+        with self._cond:
+            messages, summaries, turns = self._messages, self._summaries, self._turns
+            self._messages, self._summaries, self._turns = [], [], 0
+        if not (messages or summaries):
+            return True
+        try:
+            _bulk_insert(messages, summaries)
+            self._failures = 0
+            return True
+        except Exception as e:
+            self._failures += 1
+            if self._failures > self.max_retries:
+                logger.error(
+                    f"Dropping {len(messages)} buffered messages after {self._failures} failed flushes: {str(e)}"
+                )
+                self._failures = 0
+                return False
+            logger.warning(f"Write-behind flush of {len(messages)} messages failed, will retry: {str(e)}")
+            with self._cond:
+                # Back in front of anything added meanwhile, so rows keep their order
+                self._messages[:0] = messages
+                self._summaries[:0] = summaries
+                self._turns += turns
+            return False
+
+    def close(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join(timeout=self.flush_interval * 2)
+        if not self.flush() and self._messages:
+            logger.error(f"{len(self._messages)} buffered messages were not written before shutdown")
+
+    def _run(self):
+        failed = False
+        while True:
+            with self._cond:
+                # After a failure, wait out the interval even if a full batch is queued
+                if not self._stopped and (failed or self._turns < self.batch_size):
+                    self._cond.wait(self.flush_interval)
+                stopped = self._stopped
+            failed = not self.flush()
+            if stopped:
+                return
+
+
+_buffer: Optional[WriteBehindBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def get_write_buffer() -> WriteBehindBuffer:
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = WriteBehindBuffer(
+                batch_size=settings.PERSISTENCE_BATCH_SIZE,
+                flush_interval=settings.PERSISTENCE_FLUSH_INTERVAL,
+                max_retries=settings.PERSISTENCE_FLUSH_RETRIES,
+            )
+        return _buffer
+
+
+def record_research_turn(session_id: int, query: str, summary: Optional[str] = None,
+                         critic_review: Optional[dict] = None, include_query: bool = True):
+    """Persist a research turn now, or hand it to the write-behind buffer if enabled."""
+    if settings.PERSISTENCE_WRITE_BEHIND:
+        get_write_buffer().add(session_id, query, summary, critic_review, include_query)
+    else:
+        save_research_turn(session_id, query, summary, critic_review, include_query)
+
+
+def close_write_buffer():
+    """Flush and stop the write-behind buffer, if one was started."""
+    global _buffer
+    with _buffer_lock:
+        buffer, _buffer = _buffer, None
+    if buffer is not None:
+        buffer.close()
+
+
 def get_messages(session_id: int):
     with SessionLocal() as db:
         return (
@@ -36,3 +197,33 @@ def get_summaries(session_id: int):
             .filter(models.Summary.session_id == session_id)
             .all()
         )
+
+
+def get_latest_summary(session_id: int) -> Optional[str]:
+    with SessionLocal() as db:
+        return (
+            db.query(models.Summary.summary)
+            .filter(models.Summary.session_id == session_id)
+            .order_by(models.Summary.id.desc())
+            .limit(1)
+            .scalar()
+        )
+
+
+def get_session_summaries(batch_size: int = 1000):
+    """Yield (session_id, query, latest summary) for every session that has a summary."""
+    with SessionLocal() as db:
+        latest = (
+            db.query(models.Summary.session_id, func.max(models.Summary.id).label("summary_id"))
+            .group_by(models.Summary.session_id)
+            .subquery()
+        )
+        rows = (
+            db.query(models.ResearchSession.id, models.ResearchSession.query, models.Summary.summary)
+            .join(latest, latest.c.session_id == models.ResearchSession.id)
+            .join(models.Summary, models.Summary.id == latest.c.summary_id)
+            .order_by(models.ResearchSession.id)
+            .yield_per(batch_size)
+        )
+        for row in rows:
+            yield row.id, row.query, row.summary
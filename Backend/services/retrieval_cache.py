@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+# Seconds a cached result stays fresh, per source
+DEFAULT_TTLS = {
+    "arxiv": 7 * 24 * 3600,  # papers don't change
+    "wikipedia": 24 * 3600,
+    "web": 3600,
+}
+FALLBACK_TTL = 3600
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def make_cache_key(source: str, query: str, params: Optional[dict] = None) -> str:
+    """Content-addressed key over normalized query + source + params."""
+    payload = json.dumps(
+        {"source": source, "query": normalize_query(query), "params": params or {}},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RetrievalCache:
+    """
+    Interface for retrieval caches. Subclasses override get/set;
+    get_or_fetch is what the retriever calls.
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        return None
+
+    def set(self, key: str, source: str, value: Any) -> None:
+        pass
+
+    def get_or_fetch(self, source: str, query: str, fetch: Callable[[], Any],
+                     params: Optional[dict] = None,
+                     should_cache: Callable[[Any], bool] = lambda value: True) -> Any:
+        return fetch()
+
+    def stats(self) -> dict:
+        return {}
+
+    def clear(self) -> None:
+        pass
+
+
+class NullRetrievalCache(RetrievalCache):
+    """Cache that never stores anything, used when caching is disabled."""
+
+
+class SqliteCacheTier:
+    """
+    On-disk tier: one row per key, evicts least recently accessed rows past max_entries.
+
+    Reads never write: access times of hits are kept in memory and applied
+    with the next set(), just before eviction runs.
+    """
+
+    def __init__(self, path: str, max_entries: int, table: str = "retrieval_cache"):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._accessed = {}  # key -> access time not yet written
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " key TEXT PRIMARY KEY,"
+            " source TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_accessed_at"
+            f" ON {table} (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at <= now:
+                # Expired rows are deleted by the next set()
+                return None
+            self._accessed[key] = now
+        return json.loads(value), expires_at
+
+    def set(self, key: str, source: str, value: Any, expires_at: float):
+        now = time.time()
+        with self._lock:
+            if self._accessed:
+                self._conn.executemany(
+                    f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+                    [(at, k) for k, at in self._accessed.items()],
+                )
+                self._accessed.clear()
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, source, value, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, source, json.dumps(value), expires_at, now),
+            )
+            self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f" SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._accessed.clear()
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+
+class TieredRetrievalCache(RetrievalCache):
+    """
+    In-memory LRU in front of an optional SQLite tier.
+
+    Concurrent lookups for the same key while a fetch is in flight wait on
+    that fetch instead of starting their own.
+    """
+
+    def __init__(self, max_memory_entries: int = 256, disk_path: Optional[str] = None,
+                 max_disk_entries: int = 5000, ttls: Optional[dict] = None):
+        self.max_memory_entries = max_memory_entries
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._memory = OrderedDict()  # key -> (value, expires_at)
+        self._inflight = {}  # key -> Future
+        self._lock = threading.Lock()
+        self._disk = SqliteCacheTier(disk_path, max_disk_entries) if disk_path else None
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "coalesced": 0, "misses": 0, "evictions": 0}
+
+    def ttl_for(self, source: str) -> float:
+        return self.ttls.get(source, FALLBACK_TTL)
+
+    def _memory_get(self, key: str):
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.time():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return entry
+
+    def _memory_set(self, key: str, value: Any, expires_at: float):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._memory_get(key)
+        if entry is None and self._disk is not None:
+            entry = self._disk.get(key)
+            if entry is not None:
+                with self._lock:
+                    self._memory_set(key, *entry)
+        return entry[0] if entry is not None else None
+
+    def set(self, key: str, source: str, value: Any) -> None:
+        expires_at = time.time() + self.ttl_for(source)
+        with self._lock:
+            self._memory_set(key, value, expires_at)
+        if self._disk is not None:
+            self._disk.set(key, source, value, expires_at)
+
+    def get_or_fetch(self, source: str, query: str, fetch: Callable[[], Any],
+                     params: Optional[dict] = None,
+                     should_cache: Callable[[Any], bool] = lambda value: True) -> Any:
+        key = make_cache_key(source, query, params)
+
+        with self._lock:
+            entry = self._memory_get(key)
+            if entry is not None:
+                self._stats["memory_hits"] += 1
+                return entry[0]
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self._stats["coalesced"] += 1
+
+        if inflight is not None:
+            return inflight.result()
+
+        try:
+            entry = self._disk.get(key) if self._disk is not None else None
+            if entry is not None:
+                value = entry[0]
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+                    self._memory_set(key, *entry)
+            else:
+                with self._lock:
+                    self._stats["misses"] += 1
+                value = fetch()
+                if should_cache(value):
+                    self.set(key, source, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        hits = stats["memory_hits"] + stats["disk_hits"] + stats["coalesced"]
+        lookups = hits + stats["misses"]
+        stats["hits"] = hits
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self._disk is not None:
+            self._disk.clear()
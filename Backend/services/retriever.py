@@ -3,75 +3,402 @@ import warnings
 warnings.filterwarnings("ignore", message=".*looks like you're parsing an HTML document with an XML parser.*", category=UserWarning)
 warnings.filterwarnings("ignore", message=".*No parser was explicitly specified.*", category=UserWarning)
 
-try:
-    from langchain_community.document_loaders import ArxivLoader, WikipediaLoader
-    from langchain_community.tools import DuckDuckGoSearchResults
-    IMPORTS_AVAILABLE = True
-except ImportError as e:
-    IMPORTS_AVAILABLE = False
-    IMPORT_ERROR = str(e)
+import asyncio
+import logging
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from core.config import get_settings
+from core.metrics import record_source
+from core.resilience import get_dependency
+from services.corpus import CorpusDocument, DocumentCorpus, make_doc_id
+from services.parsing import parse_pool, pdf_to_text
+from services.retrieval_cache import NullRetrievalCache, RetrievalCache, TieredRetrievalCache
+from services.sources import FixtureProvider, SourceProvider, get_provider, register_provider
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _community_import_error() -> Optional[str]:
+    """
+    Why the langchain_community loaders can't be used, or None if they can.
+    Checked on the first fetch rather than at import, since they are slow to import.
+    """
+    try:
+        import langchain_community.document_loaders  # noqa: F401
+        import langchain_community.tools  # noqa: F401
+    except ImportError as e:
+        return str(e)
+    return None
+
+_corpus: Optional[DocumentCorpus] = None
+_corpus_lock = threading.Lock()
+
+
+def get_corpus() -> Optional[DocumentCorpus]:
+    """The local document corpus, opened on first use; None when disabled."""
+    global _corpus
+    if not (settings.CORPUS_ENABLED and settings.CORPUS_PATH):
+        return None
+    with _corpus_lock:
+        if _corpus is None:
+            _corpus = DocumentCorpus(settings.CORPUS_PATH)
+        return _corpus
+
+
+def _search_corpus(corpus_source: str, query: str, limit: int) -> Optional[list[str]]:
+    """
+    Texts from the local corpus when it can answer on its own; None when the
+    remote source should be searched.
+
+    Offline, the corpus's own full-text matches are the answer. Online, the
+    remote search always runs (it is cheap, and full-text matches can miss
+    papers the source would rank higher) unless the same query was searched
+    remotely within CORPUS_SEARCH_TTL; stored documents are never re-downloaded.
+    """
+    corpus = get_corpus()
+    if corpus is None:
+        return [] if settings.CORPUS_OFFLINE else None
+    if settings.CORPUS_OFFLINE:
+        return [d.text for d in corpus.search(query, source=corpus_source, limit=limit)]
+    repeat = corpus.recorded_search(corpus_source, query, settings.CORPUS_SEARCH_TTL)
+    if repeat is not None:
+        return [d.text for d in repeat[:limit]]
+    return None
+
+
+def _fetch_arxiv_missing(corpus: DocumentCorpus, query: str, max_results: int) -> list[str]:
+    """
+    Search arXiv, then download and parse only the papers the corpus doesn't
+    have yet. A paper that fails to download or parse is skipped, like
+    ArxivLoader does; the others are still stored and returned.
+    """
+    import arxiv
+
+    arxiv_api = get_dependency("arxiv")
+    search = arxiv.Search(query=query.replace(":", "").replace("-", "")[:300], max_results=max_results)
+    texts, new_docs, doc_ids = [], [], []
+    skipped = 0
+    for result in arxiv_api.call(lambda: list(search.results())):
+        doc_id = make_doc_id("arxiv", result.get_short_id())
+        doc_ids.append(doc_id)
+        stored = corpus.get(doc_id)
+        if stored is not None:
+            texts.append(stored.text)
+            continue
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                # Download in this thread (I/O, retried); parse in a worker process (CPU)
+                path = arxiv_api.call(result.download_pdf, dirpath=tmp)
+                text = parse_pool.run(pdf_to_text, path)
+        except Exception as e:
+            logger.warning(f"Skipping arXiv paper {doc_id}: {str(e)}")
+            skipped += 1
+            continue
+        new_docs.append(CorpusDocument(
+            doc_id=doc_id,
+            source="arxiv",
+            title=result.title,
+            text=text,
+            metadata={
+                "entry_id": result.entry_id,
+                "published": str(result.published.date()),
+                "authors": [a.name for a in result.authors],
+                "summary": result.summary,
+            },
+        ))
+        texts.append(text)
+    corpus.add(new_docs)
+    if not skipped:
+        # With a paper missing, a repeat of the query searches again and retries it
+        corpus.record_search("arxiv", query, doc_ids)
+    return texts
 
 
 def fetch_from_arxiv(query: str, max_results: int = 3):
-    if not IMPORTS_AVAILABLE:
-        return [f"ArXiv access unavailable. Missing dependencies: {IMPORT_ERROR}. Install with: pip install arxiv"]
+    local = _search_corpus("arxiv", query, max_results)
+    if local is not None:
+        return local
+
+    import_error = _community_import_error()
+    if import_error:
+        return [f"ArXiv access unavailable. Missing dependencies: {import_error}. Install with: pip install arxiv"]
     
     try:
+        corpus = get_corpus()
+        if corpus is not None:
+            return _fetch_arxiv_missing(corpus, query, max_results)
+        from langchain_community.document_loaders import ArxivLoader
+
         loader = ArxivLoader(query=query, max_results=max_results)
-        docs = loader.load()
+        docs = get_dependency("arxiv").call(loader.load)
         return [d.page_content for d in docs]
     except Exception as e:
         return [f"Error fetching from ArXiv: {str(e)}"]
 
 
+# Same limits WikipediaLoader applies by default
+WIKIPEDIA_MAX_DOCS = 25
+WIKIPEDIA_MAX_CHARS = 4000
+
+
+def _load_wikipedia_page(wikipedia, title: str):
+    page = wikipedia.page(title=title, auto_suggest=False)
+    page.content  # lazy attribute; fetch it inside the retried call
+    return page
+
+
+def _fetch_wikipedia_missing(corpus: DocumentCorpus, query: str, lang: str) -> list[str]:
+    """Search Wikipedia, then download only the pages the corpus doesn't have yet."""
+    import wikipedia
+
+    wikipedia_api = get_dependency("wikipedia")
+    corpus_source = f"wikipedia.{lang}"
+    wikipedia.set_lang(lang)
+    texts, new_docs, doc_ids = [], [], []
+    for title in wikipedia_api.call(wikipedia.search, query[:300], results=WIKIPEDIA_MAX_DOCS):
+        stored = corpus.get_by_title(corpus_source, title)
+        if stored is None:
+            try:
+                page = wikipedia_api.call(_load_wikipedia_page, wikipedia, title)
+            except (wikipedia.exceptions.PageError, wikipedia.exceptions.DisambiguationError):
+                continue
+            # A redirect can land on a page already stored under another title
+            doc_id = make_doc_id(corpus_source, page.pageid)
+            stored = corpus.get(doc_id)
+            if stored is None:
+                stored = CorpusDocument(
+                    doc_id=doc_id,
+                    source=corpus_source,
+                    title=title,
+                    text=page.content,
+                    metadata={"pageid": page.pageid, "url": page.url},
+                )
+                new_docs.append(stored)
+        doc_ids.append(stored.doc_id)
+        texts.append(stored.text[:WIKIPEDIA_MAX_CHARS])
+    corpus.add(new_docs)
+    corpus.record_search(corpus_source, query, doc_ids)
+    return texts
+
+
 def fetch_from_wikipedia(query: str, lang: str = "en"):
-    if not IMPORTS_AVAILABLE:
-        return [f"Wikipedia access unavailable. Missing dependencies: {IMPORT_ERROR}. Install with: pip install wikipedia"]
+    local = _search_corpus(f"wikipedia.{lang}", query, WIKIPEDIA_MAX_DOCS)
+    if local is not None:
+        return [text[:WIKIPEDIA_MAX_CHARS] for text in local]
+
+    import_error = _community_import_error()
+    if import_error:
+        return [f"Wikipedia access unavailable. Missing dependencies: {import_error}. Install with: pip install wikipedia"]
     
     try:
+        corpus = get_corpus()
+        if corpus is not None:
+            return _fetch_wikipedia_missing(corpus, query, lang)
+        from langchain_community.document_loaders import WikipediaLoader
+
         loader = WikipediaLoader(query=query, lang=lang)
-        docs = loader.load()
+        docs = get_dependency("wikipedia").call(loader.load)
         return [d.page_content for d in docs]
     except Exception as e:
         return [f"Error fetching from Wikipedia: {str(e)}"]
 
 
 def fetch_from_web(query: str, max_results: int = 3):
-    if not IMPORTS_AVAILABLE:
-        return [f"Web search unavailable. Missing dependencies: {IMPORT_ERROR}. Install with: pip install duckduckgo-search"]
+    if settings.CORPUS_OFFLINE:
+        return []
+
+    import_error = _community_import_error()
+    if import_error:
+        return [f"Web search unavailable. Missing dependencies: {import_error}. Install with: pip install duckduckgo-search"]
     
     try:
+        from langchain_community.tools import DuckDuckGoSearchResults
+
         search = DuckDuckGoSearchResults()
-        results = search.run(query, max_results=max_results)
+        results = get_dependency("web").call(search.run, query, max_results=max_results)
         return results
     except Exception as e:
         return [f"Error fetching from web: {str(e)}"]
 
 
-def retrieve_from_sources(query: str, sources: list[str] = ["arxiv", "wikipedia"]):
+def register_live_providers():
+    register_provider(SourceProvider(
+        "arxiv", fetch_from_arxiv, params={"max_results": 3},
+        max_concurrency=settings.SOURCE_CONCURRENCY.get("arxiv", 4),
+        rate_limit=settings.SOURCE_RATE_LIMITS.get("arxiv"),
+    ))
+    register_provider(SourceProvider(
+        "wikipedia", fetch_from_wikipedia, params={"lang": "en"},
+        max_concurrency=settings.SOURCE_CONCURRENCY.get("wikipedia", 4),
+        rate_limit=settings.SOURCE_RATE_LIMITS.get("wikipedia"),
+    ))
+    register_provider(SourceProvider(
+        "web", fetch_from_web, params={"max_results": 3},
+        max_concurrency=settings.SOURCE_CONCURRENCY.get("web", 4),
+        rate_limit=settings.SOURCE_RATE_LIMITS.get("web"),
+    ))
+
+
+def register_fixture_providers(latency: Optional[float] = None, words: Optional[int] = None):
+    """Swap the live sources for deterministic offline fixtures (benchmarks, tests, demos)."""
+    for name in ("arxiv", "wikipedia", "web"):
+        register_provider(FixtureProvider(
+            name,
+            latency=settings.FIXTURE_LATENCY if latency is None else latency,
+            words=settings.FIXTURE_WORDS if words is None else words,
+            max_concurrency=settings.SOURCE_CONCURRENCY.get(name, 4),
+        ))
+
+
+if settings.SOURCE_PROVIDERS == "fixture":
+    register_fixture_providers()
+else:
+    register_live_providers()
+
+DEFAULT_SOURCES = ("arxiv", "wikipedia")
+
+_cache: Optional[RetrievalCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_retrieval_cache() -> RetrievalCache:
+    """The process-wide retrieval cache, opened on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            if settings.RETRIEVAL_CACHE_ENABLED:
+                _cache = TieredRetrievalCache(
+                    max_memory_entries=settings.RETRIEVAL_CACHE_MEMORY_ENTRIES,
+                    disk_path=settings.RETRIEVAL_CACHE_PATH or None,
+                    max_disk_entries=settings.RETRIEVAL_CACHE_DISK_ENTRIES,
+                )
+            else:
+                _cache = NullRetrievalCache()
+        return _cache
+
+
+def set_retrieval_cache(cache: RetrievalCache) -> None:
+    """Swap the retrieval cache, e.g. NullRetrievalCache() to disable it."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+
+def _is_cacheable(result) -> bool:
+    # Fetchers report failures as a single error string; never cache those
+    if isinstance(result, list) and len(result) == 1 and isinstance(result[0], str):
+        return not result[0].startswith(("Error ", "ArXiv access unavailable",
+                                         "Wikipedia access unavailable", "Web search unavailable"))
+    return bool(result)
+
+
+def _fetch_cached(provider: SourceProvider, query: str):
+    return get_retrieval_cache().get_or_fetch(
+        provider.name,
+        query,
+        lambda: provider.run(query),
+        params=provider.params,
+        should_cache=_is_cacheable,
+    )
+
+
+async def afan_out_retrieve(
+    query: str,
+    sources: Iterable[str] = DEFAULT_SOURCES,
+    source_timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
+    on_result=None,
+    on_documents=None,
+):
+    """
+    Query every source in parallel and collect whatever finishes in time.
+    The loaders are blocking, so they run on each provider's own threads
+    (see SourceProvider.submit), but the event loop is never blocked waiting on them.
+
+    Args:
+        query: The search query
+        sources: Registered source names, e.g. "arxiv", "wikipedia", "web"
+        source_timeout: Max seconds to wait for any single source
+        deadline: Max seconds for the whole fan-out
+        on_result: ``on_result(source, timing)`` is awaited as each source finishes or times out
+        on_documents: ``on_documents(source, documents)`` is awaited as soon as a source
+            returns successfully, so callers can start work on it before the rest land
+
+    Returns:
+        Tuple of (results, timings). ``results`` maps each source to its
+        documents (or an error string); ``timings`` maps each source to
+        {"status": "ok" | "error" | "timeout", "elapsed": seconds}.
+    """
+    source_timeout = settings.RETRIEVAL_SOURCE_TIMEOUT if source_timeout is None else source_timeout
+    deadline = settings.RETRIEVAL_DEADLINE if deadline is None else deadline
+
+    results = {}
+    timings = {}
+    started = time.perf_counter()
+    pending = {}
+
+    for source in dict.fromkeys(sources):
+        provider = get_provider(source)
+        if provider is None:
+            results[source] = f"Unknown source: {source}"
+            timings[source] = {"status": "error", "elapsed": 0.0}
+            continue
+        pending[asyncio.wrap_future(provider.submit(_fetch_cached, provider, query))] = source
+
+    # Sources all start together, so the effective wait is the tighter of the two limits
+    wait_limit = min(source_timeout, deadline)
+    while pending:
+        remaining = wait_limit - (time.perf_counter() - started)
+        if remaining <= 0:
+            break
+        done, _ = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+        for future in done:
+            source = pending.pop(future)
+            elapsed = round(time.perf_counter() - started, 3)
+            try:
+                results[source] = future.result()
+                timings[source] = {"status": "ok", "elapsed": elapsed}
+            except Exception as e:
+                results[source] = f"Error retrieving from {source}: {str(e)}"
+                timings[source] = {"status": "error", "elapsed": elapsed}
+            record_source(source, timings[source], results[source])
+            if on_result is not None:
+                await on_result(source, timings[source])
+            if on_documents is not None and timings[source]["status"] == "ok":
+                await on_documents(source, results[source])
+
+    # Anything still running is abandoned; the caller gets partial results
+    for future, source in pending.items():
+        future.cancel()
+        results[source] = f"Timed out retrieving from {source} after {wait_limit}s"
+        timings[source] = {"status": "timeout", "elapsed": round(time.perf_counter() - started, 3)}
+        record_source(source, timings[source])
+        logger.warning(f"Retrieval from {source} timed out after {wait_limit}s")
+        if on_result is not None:
+            await on_result(source, timings[source])
+
+    return results, timings
+
+
+def retrieve_from_sources(query: str, sources: Iterable[str] = DEFAULT_SOURCES):
     """
     Retrieve information from multiple sources based on the query.
     
     Args:
         query: The search query
-        sources: List of sources to search from. Supported: "arxiv", "wikipedia", "web"
+        sources: Registered source names to search, e.g. "arxiv", "wikipedia", "web"
     
     Returns:
         Dictionary with results from each source
+
+    Blocking wrapper around afan_out_retrieve() for scripts; don't call it
+    from a running event loop.
     """
-    results = {}
-    
-    for source in sources:
-        try:
-            if source == "arxiv":
-                results[source] = fetch_from_arxiv(query)
-            elif source == "wikipedia":
-                results[source] = fetch_from_wikipedia(query)
-            elif source == "web":
-                results[source] = fetch_from_web(query)
-            else:
-                results[source] = f"Unknown source: {source}"
-        except Exception as e:
-            results[source] = f"Error retrieving from {source}: {str(e)}"
-    
+    results, _ = asyncio.run(afan_out_retrieve(query, sources))
     return results
@@ -0,0 +1,246 @@
+import logging
+import os
+import re
+import threading
+import zlib
+from typing import Optional
+
+import numpy as np
+
+from core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+KIND_QUERY = 0
+KIND_SUMMARY = 1
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbedder:
+    """
+    Dependency-free embedder: hashed unigrams and bigrams with signed
+    buckets, L2-normalized. Good enough to spot near-duplicate queries.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def _features(self, text: str) -> list[str]:
+        words = _WORD.findall(text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                matrix[row, h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+class SentenceTransformerEmbedder:
+    """Local CPU model via sentence-transformers (optional dependency)."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        return self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+def make_embedder(model_name: str = "", dim: int = 512):
+    if model_name:
+        try:
+            return SentenceTransformerEmbedder(model_name)
+        except Exception as e:
+            logger.warning(f"Embedding model {model_name} unavailable ({e}); using hashing embedder")
+    return HashingEmbedder(dim)
+
+
+class VectorIndex:
+    """
+    Append-only on-disk vector store: a raw float32 matrix plus parallel
+    session-id and kind arrays, memory-mapped for search. Vectors are
+    unit-length, so cosine similarity is a dot product.
+
+    The ids file is written last and its length defines how many rows
+    exist; rows left in the other files by an interrupted append are cut off
+    on open and before every append, so they can't shift later rows.
+    """
+
+    def __init__(self, directory: str, dim: int, name: str = "hash"):
+        self.dim = dim
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        # Vectors from different embedders don't mix, so each gets its own files
+        prefix = os.path.join(directory, f"{re.sub(r'[^A-Za-z0-9_-]+', '_', name)}.{dim}")
+        self._vectors_path = f"{prefix}.vectors.f32"
+        self._ids_path = f"{prefix}.ids.i64"
+        self._kinds_path = f"{prefix}.kinds.u8"
+        self._backfilled_path = f"{prefix}.backfilled"
+        self._lock = threading.Lock()
+        self._mapped = None  # (vectors, ids, kinds) for the current size
+        self._session_ids = None  # ids already indexed, loaded on first use
+        with self._lock:
+            self._truncate_to_complete_rows()
+
+    def __len__(self) -> int:
+        return os.path.getsize(self._ids_path) // 8 if os.path.exists(self._ids_path) else 0
+
+    def __contains__(self, session_id: int) -> bool:
+        with self._lock:
+            return session_id in self._indexed()
+
+    def _truncate_to_complete_rows(self):
+        row_bytes = {self._ids_path: 8, self._vectors_path: 4 * self.dim, self._kinds_path: 1}
+        sizes = {path: os.path.getsize(path) if os.path.exists(path) else 0 for path in row_bytes}
+        rows = min(sizes[path] // size for path, size in row_bytes.items())
+        for path, size in row_bytes.items():
+            if sizes[path] > rows * size:
+                logger.warning(f"Truncating {path} to {rows} rows after an interrupted append")
+                with open(path, "r+b") as f:
+                    f.truncate(rows * size)
+                self._mapped = self._session_ids = None
+
+    def _indexed(self) -> set:
+        if self._session_ids is None:
+            n = len(self)
+            self._session_ids = set(np.fromfile(self._ids_path, dtype=np.int64, count=n).tolist()) if n else set()
+        return self._session_ids
+
+    def append(self, ids: list[int], kinds: list[int], vectors: np.ndarray, skip_indexed: bool = False):
+        """
+        Add rows. With ``skip_indexed``, rows whose id was already in the
+        index before this call are dropped, so two writers indexing the same
+        session don't both add it.
+        """
+        with self._lock:
+            self._truncate_to_complete_rows()
+            if skip_indexed:
+                indexed = self._indexed()
+                keep = [i for i, row_id in enumerate(ids) if row_id not in indexed]
+                if not keep:
+                    return
+                ids, kinds, vectors = [ids[i] for i in keep], [kinds[i] for i in keep], vectors[keep]
+            with open(self._vectors_path, "ab") as f:
+                f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            with open(self._kinds_path, "ab") as f:
+                f.write(np.asarray(kinds, dtype=np.uint8).tobytes())
+            # ids last: its size defines how many complete rows exist
+            with open(self._ids_path, "ab") as f:
+                f.write(np.asarray(ids, dtype=np.int64).tobytes())
+            if self._session_ids is not None:
+                self._session_ids.update(ids)
+            self._mapped = None
+
+    def is_backfilled(self) -> bool:
+        return os.path.exists(self._backfilled_path)
+
+    def mark_backfilled(self):
+        with open(self._backfilled_path, "w") as f:
+            f.write(f"{len(self)}\n")
+
+    def _map(self):
+        n = len(self)
+        if self._mapped is None or len(self._mapped[1]) != n:
+            if n == 0:
+                return None
+            vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(n, self.dim))
+            ids = np.memmap(self._ids_path, dtype=np.int64, mode="r", shape=(n,))
+            kinds = np.memmap(self._kinds_path, dtype=np.uint8, mode="r", shape=(n,))
+            self._mapped = (vectors, ids, kinds)
+        return self._mapped
+
+    def search(self, vector: np.ndarray, k: int = 5, kind: Optional[int] = None) -> list[tuple[int, float]]:
+        """Top-k (session_id, cosine) pairs, best first."""
+        with self._lock:
+            mapped = self._map()
+        if mapped is None:
+            return []
+        vectors, ids, kinds = mapped
+        scores = vectors @ vector.astype(np.float32)
+        if kind is not None:
+            scores = np.where(kinds == kind, scores, -np.inf)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+
+class SemanticCache:
+    """Finds earlier research sessions whose query is close enough to reuse."""
+
+    def __init__(self, directory: str, threshold: float, model_name: str = "", dim: int = 512):
+        self.threshold = threshold
+        self.embedder = make_embedder(model_name, dim)
+        self.index = VectorIndex(directory, self.embedder.dim, name=model_name if not isinstance(self.embedder, HashingEmbedder) else "hash")
+
+    def add(self, session_id: int, query: str, summary: Optional[str] = None):
+        if session_id in self.index:
+            return
+        texts, kinds = [query], [KIND_QUERY]
+        if summary:
+            texts.append(summary)
+            kinds.append(KIND_SUMMARY)
+        self.index.append([session_id] * len(texts), kinds, self.embedder.embed(texts), skip_indexed=True)
+
+    def search(self, text: str, k: int = 5, kind: Optional[int] = None) -> list[tuple[int, float]]:
+        return self.index.search(self.embedder.embed([text])[0], k=k, kind=kind)
+
+    def lookup(self, query: str) -> Optional[tuple[int, float]]:
+        """Best earlier session whose query clears the threshold, as (session_id, score)."""
+        matches = self.search(query, k=1, kind=KIND_QUERY)
+        if matches and matches[0][1] >= self.threshold:
+            return matches[0]
+        return None
+
+    def backfill(self, rows, batch_size: int = 1000):
+        """
+        Index (session_id, query, summary) rows in batches, skipping sessions
+        already indexed, then mark the index as backfilled. An interrupted
+        backfill can simply be run again.
+        """
+        ids, kinds, texts = [], [], []
+        for session_id, query, summary in rows:
+            if session_id in self.index:
+                continue
+            ids.append(session_id)
+            kinds.append(KIND_QUERY)
+            texts.append(query)
+            if summary:
+                ids.append(session_id)
+                kinds.append(KIND_SUMMARY)
+                texts.append(summary)
+            if len(texts) >= batch_size:
+                self.index.append(ids, kinds, self.embedder.embed(texts), skip_indexed=True)
+                ids, kinds, texts = [], [], []
+        if texts:
+            self.index.append(ids, kinds, self.embedder.embed(texts), skip_indexed=True)
+        self.index.mark_backfilled()
+
+
+_cache: Optional[SemanticCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """The process-wide semantic cache, or None when disabled."""
+    global _cache
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SemanticCache(
+                directory=settings.SEMANTIC_CACHE_DIR,
+                threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+                model_name=settings.SEMANTIC_EMBEDDING_MODEL,
+                dim=settings.SEMANTIC_HASH_DIM,
+            )
+        return _cache
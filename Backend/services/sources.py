@@ -0,0 +1,138 @@
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+class RateLimiter:
+    """Token bucket: ``rate`` calls per second with bursts of up to ``burst``. Blocks until a token is free."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SourceProvider:
+    """
+    A named document source. ``fetch(query, **params)`` returns a list of
+    document texts (or a single error string in a list, like the loaders).
+
+    Work submitted through ``submit`` runs on the provider's own
+    ``max_concurrency`` threads, so a slow or rate-limited source queues
+    behind itself instead of taking threads from the other sources. ``run``
+    is additionally limited to ``rate_limit`` calls per second if set.
+    ``params`` are passed to fetch and are part of the retrieval cache key.
+    """
+
+    def __init__(self, name: str, fetch: Optional[Callable] = None, params: Optional[dict] = None,
+                 max_concurrency: int = 4, rate_limit: Optional[float] = None):
+        self.name = name
+        self.params = params or {}
+        if fetch is not None:
+            self.fetch = fetch
+        self.max_concurrency = max_concurrency
+        self._limiter = RateLimiter(rate_limit) if rate_limit else None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def fetch(self, query: str, **params) -> list[str]:
+        raise NotImplementedError
+
+    def run(self, query: str):
+        if self._limiter is not None:
+            # Only ever waits on one of this provider's own threads
+            self._limiter.acquire()
+        return self.fetch(query, **self.params)
+
+    def submit(self, func: Callable, *args) -> Future:
+        """Run ``func(*args)`` on this provider's threads; they are started on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(1, self.max_concurrency),
+                    thread_name_prefix=f"source-{self.name}",
+                )
+            return self._executor.submit(func, *args)
+
+    def close(self):
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_FIXTURE_WORDS = (
+    "model data method results network learning training performance analysis system "
+    "approach algorithm evaluation experiment theory structure function energy process "
+    "research quantum signal error measurement distribution sample feature layer graph"
+).split()
+
+
+class FixtureProvider(SourceProvider):
+    """
+    Offline stand-in for a live source: sleeps ``latency`` seconds and returns
+    ``documents`` deterministic pseudo-documents of ``words`` words each,
+    seeded by source name and query so repeated runs see the same text.
+    """
+
+    def __init__(self, name: str, latency: float = 0.2, words: int = 2000, documents: int = 3, **kwargs):
+        params = {"fixture": True, "latency": latency, "words": words, "documents": documents}
+        super().__init__(name, params=params, **kwargs)
+
+    def fetch(self, query: str, fixture: bool = True, latency: float = 0.2, words: int = 2000,
+              documents: int = 3) -> list[str]:
+        time.sleep(latency)
+        query_words = query.split() or ["research"]
+        docs = []
+        for i in range(documents):
+            rng = random.Random(f"{self.name}:{query}:{i}")
+            vocabulary = _FIXTURE_WORDS + query_words
+            paragraphs = []
+            for start in range(0, words, 80):
+                paragraphs.append(" ".join(rng.choice(vocabulary) for _ in range(min(80, words - start))) + ".")
+            docs.append(f"{self.name} fixture document {i + 1} on {query}\n\n" + "\n\n".join(paragraphs))
+        return docs
+
+
+_providers: dict[str, SourceProvider] = {}
+
+
+def register_provider(provider: SourceProvider, replace: bool = True) -> SourceProvider:
+    """Make a provider available under its name; an existing one is replaced unless ``replace`` is False."""
+    if not replace and provider.name in _providers:
+        raise ValueError(f"Source provider already registered: {provider.name}")
+    previous = _providers.get(provider.name)
+    _providers[provider.name] = provider
+    if previous is not None and previous is not provider:
+        previous.close()
+    return provider
+
+
+def unregister_provider(name: str) -> None:
+    provider = _providers.pop(name, None)
+    if provider is not None:
+        provider.close()
+
+
+def get_provider(name: str) -> Optional[SourceProvider]:
+    return _providers.get(name)
+
+
+def available_sources() -> list[str]:
+    return list(_providers)
@@ -1,62 +1,228 @@
-from langchain_openai import ChatOpenAI
+import asyncio
+from functools import lru_cache
+from itertools import chain
+from typing import Iterable
 from core.config import get_settings
+from core.resilience import get_dependency
+from services.chunker import iter_token_chunks
+from services.llm_cache import LLMCache
 
 settings = get_settings()
-llm = ChatOpenAI(openai_api_key=settings.OPENAI_API_KEY, temperature=0)
-
-
-def chunk_text(text: str, max_chunk_size: int = 10000) -> list[str]:
-    """Split text into chunks to fit within token limits."""
-    words = text.split()
-    chunks = []
-    current_chunk = []
-    current_length = 0
-    
-    for word in words:
-        word_length = len(word) + 1
-        if current_length + word_length > max_chunk_size and current_chunk:
-            chunks.append(" ".join(current_chunk))
-            current_chunk = [word]
-            current_length = word_length
-        else:
-            current_chunk.append(word)
-            current_length += word_length
-    
-    if current_chunk:
-        chunks.append(" ".join(current_chunk))
-    
-    return chunks
-
-
-def summarize_text(text: str, max_length: int = 200) -> str:
-    """Summarize text, handling large texts by chunking."""
+
+
+@lru_cache(maxsize=None)
+def get_llm():
+    """The shared ChatOpenAI client, built on first use (langchain_openai is slow to import)."""
+    from langchain_openai import ChatOpenAI
+
+    # Retries happen in the LLM cache's "openai" dependency, not inside the client
+    return ChatOpenAI(openai_api_key=settings.OPENAI_API_KEY, model_name=settings.SUMMARY_MODEL, temperature=0,
+                      max_retries=0)
+
+
+@lru_cache(maxsize=None)
+def get_llm_cache() -> LLMCache:
+    """The shared completion cache, opened on first use rather than at import."""
+    return LLMCache(
+        max_memory_entries=settings.LLM_CACHE_MEMORY_ENTRIES,
+        disk_path=settings.LLM_CACHE_PATH or None,
+        max_disk_entries=settings.LLM_CACHE_DISK_ENTRIES,
+        ttl=settings.LLM_CACHE_TTL,
+        enabled=settings.LLM_CACHE_ENABLED,
+        dependency=get_dependency("openai"),
+    )
+
+
+def _group_by_size(texts: list[str], max_chars: int) -> list[list[str]]:
+    """Pack consecutive texts into groups whose joined size stays under max_chars."""
+    groups, current, size = [], [], 0
+    for text in texts:
+        if current and size + len(text) + 2 > max_chars:
+            groups.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += len(text) + 2
+    if current:
+        groups.append(current)
+    return groups
+
+
+async def _amap_prompts(client, prompts: Iterable[str], bypass: bool, max_concurrency: int,
+                        error_label: str) -> list[str]:
+    """
+    Run prompts concurrently and return completions in input order.
+    At most ``max_concurrency`` prompts are in flight at once.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(i, prompt):
+        async with semaphore:
+            try:
+                return await get_llm_cache().acomplete(client, prompt, bypass=bypass)
+            except Exception as e:
+                return f"Error summarizing {error_label} {i+1}: {str(e)}"
+
+    # Chunk generation is cheap next to the LLM calls, so all tasks are created up front
+    return list(await asyncio.gather(*(run(i, prompt) for i, prompt in enumerate(prompts))))
+
+
+def _split_for_map(text: str, max_length: int):
+    """
+    Chunk the text. Returns (single_prompt, None) when it fits in one chunk,
+    otherwise (None, lazy iterator of per-chunk prompts).
+    """
+    chunks = iter_token_chunks(
+        text,
+        max_tokens=settings.SUMMARY_CHUNK_TOKENS,
+        overlap=settings.SUMMARY_CHUNK_OVERLAP,
+        model=settings.SUMMARY_MODEL,
+    )
+    first = next(chunks, None)
+    second = next(chunks, None)
+
+    if second is None:
+        return f"Summarize the following text in under {max_length} words:\n\n{first or text}", None
+
+    prompts = (
+        f"Summarize the following text (part {i+1}):\n\n{chunk}"
+        for i, chunk in enumerate(chain((first, second), chunks))
+    )
+    return None, prompts
+
+
+def _needs_reduce(summaries: list[str], reduce_max_chars: int) -> bool:
+    return len(summaries) > 1 and sum(len(s) + 2 for s in summaries) > reduce_max_chars
+
+
+def _reduce_prompts(summaries: list[str], reduce_max_chars: int) -> list[str]:
+    groups = _group_by_size(summaries, reduce_max_chars)
+    return [
+        f"Combine these partial summaries (group {i+1} of {len(groups)}) into one concise summary:\n\n"
+        + "\n\n".join(group)
+        for i, group in enumerate(groups)
+    ]
+
+
+def _final_prompt(summaries: list[str], max_length: int) -> str:
+    combined_summaries = "\n\n".join(summaries)
+    return f"Create a comprehensive summary in under {max_length} words from these partial summaries:\n\n{combined_summaries}"
+
+
+async def asummarize_with_partials(text: str, max_length: int = 200, use_cache: bool = True, client=None,
+                                   max_concurrency: int = None, reduce_max_chars: int = None,
+                                   max_reduce_levels: int = 5, on_token=None) -> tuple[str, list[str]]:
+    """
+    Summarize text, handling large texts by map-reduce.
+
+    Chunks are summarized concurrently (at most ``max_concurrency`` at once).
+    If the partial summaries are still larger than ``reduce_max_chars`` they
+    are grouped and summarized again, level by level, before the final reduce.
+
+    Completions go through get_llm_cache() unless ``use_cache`` is False.
+    ``client`` overrides the shared ChatOpenAI client from get_llm().
+    If ``on_token`` is given, the final summary is streamed to it piece by piece.
+
+    Returns (summary, partials): the partials are what the final prompt was
+    built from (the text itself when it fit in one chunk), so the summary can
+    later be refined with arefine_summary() without redoing the map phase.
+    """
+    client = client or get_llm()
+
+    async def complete(prompt):
+        if on_token is None:
+            return await get_llm_cache().acomplete(client, prompt, bypass=bypass)
+        return await get_llm_cache().astream_complete(client, prompt, on_token, bypass=bypass)
+
+    bypass = not use_cache
+    max_concurrency = max_concurrency or settings.SUMMARY_MAX_CONCURRENCY
+    reduce_max_chars = reduce_max_chars or settings.SUMMARY_REDUCE_MAX_CHARS
+
     if not text.strip():
-        return "No content to summarize."
+        return "No content to summarize.", []
 
-    if len(text) < 8000:
-        prompt = f"Summarize the following text in under {max_length} words:\n\n{text}"
+    single_prompt, prompts = _split_for_map(text, max_length)
+    if single_prompt is not None:
         try:
-            response = llm.invoke(prompt)
-            return response.content.strip()
+            return await complete(single_prompt), [text]
         except Exception as e:
-            return f"Error summarizing text: {str(e)}"
+            return f"Error summarizing text: {str(e)}", [text]
+
+    summaries = await _amap_prompts(client, prompts, bypass, max_concurrency, "chunk")
+
+    level = 0
+    while _needs_reduce(summaries, reduce_max_chars) and level < max_reduce_levels:
+        level += 1
+        summaries = await _amap_prompts(client, _reduce_prompts(summaries, reduce_max_chars), bypass,
+                                        max_concurrency, f"level {level} group")
+
+    try:
+        return await complete(_final_prompt(summaries, max_length)), summaries
+    except Exception as e:
+        return f"Error creating final summary: {str(e)}", summaries
 
-    chunks = chunk_text(text, max_chunk_size=8000)
-    chunk_summaries = []
-    
-    for i, chunk in enumerate(chunks):
-        prompt = f"Summarize the following text (part {i+1} of {len(chunks)}):\n\n{chunk}"
-        try:
-            response = llm.invoke(prompt)
-            chunk_summaries.append(response.content.strip())
-        except Exception as e:
-            chunk_summaries.append(f"Error summarizing chunk {i+1}: {str(e)}")
 
-    combined_summaries = "\n\n".join(chunk_summaries)
-    final_prompt = f"Create a comprehensive summary in under {max_length} words from these partial summaries:\n\n{combined_summaries}"
-    
+async def asummarize_text(text: str, max_length: int = 200, use_cache: bool = True, client=None,
+                          max_concurrency: int = None, reduce_max_chars: int = None,
+                          max_reduce_levels: int = 5, on_token=None) -> str:
+    """asummarize_with_partials() without the partials."""
+    summary, _ = await asummarize_with_partials(
+        text, max_length, use_cache, client, max_concurrency, reduce_max_chars, max_reduce_levels, on_token,
+    )
+    return summary
+
+
+def summarize_text(text: str, max_length: int = 200, use_cache: bool = True, client=None,
+                   max_concurrency: int = None, reduce_max_chars: int = None,
+                   max_reduce_levels: int = 5) -> str:
+    """
+    Blocking wrapper around asummarize_text() for scripts; don't call it
+    from a running event loop.
+    """
+    return asyncio.run(asummarize_text(
+        text, max_length, use_cache, client, max_concurrency, reduce_max_chars, max_reduce_levels,
+    ))
+
+
+def merge_prompt(summaries_by_source: dict, max_length: int = 200) -> str:
+    sections = "\n\n".join(f"--- {source.upper()} ---\n{summary}" for source, summary in summaries_by_source.items())
+    return (
+        f"Combine these per-source summaries into one comprehensive summary in under {max_length} words:"
+        f"\n\n{sections}"
+    )
+
+
+async def amerge_summaries(summaries_by_source: dict, max_length: int = 200, use_cache: bool = True,
+                           client=None, on_token=None) -> str:
+    """Final reduce over summaries produced independently per source."""
+    client = client or get_llm()
+    prompt = merge_prompt(summaries_by_source, max_length)
     try:
-        response = llm.invoke(final_prompt)
-        return response.content.strip()
+        if on_token is None:
+            return await get_llm_cache().acomplete(client, prompt, bypass=not use_cache)
+        return await get_llm_cache().astream_complete(client, prompt, on_token, bypass=not use_cache)
     except Exception as e:
         return f"Error creating final summary: {str(e)}"
+
+
+def refine_prompt(partials: list[str], draft: str, feedback: str, max_length: int = 200) -> str:
+    combined_summaries = "\n\n".join(partials)
+    return (
+        f"A reviewer rejected this draft summary: {feedback}\n\n"
+        f"Draft:\n{draft}\n\n"
+        f"Write a corrected summary in under {max_length} words, using only facts stated in "
+        f"these source notes:\n\n{combined_summaries}"
+    )
+
+
+async def arefine_summary(partials: list[str], draft: str, feedback: str, max_length: int = 200,
+                          use_cache: bool = True, client=None) -> str:
+    """
+    Redo only the final reduce step, telling the model what the critic objected to.
+    The chunk summaries from the first pass are reused as-is.
+    """
+    client = client or get_llm()
+    try:
+        return await get_llm_cache().acomplete(client, refine_prompt(partials, draft, feedback, max_length),
+                                         bypass=not use_cache)
+    except Exception as e:
+        return f"Error refining summary: {str(e)}"
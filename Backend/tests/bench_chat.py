@@ -0,0 +1,136 @@
+"""
+End-to-end /api/chat latency and throughput through the real graph, with
+fixture sources and the fake LLM standing in for the network.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio
+import pytest
+from fastapi import Depends
+
+from api.routes_chat import ChatRequest, _start_session
+from db.session import get_db
+from services.retriever import register_fixture_providers
+from services.sources import FixtureProvider, register_provider
+from workflows.research_graph import run_research
+
+pytestmark = pytest.mark.bench
+
+SOURCE_LATENCY = 0.2
+SOURCE_WORDS = 500
+LLM_LATENCY = 0.02
+# Worker threads for sync routes, as a sync deployment would size its pool
+SYNC_THREADS = 4
+# The load test waits longer on I/O, as against live sources and a hosted model,
+# so that waiting rather than this machine's CPU decides throughput
+LOAD_SOURCE_LATENCY = 1.0
+LOAD_LLM_LATENCY = 0.2
+
+
+@pytest.fixture
+def chat_client(client, fake_llm):
+    fake_llm.latency = LLM_LATENCY
+    register_fixture_providers(latency=SOURCE_LATENCY, words=SOURCE_WORDS)
+    yield client
+    register_fixture_providers()
+
+
+def _chat(client, i: int) -> float:
+    started = time.perf_counter()
+    response = client.post("/api/chat", json={"user_id": 1 + i % 4, "query": f"benchmark topic {i}"})
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200
+    assert not response.json()["result"].startswith("Error")
+    return elapsed
+
+
+def test_chat_latency(chat_client, bench):
+    latencies = [_chat(chat_client, i) for i in range(10)]
+
+    p50, p99 = bench.percentile(latencies, 50), bench.percentile(latencies, 99)
+    bench.report("sequential", requests=len(latencies), p50_s=p50, p99_s=p99)
+    # Every request went through the sources and the model
+    assert p50 >= SOURCE_LATENCY + LLM_LATENCY
+
+
+def test_chat_throughput(chat_client, bench):
+    serial = [_chat(chat_client, i) for i in range(100, 103)]
+    requests, workers = 16, 8
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        latencies = list(pool.map(lambda i: _chat(chat_client, i), range(200, 200 + requests)))
+    elapsed = time.perf_counter() - started
+
+    throughput = requests / elapsed
+    serial_throughput = len(serial) / sum(serial)
+    bench.report("concurrent", requests=requests, workers=workers, req_per_s=throughput,
+                 serial_req_per_s=serial_throughput, p50_s=bench.percentile(latencies, 50),
+                 p99_s=bench.percentile(latencies, 99))
+    # Requests wait on I/O, so concurrent ones overlap instead of queueing
+    assert throughput > 1.5 * serial_throughput
+
+
+@pytest.fixture
+def sync_baseline(chat_client, fake_llm):
+    """
+    /api/bench/sync-chat: the same session setup and research run as
+    /api/chat, but as a sync route. Like the old sync endpoint, each request
+    holds a worker thread until its research is done, so the worker pool
+    (SYNC_THREADS, shared with run_in_threadpool as in a real deployment)
+    caps how many run at once.
+    """
+    app = chat_client.app
+    fake_llm.latency = LOAD_LLM_LATENCY
+    # Enough fetch threads per source that neither side waits on the sources' own limits
+    for name in ("arxiv", "wikipedia", "web"):
+        register_provider(FixtureProvider(name, latency=LOAD_SOURCE_LATENCY, words=SOURCE_WORDS, max_concurrency=32))
+
+    @app.post("/api/bench/sync-chat")
+    def sync_chat(request: ChatRequest, db=Depends(get_db)):
+        session = _start_session(db, request.user_id, request.query)
+        result = anyio.from_thread.run(run_research, request.query, request.user_id, session.id)
+        return {"session_id": session.id, "result": result.get("summary") or ""}
+
+    def set_threads(total: int) -> int:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        previous, limiter.total_tokens = limiter.total_tokens, total
+        return previous
+
+    previous = chat_client.portal.call(set_threads, SYNC_THREADS)
+    yield chat_client
+    chat_client.portal.call(set_threads, previous)
+    app.router.routes.remove(next(r for r in app.router.routes if getattr(r, "path", "") == "/api/bench/sync-chat"))
+
+
+def _load(client, path: str, users: int, first: int) -> tuple[float, list[float]]:
+    def request(i: int) -> float:
+        started = time.perf_counter()
+        response = client.post(path, json={"user_id": 1 + i % 4, "query": f"benchmark topic {i}"})
+        assert response.status_code == 200
+        assert not response.json()["result"].startswith("Error")
+        return time.perf_counter() - started
+
+    requests = max(4, users)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        latencies = list(pool.map(request, range(first, first + requests)))
+    return requests / (time.perf_counter() - started), latencies
+
+
+def test_throughput_by_concurrent_users(sync_baseline, bench):
+    """Load test: requests/s as concurrent users grow, async /api/chat against a sync baseline."""
+    throughput = {}
+    for users in (1, 4, 16):
+        for mode, path in (("async", "/api/chat"), ("sync", "/api/bench/sync-chat")):
+            first = 1000 * users + (500 if mode == "sync" else 0)
+            throughput[mode, users], latencies = _load(sync_baseline, path, users, first)
+            bench.report(f"{mode} {users} users", req_per_s=throughput[mode, users],
+                         p50_s=bench.percentile(latencies, 50), p99_s=bench.percentile(latencies, 99))
+
+    # With one user both are a single request at a time
+    assert throughput["async", 1] > 0.7 * throughput["sync", 1]
+    # Past the worker pool, sync requests queue for a thread while async ones keep awaiting I/O
+    assert throughput["async", 16] > 1.5 * throughput["sync", 16]
+    assert throughput["async", 16] > 2 * throughput["async", 1]
@@ -0,0 +1,77 @@
+"""
+Cost and payoff of graph checkpoints: the extra latency of writing one per
+node on /api/chat, and the time a retry saves by resuming from the
+retrieved documents instead of fetching again.
+"""
+import time
+
+import pytest
+
+from services.retriever import register_fixture_providers
+from workflows import research_graph
+
+pytestmark = pytest.mark.bench
+
+SOURCE_LATENCY = 0.2
+SOURCE_WORDS = 500
+LLM_LATENCY = 0.02
+REQUESTS = 8
+
+
+@pytest.fixture
+def chat_client(client, fake_llm):
+    fake_llm.latency = LLM_LATENCY
+    register_fixture_providers(latency=SOURCE_LATENCY, words=SOURCE_WORDS)
+    yield client
+    register_fixture_providers()
+
+
+def _chat(client, query: str) -> tuple[float, dict]:
+    started = time.perf_counter()
+    response = client.post("/api/chat", json={"user_id": 1, "query": query})
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200
+    return elapsed, response.json()
+
+
+def _mean_latency(client, label: str) -> float:
+    _chat(client, f"{label} warm-up")
+    latencies = [_chat(client, f"{label} topic {i}")[0] for i in range(REQUESTS)]
+    return sum(latencies) / len(latencies)
+
+
+def test_checkpoint_write_overhead(chat_client, monkeypatch, bench):
+    with_checkpoints = _mean_latency(chat_client, "checkpointed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(research_graph.settings, "CHECKPOINT_ENABLED", False)
+        research_graph.get_research_graph.cache_clear()
+        try:
+            assert research_graph.get_research_graph().checkpointer is None
+            without = _mean_latency(chat_client, "uncheckpointed")
+        finally:
+            research_graph.get_research_graph.cache_clear()
+
+    overhead = with_checkpoints - without
+    bench.report("write overhead", requests=REQUESTS, with_s=with_checkpoints, without_s=without,
+                 overhead_ms=overhead * 1000, overhead_pct=100 * overhead / without)
+    # A handful of small SQLite writes per run, against a request that waits on the sources
+    assert overhead < 0.25 * without
+
+
+def test_resume_skips_the_fetch(chat_client, fake_llm, bench):
+    fresh, _ = _chat(chat_client, "resume baseline")
+
+    fake_llm.error = RuntimeError("model down")
+    _, failed = _chat(chat_client, "resume benchmark")
+    assert failed["result"].startswith("Error")
+    fake_llm.error = None
+
+    started = time.perf_counter()
+    resumed = chat_client.post(f"/api/chat/sessions/{failed['session_id']}/resume").json()
+    resume = time.perf_counter() - started
+    assert not resumed["result"].startswith("Error")
+
+    bench.report("resume", fresh_s=fresh, resume_s=resume, saved_s=fresh - resume)
+    # The retry starts from the checkpointed documents, so it never waits on the sources
+    assert resume < fresh - 0.5 * SOURCE_LATENCY
@@ -0,0 +1,49 @@
+"""Token chunker throughput (MB/s) on large paper-sized texts."""
+import random
+import time
+
+import pytest
+
+from core.tokens import ApproximateEncoding, get_encoding
+from services.chunker import iter_token_chunks
+
+pytestmark = pytest.mark.bench
+
+_WORDS = (
+    "we propose a novel transformer architecture for graph representation learning and evaluate "
+    "it on molecular property prediction benchmarks where attention over neighbouring atoms "
+    "improves accuracy by a significant margin compared with message passing baselines"
+).split()
+
+
+def _paper_text(megabytes: float, seed: int = 0) -> str:
+    """Paragraphs of sentences, roughly the shape of text extracted from arXiv PDFs."""
+    rng = random.Random(seed)
+    paragraphs, size = [], 0
+    while size < megabytes * 1_000_000:
+        sentences = [
+            " ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 30))).capitalize() + "."
+            for _ in range(rng.randint(3, 8))
+        ]
+        paragraph = " ".join(sentences)
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return "\n\n".join(paragraphs)
+
+
+def test_chunker_throughput(bench):
+    text = _paper_text(4)
+    megabytes = len(text.encode("utf-8")) / 1e6
+    encoding = "estimate" if isinstance(get_encoding(), ApproximateEncoding) else "tiktoken"
+
+    started = time.perf_counter()
+    chunks = iter_token_chunks(text, max_tokens=2000, overlap=100)
+    next(chunks)
+    first = time.perf_counter() - started
+    count = 1 + sum(1 for _ in chunks)
+    total = time.perf_counter() - started
+
+    bench.report(f"{megabytes:.1f} MB, {encoding}", chunks=count, mb_per_s=megabytes / total,
+                 first_chunk_s=first, total_s=total)
+    # Chunks are produced lazily: the first one doesn't wait for the whole text to be encoded
+    assert first < total / 10
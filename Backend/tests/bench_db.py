@@ -0,0 +1,106 @@
+"""Connection acquisition rate and query latency under concurrent load, against local SQLite."""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.pool import QueuePool
+
+from db import models
+from db.session import Base, engine_options
+
+pytestmark = pytest.mark.bench
+
+WORKERS = 8
+QUERIES_PER_WORKER = 150
+USERS = 20
+
+
+def _history_query(user_id: int):
+    S = models.ResearchSession
+    return (
+        select(S.id, S.query, S.created_at)
+        .where(S.user_id == user_id)
+        .order_by(S.created_at.desc(), S.id.desc())
+        .limit(50)
+    )
+
+
+@pytest.fixture(scope="module")
+def database_url(tmp_path_factory):
+    url = f"sqlite:///{tmp_path_factory.mktemp('bench-db')}/bench.db"
+    seed = create_engine(url)
+    Base.metadata.create_all(seed)
+    with seed.begin() as conn:
+        conn.execute(models.User.__table__.insert(), [
+            {"id": u, "name": f"User {u}", "email": f"user{u}@example.com"} for u in range(USERS)
+        ])
+        conn.execute(models.ResearchSession.__table__.insert(), [
+            {"user_id": i % USERS, "query": f"query {i}"} for i in range(5000)
+        ])
+    seed.dispose()
+    return url
+
+
+def _load(engine) -> tuple[float, list[float]]:
+    def worker(index: int) -> list[float]:
+        latencies = []
+        for i in range(QUERIES_PER_WORKER):
+            started = time.perf_counter()
+            with engine.connect() as conn:
+                rows = conn.execute(_history_query((index + i) % USERS)).all()
+            latencies.append(time.perf_counter() - started)
+            assert len(rows) == 50
+        return latencies
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        latencies = [t for result in pool.map(worker, range(WORKERS)) for t in result]
+    return time.perf_counter() - started, latencies
+
+
+def test_sync_pool_under_concurrent_load(database_url, bench):
+    engines = {
+        # What db/session.py used to build: default pool, every statement logged
+        "echo, default pool": create_engine(database_url, echo=True),
+        "configured": create_engine(database_url, poolclass=QueuePool, **engine_options(database_url)),
+    }
+    rates = {}
+    for label, engine in engines.items():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        elapsed, latencies = _load(engine)
+        rates[label] = len(latencies) / elapsed
+        bench.report(label, workers=WORKERS, acquired_per_s=rates[label],
+                     p50_ms=1000 * bench.percentile(latencies, 50), p99_ms=1000 * bench.percentile(latencies, 99))
+        engine.dispose()
+
+    # Statement logging is off by default now; it was paid on every query
+    assert rates["configured"] > rates["echo, default pool"]
+
+
+async def test_async_engine_under_concurrent_load(database_url, bench):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = database_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    engine = create_async_engine(url, **engine_options(url))
+
+    async def worker(index: int) -> list[float]:
+        latencies = []
+        for i in range(QUERIES_PER_WORKER):
+            started = time.perf_counter()
+            async with engine.connect() as conn:
+                rows = (await conn.execute(_history_query((index + i) % USERS))).all()
+            latencies.append(time.perf_counter() - started)
+            assert len(rows) == 50
+        return latencies
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(worker(i) for i in range(WORKERS)))
+    elapsed = time.perf_counter() - started
+    latencies = [t for result in results for t in result]
+    bench.report("async (aiosqlite)", tasks=WORKERS, acquired_per_s=len(latencies) / elapsed,
+                 p50_ms=1000 * bench.percentile(latencies, 50), p99_ms=1000 * bench.percentile(latencies, 99))
+    await engine.dispose()
@@ -0,0 +1,31 @@
+"""Cost of building and compiling the research graph per call versus the shared get_research_graph()."""
+import time
+
+import pytest
+
+from workflows import research_graph
+
+pytestmark = pytest.mark.bench
+
+ROUNDS = 20
+
+
+def _mean(func) -> float:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        func()
+    return (time.perf_counter() - started) / ROUNDS
+
+
+def test_cached_graph_vs_build_and_compile(bench):
+    research_graph.build_research_graph()  # imports langgraph outside the timing
+
+    built = _mean(research_graph.build_research_graph)
+    research_graph.get_research_graph()
+    cached = _mean(research_graph.get_research_graph)
+
+    bench.report("graph", rounds=ROUNDS, build_compile_ms=built * 1000, cached_us=cached * 1e6,
+                 speedup=built / cached)
+    assert research_graph.get_research_graph() is research_graph.get_research_graph()
+    # Per request, the shared graph costs a dict lookup instead of a compile
+    assert cached * 100 < built
@@ -0,0 +1,87 @@
+"""
+tracemalloc peak while large retrieval results go through iter_documents,
+the capped summarizer input, passage selection and grounding.
+"""
+import time
+import tracemalloc
+
+import pytest
+
+from core.config import get_settings
+from services.grounding import grounding_score
+from services.passages import format_documents, iter_documents, select_passages
+from services.sources import FixtureProvider
+
+pytestmark = pytest.mark.bench
+
+settings = get_settings()
+
+QUERY = "graph neural network training"
+MB = 1 << 20
+
+
+def _retrieved_docs(copies: int) -> dict:
+    """About 0.2 MB of text per copy, as distinct strings, split over two sources."""
+    base = FixtureProvider("arxiv").fetch(QUERY, latency=0, words=20000, documents=4)
+    return {
+        "arxiv": [f"copy {i}\n{base[i % 4]}" for i in range(copies)],
+        "wikipedia": [f"page {i}\n{base[i % 4][:20000]}" for i in range(copies)],
+    }
+
+
+def _peak(func) -> tuple[int, float]:
+    """(peak bytes allocated while func runs, seconds)."""
+    tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        return tracemalloc.get_traced_memory()[1], elapsed
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.fixture(scope="module")
+def docs():
+    return _retrieved_docs(copies=60)
+
+
+def test_document_stream_peak(docs, bench):
+    size = sum(len(text) for texts in docs.values() for text in texts)
+    cap = settings.SOURCE_TEXT_MAX_CHARS
+
+    uncapped, _ = _peak(lambda: sum(len(d.text) for d in iter_documents(docs)))
+    capped, _ = _peak(lambda: sum(len(d.text) for d in iter_documents(docs, max_chars=cap)))
+    joined, _ = _peak(lambda: "".join(format_documents(iter_documents(docs, max_chars=cap))))
+    bench.report("iter_documents", input_mb=size / MB, cap_mb=cap / MB, uncapped_peak_mb=uncapped / MB,
+                 capped_peak_mb=capped / MB, joined_peak_mb=joined / MB)
+
+    # Documents are passed through, not copied: only the one cut per source is new
+    assert uncapped < MB
+    assert capped < MB
+    # The capped summarizer input is built once, at its final size
+    assert joined < 1.25 * cap
+
+
+def test_passage_selection_peak(docs, bench):
+    cap = settings.SOURCE_TEXT_MAX_CHARS
+    peak, elapsed = _peak(lambda: select_passages(QUERY, docs, token_budget=settings.CONTEXT_TOKEN_BUDGET,
+                                                  max_chars=cap))
+    bench.report("select_passages", cap_mb=cap / MB, peak_mb=peak / MB, seconds=elapsed)
+    # Bounded by the cap, whatever was retrieved
+    assert peak < 16 * cap
+
+
+def test_grounding_peak_does_not_grow_with_the_sources(bench):
+    summary = " ".join(_retrieved_docs(1)["arxiv"][0].split()[:300]) + " claims the sources never make"
+    peaks = {}
+    # Both well past SOURCE_BLOCK_CHARS, so the blocks, not the input, set the peak
+    for copies in (30, 90):
+        sources = "".join(format_documents(iter_documents(_retrieved_docs(copies))))
+        peak, elapsed = _peak(lambda: grounding_score(summary, sources))
+        peaks[copies] = peak
+        bench.report(f"grounding {len(sources) / MB:.0f} MB", peak_mb=peak / MB, seconds=elapsed)
+
+    # Scanned a block at a time: tripling the sources leaves the peak about where it was
+    assert peaks[90] < 1.25 * peaks[30]
+    assert peaks[90] < 32 * MB
@@ -0,0 +1,63 @@
+"""Per-request cost of the metrics middleware and SQLAlchemy hooks on a small DB-backed route."""
+import statistics
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from core import metrics
+from db.session import SessionLocal
+
+pytestmark = pytest.mark.bench
+
+REQUESTS = 100
+ROUNDS = 8
+QUERIES = 3  # per request, like a history page
+
+
+def _app(instrumented: bool) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/probe/{item_id}")
+    def probe(item_id: int):
+        with SessionLocal() as db:
+            for _ in range(QUERIES):
+                db.execute(text("SELECT 1")).scalar()
+        return {"id": item_id}
+
+    if instrumented:
+        metrics.setup_metrics(app)
+    return TestClient(app)
+
+
+def _per_request(client) -> float:
+    started = time.perf_counter()
+    for i in range(REQUESTS):
+        assert client.get(f"/probe/{i}").status_code == 200
+    return (time.perf_counter() - started) / REQUESTS
+
+
+def test_metrics_overhead_per_request(bench):
+    plain, instrumented = _app(False), _app(True)
+    without, with_metrics = [], []
+    try:
+        # Alternate which side goes first so drift on the machine hits both alike
+        for round_ in range(ROUNDS):
+            for instrumented_side in ((False, True) if round_ % 2 else (True, False)):
+                if instrumented_side:
+                    metrics._instrument_sqlalchemy()
+                    with_metrics.append(_per_request(instrumented))
+                else:
+                    metrics._uninstrument_sqlalchemy()
+                    without.append(_per_request(plain))
+    finally:
+        metrics._instrument_sqlalchemy()
+
+    base, measured = statistics.median(without), statistics.median(with_metrics)
+    overhead = measured - base
+    bench.report("per request", requests=REQUESTS * ROUNDS, db_queries=QUERIES, without_us=base * 1e6,
+                 with_us=measured * 1e6, overhead_us=overhead * 1e6, overhead_pct=100 * overhead / base)
+    # One histogram observation per request and per query: small next to the request itself
+    assert overhead < 0.2 * base
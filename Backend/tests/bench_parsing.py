@@ -0,0 +1,74 @@
+"""API latency while sample PDFs are parsed concurrently, in-thread vs in the parse process pool."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.parsing import ParsePool, pdf_to_text
+
+pytestmark = pytest.mark.bench
+
+fitz = pytest.importorskip("fitz", reason="PDF parsing needs pymupdf")
+
+PDFS = 8
+PAGES = 60
+PARSING_THREADS = 4
+
+
+@pytest.fixture(scope="module")
+def sample_pdfs(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("pdfs")
+    line = "Attention layers aggregate messages from neighbouring nodes in the molecular graph. "
+    paths = []
+    for n in range(PDFS):
+        with fitz.open() as pdf:
+            for page_number in range(PAGES):
+                page = pdf.new_page()
+                page.insert_textbox(page.rect + (36, 36, -36, -36), f"Paper {n}, page {page_number}. " + line * 40,
+                                    fontsize=8)
+            path = str(directory / f"paper-{n}.pdf")
+            pdf.save(path)
+        paths.append(path)
+    return paths
+
+
+def _latency_while_parsing(client, pool: ParsePool, paths: list[str]) -> tuple[list[float], float]:
+    done = threading.Event()
+
+    def parse_all():
+        try:
+            with ThreadPoolExecutor(max_workers=PARSING_THREADS) as executor:
+                texts = list(executor.map(lambda path: pool.run(pdf_to_text, path), paths * 2))
+            assert all("Attention layers" in text for text in texts)
+        finally:
+            done.set()
+
+    latencies = []
+    started = time.perf_counter()
+    parser = threading.Thread(target=parse_all)
+    parser.start()
+    while not done.is_set():
+        request_started = time.perf_counter()
+        assert client.get("/health").status_code == 200
+        latencies.append(time.perf_counter() - request_started)
+        time.sleep(0.005)
+    parser.join()
+    return latencies, time.perf_counter() - started
+
+
+def test_api_latency_while_parsing(client, bench, sample_pdfs):
+    results = {}
+    for label, pool in (("in-thread", ParsePool(max_workers=0)), ("process pool", ParsePool(max_workers=2))):
+        pool.run(pdf_to_text, sample_pdfs[0])  # start the workers outside the measurement
+        try:
+            latencies, elapsed = _latency_while_parsing(client, pool, sample_pdfs)
+        finally:
+            pool.shutdown()
+        results[label] = bench.percentile(latencies, 99)
+        bench.report(label, pdfs=2 * len(sample_pdfs), pdfs_per_s=2 * len(sample_pdfs) / elapsed,
+                     requests=len(latencies), p50_ms=1000 * bench.percentile(latencies, 50),
+                     p99_ms=1000 * results[label])
+
+    # Parsing in-thread holds the GIL; worker processes leave the API responsive
+    assert results["process pool"] < results["in-thread"]
@@ -0,0 +1,55 @@
+"""Tokens (and summarizer calls) sent to the LLM before and after passage ranking."""
+import time
+
+import pytest
+
+from conftest import FakeLLM
+from core.config import get_settings
+from core.tokens import count_tokens
+from services.passages import format_documents, format_passages, iter_documents, select_passages
+from services.sources import FixtureProvider
+from services.summarizer import asummarize_text
+
+pytestmark = pytest.mark.bench
+
+settings = get_settings()
+
+QUERY = "graph neural network training"
+
+
+def _retrieved_docs() -> dict:
+    arxiv = FixtureProvider("arxiv").fetch(QUERY, latency=0, words=8000, documents=3)
+    wikipedia = FixtureProvider("wikipedia").fetch(QUERY, latency=0, words=1000, documents=8)
+    # Redirects and mirrors: the same page text returned under several titles
+    wikipedia += wikipedia[:3]
+    return {"arxiv": arxiv, "wikipedia": wikipedia}
+
+
+async def _summarize(context: str) -> tuple[float, int]:
+    llm = FakeLLM(latency=0.05)
+    started = time.perf_counter()
+    await asummarize_text(context, use_cache=False, client=llm)
+    return time.perf_counter() - started, llm.calls
+
+
+async def test_tokens_before_and_after_ranking(bench):
+    docs = _retrieved_docs()
+    raw = "".join(format_documents(iter_documents(docs)))
+
+    started = time.perf_counter()
+    passages, stats = select_passages(QUERY, docs, token_budget=settings.CONTEXT_TOKEN_BUDGET,
+                                      max_words=settings.PASSAGE_MAX_WORDS)
+    ranking = time.perf_counter() - started
+    ranked = format_passages(passages)
+
+    raw_s, raw_calls = await _summarize(raw)
+    ranked_s, ranked_calls = await _summarize(ranked)
+    tokens_before, tokens_after = count_tokens(raw), count_tokens(ranked)
+    bench.report("per request", tokens_before=tokens_before, tokens_after=tokens_after,
+                 duplicates=stats["duplicates"], ranking_s=ranking, llm_calls_before=raw_calls,
+                 llm_calls_after=ranked_calls, summarize_before_s=raw_s, summarize_after_s=ranked_s)
+
+    assert stats["duplicates"] >= 3
+    assert stats["tokens_out"] <= settings.CONTEXT_TOKEN_BUDGET
+    assert tokens_after < tokens_before / 3
+    assert ranked_calls < raw_calls
@@ -0,0 +1,63 @@
+"""DB round trips per research turn: the old per-row saves against save_research_turn."""
+import time
+
+import pytest
+from sqlalchemy import event
+
+from db import models
+from db.session import SessionLocal, engine
+from services import persistence
+
+pytestmark = pytest.mark.bench
+
+TURNS = 50
+SUMMARY = "summary " * 200
+
+
+def _per_row_turn(session_id: int, query: str):
+    # What persistence_node did before: one session, commit and refresh per row
+    persistence.save_message(session_id, query, "user")
+    persistence.save_message(session_id, SUMMARY, "assistant")
+    persistence.save_summary(session_id, SUMMARY)
+
+
+def _bulk_turn(session_id: int, query: str):
+    persistence.save_research_turn(session_id, query, SUMMARY)
+
+
+def _measure(write, session_id: int) -> tuple[float, float]:
+    """Mean statements and seconds per turn."""
+    statements = 0
+
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        started = time.perf_counter()
+        for i in range(TURNS):
+            write(session_id, f"turn {i}")
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return statements / TURNS, elapsed / TURNS
+
+
+def test_statements_per_research_turn(client, bench):
+    with SessionLocal() as db:
+        db.add(models.User(id=90, name="User 90", email="user90@example.com"))
+        session = models.ResearchSession(user_id=90, query="round trips")
+        db.add(session)
+        db.commit()
+        session_id = session.id
+
+    before, before_s = _measure(_per_row_turn, session_id)
+    after, after_s = _measure(_bulk_turn, session_id)
+
+    bench.report("per turn", turns=TURNS, statements_before=before, statements_after=after,
+                 ms_before=before_s * 1000, ms_after=after_s * 1000)
+    # Three INSERT + refresh SELECT pairs become two executemany INSERTs in one transaction
+    assert before == 6
+    assert after == 2
+    assert len(persistence.get_messages(session_id)) == 4 * TURNS
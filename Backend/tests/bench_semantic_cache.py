@@ -0,0 +1,71 @@
+"""
+Semantic cache build and query benchmarks. Index sizes come from
+BENCH_VECTORS (comma-separated, default 10k and 100k); set e.g.
+BENCH_VECTORS=10000,100000,1000000 for the full range (~2 GB on disk at 1M).
+"""
+import os
+import time
+
+import numpy as np
+import pytest
+
+from core.config import get_settings
+from services.semantic_cache import KIND_QUERY, KIND_SUMMARY, SemanticCache, VectorIndex
+
+pytestmark = pytest.mark.bench
+
+settings = get_settings()
+
+SIZES = [int(n) for n in os.environ.get("BENCH_VECTORS", "10000,100000").split(",")]
+APPEND_BATCH = 50_000
+TOPICS = ("graph neural networks", "protein folding", "quantum error correction", "diffusion models",
+          "reinforcement learning", "climate modelling", "sparse attention", "federated learning")
+
+
+def test_build_from_sessions(tmp_path, bench):
+    rows = [
+        (i, f"{TOPICS[i % len(TOPICS)]} question {i}", f"Summary {i} of {TOPICS[i % len(TOPICS)]} research.")
+        for i in range(10_000)
+    ]
+    cache = SemanticCache(str(tmp_path), threshold=0.9, dim=settings.SEMANTIC_HASH_DIM)
+
+    started = time.perf_counter()
+    cache.backfill(rows)
+    elapsed = time.perf_counter() - started
+
+    bench.report("backfill", sessions=len(rows), vectors=len(cache.index), vectors_per_s=len(cache.index) / elapsed)
+    session_id, score = cache.lookup(rows[1234][1])
+    assert session_id == 1234 and score > 0.99
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_query_latency_by_index_size(tmp_path, bench, size):
+    dim = settings.SEMANTIC_HASH_DIM
+    rng = np.random.default_rng(size)
+    index = VectorIndex(str(tmp_path), dim)
+
+    started = time.perf_counter()
+    for start in range(0, size, APPEND_BATCH):
+        count = min(APPEND_BATCH, size - start)
+        vectors = rng.standard_normal((count, dim), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        ids = range(start, start + count)
+        index.append(list(ids), [KIND_SUMMARY if i % 2 else KIND_QUERY for i in ids], vectors)
+    build = time.perf_counter() - started
+
+    target = size // 2
+    planted = np.asarray(np.memmap(index._vectors_path, dtype=np.float32, mode="r", shape=(size, dim))[target])
+
+    started = time.perf_counter()
+    index.search(planted, k=5)
+    cold = time.perf_counter() - started
+
+    latencies = []
+    for _ in range(20):
+        started = time.perf_counter()
+        matches = index.search(planted, k=5, kind=KIND_QUERY if target % 2 == 0 else KIND_SUMMARY)
+        latencies.append(time.perf_counter() - started)
+        assert matches[0][0] == target
+
+    bench.report(f"{size} vectors", dim=dim, append_vectors_per_s=size / build, cold_query_ms=1000 * cold,
+                 p50_ms=1000 * bench.percentile(latencies, 50), p99_ms=1000 * bench.percentile(latencies, 99))
@@ -0,0 +1,50 @@
+"""Map-reduce summarization wall-clock time vs chunk count, against a fake LLM with injected latency."""
+import time
+
+import pytest
+
+from core.config import get_settings
+from services.chunker import iter_token_chunks
+from services.summarizer import asummarize_text
+from conftest import FakeLLM
+
+pytestmark = pytest.mark.bench
+
+settings = get_settings()
+
+LLM_LATENCY = 0.05
+CHUNK_TOKENS = 200
+
+
+def _text_with_chunks(chunks: int) -> str:
+    paragraph = "Graph networks pass messages between neighbouring nodes. " * 12
+    text = "\n\n".join(paragraph for _ in range(chunks))
+    while sum(1 for _ in iter_token_chunks(text, max_tokens=CHUNK_TOKENS, overlap=20)) < chunks:
+        text += "\n\n" + paragraph
+    return text
+
+
+async def _timed(text: str, max_concurrency: int) -> tuple[float, int]:
+    llm = FakeLLM(latency=LLM_LATENCY)
+    started = time.perf_counter()
+    summary = await asummarize_text(text, use_cache=False, client=llm, max_concurrency=max_concurrency)
+    elapsed = time.perf_counter() - started
+    assert not summary.startswith("Error")
+    return elapsed, llm.calls
+
+
+async def test_wall_clock_vs_chunk_count(bench, monkeypatch):
+    monkeypatch.setattr(settings, "SUMMARY_CHUNK_TOKENS", CHUNK_TOKENS)
+    monkeypatch.setattr(settings, "SUMMARY_CHUNK_OVERLAP", 20)
+
+    speedups = {}
+    for chunks in (2, 8, 32):
+        text = _text_with_chunks(chunks)
+        sequential, calls = await _timed(text, max_concurrency=1)
+        concurrent, _ = await _timed(text, max_concurrency=8)
+        speedups[chunks] = sequential / concurrent
+        bench.report(f"{chunks} chunks", llm_calls=calls, sequential_s=sequential, concurrent_s=concurrent,
+                     speedup=speedups[chunks])
+
+    # Sequential time grows with every chunk; concurrent time with chunks / max_concurrency
+    assert speedups[32] > 3
@@ -0,0 +1,60 @@
+"""Token counting: the old per-call encoder lookup vs cached encoders and batch counting."""
+import time
+
+import pytest
+
+from core.tokens import ApproximateEncoding, count_tokens, count_tokens_batch, get_encoding
+
+pytestmark = pytest.mark.bench
+
+DOCUMENTS = [
+    f"Document {i}: attention-based models summarize long scientific papers into short abstracts. " * 40
+    for i in range(500)
+]
+
+
+def _best_of(repeat: int, func) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+@pytest.fixture
+def tiktoken_encoding():
+    if isinstance(get_encoding(), ApproximateEncoding):
+        pytest.skip("tiktoken's encoding can't be loaded here (offline, no TIKTOKEN_CACHE_DIR)")
+    import tiktoken
+
+    return tiktoken
+
+
+def test_per_call_lookup_vs_cached_encoder(bench, tiktoken_encoding):
+    def per_call():
+        # What core/utils.count_tokens used to do for every text
+        return [len(tiktoken_encoding.encoding_for_model("gpt-3.5-turbo").encode(d)) for d in DOCUMENTS]
+
+    def cached():
+        return [count_tokens(d) for d in DOCUMENTS]
+
+    assert per_call() == cached()
+    old, new = _best_of(3, per_call), _best_of(3, cached)
+    bench.report(f"{len(DOCUMENTS)} documents", per_call_s=old, cached_s=new, speedup=old / new)
+    assert new <= old * 1.1
+
+
+def test_single_vs_batch_counting(bench):
+    encoding = "estimate" if isinstance(get_encoding(), ApproximateEncoding) else "tiktoken"
+
+    def single():
+        return [count_tokens(d) for d in DOCUMENTS]
+
+    def batch():
+        return count_tokens_batch(DOCUMENTS)
+
+    assert single() == batch()
+    one_by_one, batched = _best_of(3, single), _best_of(3, batch)
+    bench.report(f"{len(DOCUMENTS)} documents, {encoding}", single_s=one_by_one, batch_s=batched,
+                 docs_per_s=len(DOCUMENTS) / batched)
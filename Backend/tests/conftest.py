@@ -0,0 +1,115 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+# Settings are read when modules are imported, so the environment is set first
+_tmp = tempfile.mkdtemp(prefix="research-agent-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/app.db")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("SOURCE_PROVIDERS", "fixture")
+os.environ.setdefault("FIXTURE_LATENCY", "0.01")
+os.environ.setdefault("FIXTURE_WORDS", "400")
+os.environ.setdefault("RETRIEVAL_CACHE_ENABLED", "false")
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+os.environ.setdefault("CORPUS_PATH", f"{_tmp}/corpus.sqlite")
+os.environ.setdefault("CHECKPOINT_PATH", f"{_tmp}/checkpoints.sqlite")
+os.environ.setdefault("STARTUP_WARMUP", "false")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+_bench_lines: list[str] = []
+
+
+class Bench:
+    """Collects timing results for the report printed at the end of the run."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    @staticmethod
+    def percentile(values: list[float], q: float) -> float:
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+    def report(self, label: str, **values):
+        measured = ", ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}" for k, v in values.items())
+        _bench_lines.append(f"{self.name} [{label}] {measured}")
+
+
+def pytest_terminal_summary(terminalreporter):
+    if _bench_lines:
+        terminalreporter.section("benchmarks")
+        for line in _bench_lines:
+            terminalreporter.write_line(line)
+
+
+class _Response:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FakeLLM:
+    """
+    Chat model stand-in: answers after ``latency`` seconds with text built
+    from the prompt's words, or raises ``error`` when set.
+    """
+
+    model_name = "fake"
+    temperature = 0
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.error = None
+        self.calls = 0
+
+    def _answer(self, prompt: str) -> str:
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        # Reuse the prompt's own words, so the critic finds the summary grounded
+        return " ".join(prompt.split()[-60:])
+
+    def invoke(self, prompt):
+        time.sleep(self.latency)
+        return _Response(self._answer(prompt))
+
+    async def ainvoke(self, prompt):
+        await asyncio.sleep(self.latency)
+        return _Response(self._answer(prompt))
+
+    async def astream(self, prompt):
+        await asyncio.sleep(self.latency)
+        for word in self._answer(prompt).split(" "):
+            yield _Response(word + " ")
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    from services import summarizer
+
+    llm = FakeLLM()
+    monkeypatch.setattr(summarizer, "get_llm", lambda: llm)
+    return llm
+
+
+@pytest.fixture
+def client(fake_llm):
+    from fastapi.testclient import TestClient
+
+    import main
+    from db import models  # noqa: F401  (registers the tables)
+    from db.session import Base, engine
+
+    Base.metadata.create_all(engine)
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def bench(request):
+    return Bench(request.node.name)
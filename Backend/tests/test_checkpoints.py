@@ -0,0 +1,53 @@
+from services import persistence
+from services.sources import get_provider
+from workflows.research_graph import get_research_graph, research_config
+
+
+def _count_fetches(monkeypatch) -> list:
+    fetched = []
+    for name in ("arxiv", "wikipedia"):
+        provider = get_provider(name)
+        original = provider.fetch
+
+        def fetch(query, _name=name, _original=original, **params):
+            fetched.append(_name)
+            return _original(query, **params)
+
+        monkeypatch.setattr(provider, "fetch", fetch)
+    return fetched
+
+
+def test_failed_summary_is_retried_from_the_retrieved_documents(client, fake_llm, monkeypatch):
+    fetched = _count_fetches(monkeypatch)
+    fake_llm.error = RuntimeError("model down")
+
+    failed = client.post("/api/chat", json={"user_id": 1, "query": "graph neural networks"}).json()
+    assert failed["result"].startswith("Error")
+    assert sorted(fetched) == ["arxiv", "wikipedia"]
+
+    fake_llm.error = None
+    resumed = client.post(f"/api/chat/sessions/{failed['session_id']}/resume").json()
+    assert not resumed["result"].startswith("Error")
+    # The documents came from the checkpoint, not from the sources again
+    assert sorted(fetched) == ["arxiv", "wikipedia"]
+
+    # One turn: the failed attempt left only the question, which the retry answered
+    messages = persistence.get_messages(failed["session_id"])
+    assert [m.role for m in messages] == ["user", "assistant", "critic"]
+    assert messages[1].content == resumed["result"]
+    assert [s.summary for s in persistence.get_summaries(failed["session_id"])] == [resumed["result"]]
+
+    # Done now: a further retry returns the stored result without calling the model
+    calls = fake_llm.calls
+    again = client.post(f"/api/chat/sessions/{failed['session_id']}/resume").json()
+    assert again["result"] == resumed["result"]
+    assert fake_llm.calls == calls
+
+
+def test_finished_checkpoint_drops_the_documents(client):
+    response = client.post("/api/chat", json={"user_id": 1, "query": "protein folding"}).json()
+    saver = get_research_graph().checkpointer
+    values = saver.get(research_config(1, response["session_id"]))["channel_values"]
+    assert values["saved"] is True
+    for channel in [values, *(v for v in values.values() if isinstance(v, dict))]:
+        assert "retrieved_docs" not in channel and "context" not in channel
@@ -0,0 +1,95 @@
+import sys
+import types
+from datetime import date
+
+import pytest
+
+from services import retriever
+from services.corpus import CorpusDocument, DocumentCorpus
+
+
+class FakeArxiv(types.ModuleType):
+    """Stands in for the arxiv package: counts searches and PDF downloads."""
+
+    def __init__(self, ids, broken=()):
+        super().__init__("arxiv")
+        self.ids = ids
+        self.broken = set(broken)
+        self.searches = 0
+        self.downloads = 0
+
+    def Search(self, query, max_results):
+        self.searches += 1
+        return types.SimpleNamespace(results=lambda: [self._result(i) for i in self.ids[:max_results]])
+
+    def _result(self, short_id):
+        def download_pdf(dirpath):
+            self.downloads += 1
+            if short_id in self.broken:
+                raise OSError(f"404 for {short_id}")
+            return f"{dirpath}/{short_id}.pdf"
+
+        return types.SimpleNamespace(
+            get_short_id=lambda: short_id,
+            download_pdf=download_pdf,
+            title=f"Paper {short_id}",
+            entry_id=f"http://arxiv.org/abs/{short_id}",
+            published=types.SimpleNamespace(date=lambda: date(2024, 1, 1)),
+            authors=[],
+            summary="",
+        )
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    corpus = DocumentCorpus(str(tmp_path / "corpus.sqlite"))
+    monkeypatch.setattr(retriever, "_corpus", corpus)
+    monkeypatch.setattr(retriever, "_community_import_error", lambda: None)
+    monkeypatch.setattr(retriever.parse_pool, "run", lambda func, path: f"text of {path.rsplit('/', 1)[-1]}")
+    return corpus
+
+
+def test_online_search_runs_even_when_the_corpus_has_matches(corpus, monkeypatch):
+    # Three stored papers match, but arXiv now ranks a newer one first
+    corpus.add(CorpusDocument(f"arxiv:{i}", "arxiv", f"Transformers {i}", "transformers attention") for i in range(3))
+    fake = FakeArxiv(["new", "0", "1"])
+    monkeypatch.setitem(sys.modules, "arxiv", fake)
+
+    texts = retriever.fetch_from_arxiv("transformers attention")
+
+    assert fake.searches == 1
+    assert fake.downloads == 1  # only the paper the corpus didn't have
+    assert texts[0] == "text of new.pdf"
+
+
+def test_exact_repeat_query_is_answered_from_the_corpus(corpus, monkeypatch):
+    fake = FakeArxiv(["a", "b"])
+    monkeypatch.setitem(sys.modules, "arxiv", fake)
+
+    first = retriever.fetch_from_arxiv("graph neural networks")
+    assert retriever.fetch_from_arxiv("graph neural networks") == first
+    assert (fake.searches, fake.downloads) == (1, 2)
+
+    retriever.fetch_from_arxiv("graph neural network")
+    assert fake.searches == 2
+
+
+def test_offline_mode_uses_full_text_matches(corpus, monkeypatch):
+    corpus.add([CorpusDocument("arxiv:x", "arxiv", "Diffusion", "diffusion models")])
+    monkeypatch.setattr(retriever.settings, "CORPUS_OFFLINE", True)
+    monkeypatch.setitem(sys.modules, "arxiv", None)  # any remote call would fail
+
+    assert retriever.fetch_from_arxiv("diffusion") == ["diffusion models"]
+
+
+def test_a_bad_paper_is_skipped_and_the_rest_are_kept(corpus, monkeypatch):
+    fake = FakeArxiv(["a", "bad", "c"], broken={"bad"})
+    monkeypatch.setitem(sys.modules, "arxiv", fake)
+
+    assert retriever.fetch_from_arxiv("sparse attention") == ["text of a.pdf", "text of c.pdf"]
+    assert corpus.get("arxiv:a") is not None and corpus.get("arxiv:c") is not None
+
+    # Not recorded as a complete search: a repeat retries only the missing paper
+    fake.broken.clear()
+    assert len(retriever.fetch_from_arxiv("sparse attention")) == 3
+    assert (fake.searches, fake.downloads) == (2, 4)
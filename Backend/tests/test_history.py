@@ -0,0 +1,69 @@
+from db.session import SessionLocal
+from db import models
+
+
+def test_history_pages_through_every_session_with_an_exposed_cursor(client):
+    with SessionLocal() as db:
+        db.add(models.User(id=42, name="User 42", email="user42@example.com"))
+        db.add_all(models.ResearchSession(user_id=42, query=f"query {i}") for i in range(5))
+        db.commit()
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/history/42", params=params, headers={"Origin": "http://localhost:5173"})
+        assert response.status_code == 200
+        assert "x-next-cursor" in response.headers.get("access-control-expose-headers", "").lower()
+        seen += [s["session_id"] for s in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    assert len(seen) == len(set(seen)) == 5
+
+
+def _pages(client, url: str, key: str, limit: int) -> list[list]:
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        body = response.json()
+        pages.append(body[key])
+        cursor = body["next_cursor"]
+        if not cursor:
+            return pages
+
+
+def test_session_list_pages_newest_first_without_messages(client):
+    with SessionLocal() as db:
+        db.add(models.User(id=43, name="User 43", email="user43@example.com"))
+        sessions = [models.ResearchSession(user_id=43, query=f"query {i}") for i in range(5)]
+        db.add_all(sessions)
+        db.commit()
+        ids = [s.id for s in sessions]
+
+    pages = _pages(client, "/api/history/43/sessions", "sessions", limit=2)
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [s["session_id"] for page in pages for s in page] == sorted(ids, reverse=True)
+    assert all("messages" not in s for page in pages for s in page)
+
+
+def test_session_messages_page_oldest_first(client):
+    with SessionLocal() as db:
+        db.add(models.User(id=44, name="User 44", email="user44@example.com"))
+        session = models.ResearchSession(user_id=44, query="paging")
+        db.add(session)
+        db.flush()
+        db.add_all(models.Message(session_id=session.id, role="user", content=f"message {i}") for i in range(5))
+        db.commit()
+        session_id = session.id
+
+    pages = _pages(client, f"/api/sessions/{session_id}/messages", "messages", limit=2)
+    listed = client.get("/api/history/44/sessions").json()["sessions"]
+    assert [(s["session_id"], s["message_count"]) for s in listed] == [(session_id, 5)]
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [m["content"] for page in pages for m in page] == [f"message {i}" for i in range(5)]
+    assert client.get(f"/api/sessions/{session_id}/messages", params={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from services.jobs import JobQueueFull, ResearchJobQueue, UserJobLimitExceeded
+
+
+async def _started_queue(release: asyncio.Event) -> ResearchJobQueue:
+    queue = ResearchJobQueue(workers=1, max_queue=1, per_user_limit=1, retention=10)
+
+    async def handler(job):
+        await release.wait()
+
+    queue.start(handler)
+    return queue
+
+
+async def test_full_queue_and_user_limit_are_told_apart():
+    release = asyncio.Event()
+    queue = await _started_queue(release)
+    try:
+        queue.submit(1, "running", session_id=1)
+        await asyncio.sleep(0)  # the worker picks it up
+        queue.submit(2, "queued", session_id=2)
+
+        with pytest.raises(JobQueueFull):
+            queue.check_admission(3)
+        with pytest.raises(JobQueueFull):
+            queue.submit(4, "rejected", session_id=4)
+        with pytest.raises(UserJobLimitExceeded):
+            queue.check_admission(1)
+    finally:
+        release.set()
+        await queue.stop()
+
+
+def test_admission_errors_map_to_status_codes():
+    from api.routes_chat import _job_admission_errors
+
+    with pytest.raises(HTTPException) as full:
+        with _job_admission_errors():
+            raise JobQueueFull("full")
+    assert full.value.status_code == 503
+    assert full.value.headers["Retry-After"]
+
+    with pytest.raises(HTTPException) as limited:
+        with _job_admission_errors():
+            raise UserJobLimitExceeded("limit")
+    assert limited.value.status_code == 429
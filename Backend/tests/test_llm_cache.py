@@ -0,0 +1,60 @@
+import threading
+import time
+
+from services import llm_cache as llm_cache_module
+from services.llm_cache import LLMCache
+from services.retrieval_cache import SqliteCacheTier
+
+
+def test_token_counting_failure_does_not_fail_the_completion(monkeypatch, fake_llm):
+    def broken(*args, **kwargs):
+        raise KeyError("no encoding for model")
+
+    monkeypatch.setattr(llm_cache_module, "count_tokens", broken)
+    cache = LLMCache(enabled=True)
+
+    first = cache.complete(fake_llm, "Summarize: the quick brown fox")
+    assert first == "Summarize: the quick brown fox"
+    # The completion was still cached
+    assert cache.complete(fake_llm, "Summarize: the quick brown fox") == first
+    assert fake_llm.calls == 1
+
+
+async def test_async_completion_survives_a_metrics_failure(monkeypatch, fake_llm):
+    monkeypatch.setattr(llm_cache_module, "record_llm_call", lambda *a, **k: 1 / 0)
+
+    assert await LLMCache(enabled=False).acomplete(fake_llm, "hello world") == "hello world"
+
+
+async def test_async_paths_keep_the_disk_tier_off_the_event_loop(tmp_path, fake_llm):
+    cache = LLMCache(disk_path=str(tmp_path / "llm.sqlite"))
+    loop_thread = threading.get_ident()
+    threads = []
+    disk_get, disk_set = cache._disk.get, cache._disk.set
+    cache._disk.get = lambda *a: threads.append(threading.get_ident()) or disk_get(*a)
+    cache._disk.set = lambda *a: threads.append(threading.get_ident()) or disk_set(*a)
+
+    first = await cache.acomplete(fake_llm, "attention is all you need")
+    cache._memory.clear()
+    pieces = []
+
+    async def on_token(piece):
+        pieces.append(piece)
+
+    assert await cache.astream_complete(fake_llm, "attention is all you need", on_token) == first
+    assert pieces == [first] and fake_llm.calls == 1
+    assert len(threads) == 3 and loop_thread not in threads
+
+
+def test_disk_hits_do_not_write(tmp_path):
+    tier = SqliteCacheTier(str(tmp_path / "tier.sqlite"), max_entries=2)
+    tier.set("a", "fake", "A", time.time() + 60)
+    tier.set("b", "fake", "B", time.time() + 60)
+    changes = tier._conn.total_changes
+
+    assert tier.get("a")[0] == "A"
+    assert tier._conn.total_changes == changes
+
+    # The buffered access still counts at eviction: "b" is now least recent
+    tier.set("c", "fake", "C", time.time() + 60)
+    assert tier.get("b") is None and tier.get("a") is not None
@@ -0,0 +1,26 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from db.session import engine
+
+
+def test_breaker_counts_are_exposed_as_counters(client):
+    body = client.get("/metrics").text
+    assert "# TYPE dependency_circuit_opened_total counter" in body
+    assert "# TYPE dependency_retries_total counter" in body
+
+
+def test_failed_query_does_not_leave_its_start_time_behind(client):
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM no_such_table"))
+        assert conn.info.get("query_started") == []
+        conn.execute(text("SELECT 1"))
+        assert conn.info["query_started"] == []
+
+
+def test_request_latency_is_labelled_by_route_template(client):
+    assert client.get("/api/sessions/12345/messages").status_code == 200
+    body = client.get("/metrics").text
+    assert 'route="/api/sessions/{session_id}/messages",status="200"' in body
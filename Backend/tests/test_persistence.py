@@ -0,0 +1,49 @@
+from db import models
+from db.session import SessionLocal
+from services import persistence
+
+
+def _session(user_id: int) -> int:
+    with SessionLocal() as db:
+        db.add(models.User(id=user_id, name=f"User {user_id}", email=f"user{user_id}@example.com"))
+        session = models.ResearchSession(user_id=user_id, query="write behind")
+        db.add(session)
+        db.commit()
+        return session.id
+
+
+def test_failed_write_behind_batch_is_retried_not_dropped(client, monkeypatch):
+    session_id = _session(91)
+    buffer = persistence.WriteBehindBuffer(batch_size=100, flush_interval=60, max_retries=2)
+    bulk_insert = persistence._bulk_insert
+
+    def database_down(messages, summaries):
+        raise RuntimeError("database is locked")
+
+    try:
+        buffer.add(session_id, "first question", "first answer")
+        monkeypatch.setattr(persistence, "_bulk_insert", database_down)
+        assert buffer.flush() is False
+        buffer.add(session_id, "second question", "second answer")
+        assert buffer.flush() is False
+
+        monkeypatch.setattr(persistence, "_bulk_insert", bulk_insert)
+        assert buffer.flush() is True
+    finally:
+        buffer.close()
+
+    contents = [m.content for m in persistence.get_messages(session_id)]
+    assert contents == ["first question", "first answer", "second question", "second answer"]
+    assert len(persistence.get_summaries(session_id)) == 2
+
+
+def test_batch_is_dropped_after_max_retries(client, monkeypatch):
+    buffer = persistence.WriteBehindBuffer(batch_size=100, flush_interval=60, max_retries=1)
+    monkeypatch.setattr(persistence, "_bulk_insert", lambda messages, summaries: 1 / 0)
+    try:
+        buffer.add(_session(92), "question", "answer")
+        assert buffer.flush() is False
+        assert buffer.flush() is False
+        assert buffer._messages == []  # given up on, so the buffer can't grow without bound
+    finally:
+        buffer.close()
@@ -0,0 +1,47 @@
+import time
+
+import pytest
+
+from core.config import get_settings
+from services.retriever import register_fixture_providers
+from services.sources import FixtureProvider, register_provider
+from workflows.research_graph import get_research_graph
+
+settings = get_settings()
+
+
+@pytest.fixture
+def skewed_sources(client, fake_llm, monkeypatch):
+    # arXiv is slow with short papers; Wikipedia answers fast with a lot of text
+    register_provider(FixtureProvider("arxiv", latency=1.5, words=300))
+    register_provider(FixtureProvider("wikipedia", latency=0.1, words=6000))
+    # One model call at a time (e.g. a tight rate limit), so summarizing takes a while
+    monkeypatch.setattr(settings, "SUMMARY_MAX_CONCURRENCY", 1)
+    fake_llm.latency = 0.3
+    # Warm up, so neither timed run pays for first-request setup
+    client.post("/api/chat", json={"user_id": 1, "query": "warm up"})
+    yield
+    register_fixture_providers()
+
+
+def _timed_chat(client, monkeypatch, pipelined: bool, query: str) -> float:
+    monkeypatch.setattr(settings, "SUMMARY_PIPELINED", pipelined)
+    get_research_graph.cache_clear()
+    try:
+        started = time.perf_counter()
+        response = client.post("/api/chat", json={"user_id": 1, "query": query})
+        elapsed = time.perf_counter() - started
+    finally:
+        get_research_graph.cache_clear()
+    assert response.status_code == 200
+    assert not response.json()["result"].startswith("Error")
+    return elapsed
+
+
+def test_pipelined_mode_summarizes_while_the_slow_source_is_fetched(client, skewed_sources, monkeypatch):
+    sequential = _timed_chat(client, monkeypatch, False, "protein folding sequential")
+    pipelined = _timed_chat(client, monkeypatch, True, "protein folding pipelined")
+
+    # Wikipedia's summary (two chunks + final, ~0.9 s) overlaps arXiv's 1.5 s fetch
+    # instead of following it; sequential mode also waits on a third chunk
+    assert pipelined < sequential - 0.3, (pipelined, sequential)
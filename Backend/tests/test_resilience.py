@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from core.resilience import CircuitBreaker, CircuitOpenError, Dependency
+
+
+def _dependency(**kwargs) -> Dependency:
+    return Dependency("test", breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.05), **kwargs)
+
+
+async def _fail():
+    raise ConnectionError("down")
+
+
+async def _ok():
+    return "ok"
+
+
+async def test_breaker_opens_and_recovers():
+    dependency = _dependency()
+    with pytest.raises(ConnectionError):
+        await dependency.acall(_fail, retry_on=lambda e: False)
+    with pytest.raises(CircuitOpenError):
+        await dependency.acall(_ok)
+
+    await asyncio.sleep(0.06)
+    assert await dependency.acall(_ok) == "ok"
+    assert dependency.breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_cancelled_probe_releases_half_open_breaker():
+    dependency = _dependency()
+    with pytest.raises(ConnectionError):
+        await dependency.acall(_fail, retry_on=lambda e: False)
+    await asyncio.sleep(0.06)
+
+    probe = asyncio.create_task(dependency.acall(asyncio.sleep, 10))
+    await asyncio.sleep(0.01)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    assert await dependency.acall(_ok) == "ok"
+    assert dependency.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_sync_call_retries_transient_errors():
+    dependency = Dependency("sync")
+    dependency.policy.base_delay = 0
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise TimeoutError("slow")
+        return "ok"
+
+    assert dependency.call(flaky) == "ok"
+    assert len(attempts) == 2
+
+
+def test_utils_retry_keeps_its_signature():
+    from core.utils import retry
+
+    calls = []
+
+    @retry(max_retries=3, delay=0, backoff=1)
+    def flaky():
+        calls.append(1)
+        if len(calls) < 2:
+            raise ValueError("once")
+        return "ok"
+
+    assert flaky() == "ok"
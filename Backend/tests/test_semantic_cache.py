@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from services.semantic_cache import KIND_QUERY, SemanticCache, VectorIndex
+
+
+def test_rows_orphaned_by_an_interrupted_append_are_cut_off(tmp_path):
+    index = VectorIndex(str(tmp_path), dim=4)
+    index.append([1], [KIND_QUERY], np.eye(4, dtype=np.float32)[:1])
+    # Vectors and kinds written, then the process died before the ids
+    with open(index._vectors_path, "ab") as f:
+        f.write(np.zeros((1, 4), dtype=np.float32).tobytes())
+    with open(index._kinds_path, "ab") as f:
+        f.write(b"\x00")
+
+    reopened = VectorIndex(str(tmp_path), dim=4)
+    reopened.append([2], [KIND_QUERY], np.eye(4, dtype=np.float32)[1:2])
+
+    assert len(reopened) == 2
+    assert reopened.search(np.eye(4, dtype=np.float32)[1], k=1) == [(2, pytest.approx(1.0))]
+
+
+def test_interrupted_backfill_resumes_without_duplicates(tmp_path):
+    cache = SemanticCache(str(tmp_path), threshold=0.9)
+    rows = [(i, f"query about topic {i}", f"summary of topic {i}") for i in range(10)]
+
+    def crashing():
+        yield from rows[:6]
+        raise RuntimeError("killed")
+
+    with pytest.raises(RuntimeError):
+        cache.backfill(crashing(), batch_size=4)
+    assert not cache.index.is_backfilled()
+    # A request finishing meanwhile indexes its session, which the backfill also lists
+    cache.add(8, rows[8][1], rows[8][2])
+
+    cache.backfill(rows, batch_size=4)
+    cache.add(8, rows[8][1], rows[8][2])
+
+    assert cache.index.is_backfilled()
+    assert len(cache.index) == 2 * len(rows)
+    assert cache.lookup("query about topic 3")[0] == 3
@@ -0,0 +1,28 @@
+import asyncio
+
+import pytest
+
+from services.retriever import afan_out_retrieve, register_fixture_providers
+from services.sources import FixtureProvider, register_provider
+
+
+@pytest.fixture
+def slow_arxiv():
+    # Slow, one at a time and rate-limited: a backlog of arXiv fetches builds up
+    register_provider(FixtureProvider("arxiv", latency=0.5, words=50, max_concurrency=1, rate_limit=2.0))
+    register_provider(FixtureProvider("wikipedia", latency=0.02, words=50, max_concurrency=4))
+    yield
+    register_fixture_providers()
+
+
+async def test_slow_source_does_not_starve_a_fast_one(slow_arxiv):
+    runs = await asyncio.gather(*(
+        afan_out_retrieve(f"query {i}", ["arxiv", "wikipedia"], source_timeout=1.0, deadline=1.0)
+        for i in range(16)
+    ))
+
+    wikipedia = [timings["wikipedia"] for _, timings in runs]
+    assert all(t["status"] == "ok" for t in wikipedia)
+    assert max(t["elapsed"] for t in wikipedia) < 0.5
+    # arXiv's own backlog times out instead
+    assert sum(timings["arxiv"]["status"] == "timeout" for _, timings in runs) >= 10
@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Regression budget for a cold `import main` (what an autoscaled replica pays before serving)
+IMPORT_BUDGET_S = 1.5
+IDLE_RSS_BUDGET_MB = 100
+LAZY_MODULES = ("langchain_openai", "langgraph", "langchain_community")
+
+# Resident memory is read from /proc: ru_maxrss survives exec, so a child
+# started from the test process would report the test process's peak
+_PROBE = """
+import json, sys
+import main
+with open("/proc/self/status") as status:
+    rss_kb = next(int(line.split()[1]) for line in status if line.startswith("VmRSS:"))
+print(json.dumps({
+    "rss_mb": rss_kb / 1024,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+def _import_main(cwd) -> tuple[dict, float]:
+    env = {
+        **os.environ,
+        "PYTHONPATH": BACKEND,
+        "PYTHONDONTWRITEBYTECODE": "1",
+        "DATABASE_URL": f"sqlite:///{cwd}/app.db",
+    }
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE],
+        cwd=cwd, env=env, capture_output=True, text=True, timeout=120, check=True,
+    )
+    # Last field of each "import time: self | cumulative | name" line, in microseconds
+    cumulative = {
+        line.rsplit("|", 1)[1].strip(): int(line.split("|")[1])
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and line.split("|")[1].strip().isdigit()
+    }
+    return json.loads(result.stdout.strip().splitlines()[-1]), cumulative["main"] / 1e6
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="reads RSS from /proc")
+def test_import_main_stays_within_budget(tmp_path, bench):
+    probe, seconds = _import_main(tmp_path)
+    bench.report("cold import", import_s=seconds, rss_mb=probe["rss_mb"])
+
+    assert probe["loaded"] == [], "heavy modules should load on first use, not at import"
+    assert seconds < IMPORT_BUDGET_S, f"import main took {seconds:.2f}s"
+    assert probe["rss_mb"] < IDLE_RSS_BUDGET_MB, f"idle RSS {probe['rss_mb']:.0f} MB"
+    # Caches, the corpus and log files are opened on first use
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,26 @@
+import asyncio
+
+from conftest import FakeLLM
+from core.config import get_settings
+from services.retriever import retrieve_from_sources
+from services.summarizer import asummarize_text, summarize_text
+
+settings = get_settings()
+
+
+def test_sync_summarize_text_runs_the_async_pipeline(monkeypatch):
+    monkeypatch.setattr(settings, "SUMMARY_CHUNK_TOKENS", 100)
+    monkeypatch.setattr(settings, "SUMMARY_CHUNK_OVERLAP", 10)
+    text = "\n\n".join(f"Paragraph {i} explains how attention weights neighbouring nodes." for i in range(60))
+
+    expected = asyncio.run(asummarize_text(text, use_cache=False, client=FakeLLM()))
+    llm = FakeLLM()
+    # Scripts calling the blocking wrapper get the same map-reduce result
+    assert summarize_text(text, use_cache=False, client=llm) == expected
+    assert llm.calls > 2
+
+
+def test_retrieve_from_sources_returns_each_sources_documents():
+    results = retrieve_from_sources("graph neural networks", ["arxiv", "wikipedia", "nope"])
+    assert len(results["arxiv"]) == len(results["wikipedia"]) == 3
+    assert results["nope"] == "Unknown source: nope"
@@ -0,0 +1,33 @@
+import pytest
+
+from core import tokens
+from services.chunker import iter_token_chunks
+
+
+@pytest.fixture
+def offline_tiktoken(monkeypatch):
+    import tiktoken
+
+    def unavailable(*args, **kwargs):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(tiktoken, "encoding_for_model", unavailable)
+    tokens.get_encoding.cache_clear()
+    yield
+    tokens.get_encoding.cache_clear()
+
+
+def test_falls_back_to_an_estimate_when_the_encoding_cannot_load(offline_tiktoken):
+    text = "Summarization should keep working without network access. " * 20
+    assert isinstance(tokens.get_encoding(), tokens.ApproximateEncoding)
+    assert abs(tokens.count_tokens(text) - len(text) / 4) < len(text) / 8
+    # The failed load is cached, not retried per call
+    assert tokens.get_encoding() is tokens.get_encoding()
+
+
+def test_chunking_works_with_the_estimate(offline_tiktoken):
+    text = "\n\n".join(f"Paragraph {i} has a few sentences. It ends here." for i in range(400))
+    chunks = list(iter_token_chunks(text, max_tokens=200, overlap=20))
+    assert len(chunks) > 1
+    assert all(tokens.count_tokens(chunk) <= 200 for chunk in chunks)
+    assert chunks[0].startswith("Paragraph 0") and chunks[-1].endswith("It ends here.")
@@ -1,20 +1,50 @@
-from services.retriever import retrieve_from_sources
-from services.summarizer import summarize_text
+from services.retriever import DEFAULT_SOURCES, afan_out_retrieve
+from core.config import get_settings
+from services.grounding import grounding_score
+from services.summarizer import amerge_summaries, arefine_summary, asummarize_with_partials
+
+settings = get_settings()
 
 class RetrieverAgent:
-    def run(self, query: str, sources: list[str] = ["arxiv", "wikipedia"]):
-        return retrieve_from_sources(query, sources)
+    async def arun(self, query: str, sources=DEFAULT_SOURCES, on_result=None, on_documents=None):
+        """
+        Fetch from all sources in parallel.
+        Returns (results, timings) as produced by afan_out_retrieve.
+        """
+        return await afan_out_retrieve(query, sources, on_result=on_result, on_documents=on_documents)
 
 class SummarizerAgent:
-    def run(self, text: str):
-        return summarize_text(text)
+    async def arun(self, text: str, on_token=None):
+        """Returns (summary, partials); see asummarize_with_partials."""
+        return await asummarize_with_partials(text, on_token=on_token)
+
+    async def amerge(self, summaries_by_source: dict, on_token=None):
+        return await amerge_summaries(summaries_by_source, on_token=on_token)
+
+    async def arefine(self, partials: list[str], draft: str, feedback: str):
+        return await arefine_summary(partials, draft, feedback)
 
 class CriticAgent:
-    def run(self, text: str) -> dict:
+    def __init__(self, min_grounding: float = None):
+        self.min_grounding = settings.CRITIC_MIN_GROUNDING if min_grounding is None else min_grounding
+
+    def run(self, text: str, sources: str = None) -> dict:
         """
-        Evaluates quality of the summary.
-        Returns {"ok": bool, "reason": str}
+        Evaluates quality of the summary, against the source text when given.
+        Returns {"ok": bool, "reason": str} plus "grounding" when sources were checked.
         """
+        if text.startswith("Error "):
+            return {"ok": False, "reason": "Summary generation failed"}
         if "lorem ipsum" in text.lower():
             return {"ok": False, "reason": "Hallucination detected (nonsense text)"}
+        if sources:
+            grounding = round(grounding_score(text, sources), 3)
+            if grounding < self.min_grounding:
+                return {
+                    "ok": False,
+                    "reason": f"Only {grounding:.0%} of its word pairs appear in the sources; "
+                              "drop claims the sources don't support",
+                    "grounding": grounding,
+                }
+            return {"ok": True, "reason": "Looks fine", "grounding": grounding}
         return {"ok": True, "reason": "Looks fine"}
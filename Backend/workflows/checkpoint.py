@@ -0,0 +1,105 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional
+
+from langchain_core.pydantic_v1 import PrivateAttr
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.utils import ConfigurableFieldSpec
+from langgraph.checkpoint.base import BaseCheckpointSaver, Checkpoint, CheckpointAt
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver):
+    """
+    Keeps the latest checkpoint of each graph thread in a local SQLite file,
+    written after every step, so a run that fails or is interrupted can be
+    resumed from its last completed node.
+
+    Checkpoints are pickled and zlib-compressed; only the newest
+    ``max_threads`` threads are kept. Once a run is done (its ``saved``
+    value is true) nothing will resume it, so the ``compact_keys`` values
+    (the bulky documents) are dropped from its checkpoint, including from
+    the state copies langgraph keeps per channel.
+    """
+
+    path: str
+    max_threads: int = 1000
+    compact_keys: tuple = ()
+    at: CheckpointAt = CheckpointAt.END_OF_STEP
+
+    _conn: sqlite3.Connection = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(self, **data):
+        super().__init__(**data)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            " thread_id TEXT PRIMARY KEY,"
+            " checkpoint BLOB NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_checkpoints_updated_at ON checkpoints (updated_at)"
+        )
+        self._conn.commit()
+
+    @property
+    def config_specs(self) -> list[ConfigurableFieldSpec]:
+        return [
+            ConfigurableFieldSpec(
+                id="thread_id",
+                annotation=str,
+                name="Thread ID",
+                description=None,
+                default="",
+                is_shared=True,
+            ),
+        ]
+
+    def get(self, config: RunnableConfig) -> Optional[Checkpoint]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT checkpoint FROM checkpoints WHERE thread_id = ?",
+                (config["configurable"]["thread_id"],),
+            ).fetchone()
+        return pickle.loads(zlib.decompress(row[0])) if row else None
+
+    def _compact(self, values: dict) -> dict:
+        # The state keys themselves, plus the copies of the state langgraph keeps
+        # in node inboxes, node outputs and __end__
+        return {
+            k: {ik: iv for ik, iv in v.items() if ik not in self.compact_keys} if isinstance(v, dict) else v
+            for k, v in values.items()
+            if k not in self.compact_keys
+        }
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint) -> None:
+        values = checkpoint["channel_values"]
+        if self.compact_keys and values.get("saved"):
+            checkpoint = {**checkpoint, "channel_values": self._compact(values)}
+        # Serialized here, so later in-place changes by the graph don't leak in
+        blob = zlib.compress(pickle.dumps(checkpoint, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint, updated_at) VALUES (?, ?, ?)",
+                (config["configurable"]["thread_id"], blob, time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM checkpoints WHERE thread_id IN ("
+                " SELECT thread_id FROM checkpoints ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_threads,),
+            )
+            self._conn.commit()
+
+    def delete(self, thread_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            self._conn.commit()
@@ -1,66 +1,181 @@
+import asyncio
+from core.config import get_settings
 from services import persistence
+from core.tokens import count_tokens
+from services.passages import format_documents, format_passages, iter_documents, select_passages
+from services.summarizer import refine_prompt
+from services.semantic_cache import get_semantic_cache
 from workflows.agents import RetrieverAgent, SummarizerAgent, CriticAgent
+from workflows.state import ResearchState
+
+settings = get_settings()
 
 retriever = RetrieverAgent()
 summarizer = SummarizerAgent()
 critic = CriticAgent()
 
-def fetch_papers_node(state: dict) -> dict:
+def _configurable(config) -> dict:
+    return (config or {}).get("configurable") or {}
+
+def _get_emitter(config):
+    """
+    Progress callback for streaming runs: ``await emit(event, data)``.
+    Passed in as config["configurable"]["emit"]; None for plain runs.
+    """
+    return _configurable(config).get("emit")
+
+async def reuse_lookup_node(state: ResearchState) -> dict:
+    """Reuse the summary of a near-identical earlier query, if the semantic cache finds one."""
+    cache = get_semantic_cache()
+    if cache is None:
+        return {}
+    try:
+        match = await asyncio.to_thread(cache.lookup, state["query"])
+        if match is None:
+            return {}
+        session_id, score = match
+        summary = await asyncio.to_thread(persistence.get_latest_summary, session_id)
+    except Exception:
+        return {}
+    if not summary:
+        return {}
+    return {"summary": summary, "reused_from": {"session_id": session_id, "score": round(score, 4)}}
+
+def _has_documents(state: ResearchState) -> bool:
+    """True when the run was seeded with the documents of an earlier, failed attempt."""
+    docs = state.get("retrieved_docs")
+    return bool(docs) and "error" not in docs
+
+async def fetch_papers_node(state: ResearchState, config: dict = None) -> dict:
+    if _has_documents(state):
+        return {}
     query = state["query"]
+    emit = _get_emitter(config)
+
+    async def on_result(source, timing):
+        await emit("source", {"source": source, **timing})
+
     try:
-        results = retriever.run(query)
-        return {**state, "retrieved_docs": results}
+        results, timings = await retriever.arun(query, on_result=on_result if emit else None)
+        return {"retrieved_docs": results, "retrieval_timings": timings}
     except Exception as e:
-        return {**state, "retrieved_docs": {"error": f"Failed to retrieve documents: {str(e)}"}}
+        return {
+            "retrieved_docs": {"error": f"Failed to retrieve documents: {str(e)}"},
+            "retrieval_timings": {},
+        }
+
+def _source_text(state: ResearchState) -> str:
+    """
+    Ranked context when available, otherwise the retrieved documents under
+    their source headers, capped at SOURCE_TEXT_MAX_CHARS.
+    """
+    context = state.get("context")
+    if context is not None:
+        return context
+    documents = iter_documents(
+        state.get("retrieved_docs") or {},
+        max_chars=settings.SOURCE_TEXT_MAX_CHARS,
+        truncation=settings.SOURCE_TEXT_TRUNCATION,
+    )
+    return "".join(format_documents(documents))
+
+async def rank_passages_node(state: ResearchState) -> dict:
+    """Deduplicate the retrieved documents and keep the passages most relevant to the query."""
+    if not settings.CONTEXT_RANKING_ENABLED or state.get("context") is not None:
+        return {}
+    docs = state.get("retrieved_docs") or {}
+    try:
+        passages, stats = await asyncio.to_thread(
+            select_passages,
+            state["query"],
+            docs,
+            token_budget=settings.CONTEXT_TOKEN_BUDGET,
+            max_words=settings.PASSAGE_MAX_WORDS,
+            dedup_distance=settings.PASSAGE_DEDUP_DISTANCE,
+            model=settings.SUMMARY_MODEL,
+            max_chars=settings.SOURCE_TEXT_MAX_CHARS,
+            truncation=settings.SOURCE_TEXT_TRUNCATION,
+        )
+    except Exception:
+        # Fall back to summarizing the raw documents
+        return {}
+    return {"context": format_passages(passages), "context_stats": stats}
+
+async def summarize_node(state: ResearchState, config: dict = None) -> dict:
+    emit = _get_emitter(config)
+
+    async def on_token(piece):
+        await emit("token", {"text": piece})
+
+    combined_text = _source_text(state)
+    partials = []
 
-def summarize_node(state: dict) -> dict:
-    docs = state.get("retrieved_docs", {})
-    combined_text = ""
-    
-    for source, content in docs.items():
-        if isinstance(content, list):
-            combined_text += f"\n--- {source.upper()} ---\n"
-            combined_text += "\n".join(content)
-        else:
-            combined_text += f"\n--- {source.upper()} ---\n{content}"
-    
     if combined_text.strip():
         try:
-            summary = summarizer.run(combined_text)
+            summary, partials = await summarizer.arun(combined_text, on_token=on_token if emit else None)
         except Exception as e:
             summary = f"Error generating summary: {str(e)}"
     else:
         summary = "No content found to summarize."
     
-    return {**state, "summary": summary}
+    return {"summary": summary, "partial_summaries": partials}
+
+async def critic_node(state: ResearchState) -> dict:
+    summary = state.get("summary") or ""
+    review = await asyncio.to_thread(critic.run, summary, _source_text(state))
+    return {"critic_review": review}
 
-def critic_node(state: dict) -> dict:
-    summary = state.get("summary", "")
-    review = critic.run(summary)
-    return {**state, "critic_review": review}
+async def refine_node(state: ResearchState) -> dict:
+    """
+    Rewrite a rejected summary from the first pass's partial summaries and the
+    critic's feedback; only the final reduce is redone. Each pass counts
+    against CRITIC_MAX_REFINES and CRITIC_REFINE_TOKEN_BUDGET.
+    """
+    iterations = (state.get("refine_iterations") or 0) + 1
+    tokens_used = state.get("refine_tokens") or 0
+    partials = state.get("partial_summaries") or []
+    draft = state.get("summary") or ""
+    feedback = (state.get("critic_review") or {}).get("reason", "")
 
-def persistence_node(state: dict) -> dict:
-    session_id = state["session_id"]
+    prompt_tokens = count_tokens(refine_prompt(partials, draft, feedback), settings.SUMMARY_MODEL)
+    if not partials or tokens_used + prompt_tokens > settings.CRITIC_REFINE_TOKEN_BUDGET:
+        # Out of budget: keep the current summary and stop refining
+        return {"refine_iterations": settings.CRITIC_MAX_REFINES, "refine_tokens": tokens_used}
+
+    summary = await summarizer.arefine(partials, draft, feedback)
+    if summary.startswith("Error "):
+        summary = draft
+    return {"summary": summary, "refine_iterations": iterations, "refine_tokens": tokens_used + prompt_tokens}
+
+async def persistence_node(state: ResearchState, config: dict = None) -> dict:
+    session_id = _configurable(config)["session_id"]
+
+    summary = state.get("summary") or ""
+    # A retry of a failed run already stored the user's question
+    include_query = not state.get("query_recorded")
 
     try:
-        persistence.save_message(
+        if summary.startswith("Error"):
+            # Not a turn: keep only the question, so the retry resumes from the documents
+            # and its answer lands under the same user message
+            if include_query:
+                await asyncio.to_thread(persistence.save_message, session_id, state["query"], "user")
+            return {"saved": False, "error": summary, "query_recorded": True}
+
+        # Blocking DB write goes to a worker thread so the event loop stays free
+        await asyncio.to_thread(
+            persistence.record_research_turn,
             session_id=session_id,
-            content=state["query"],
-            role="user"
+            query=state["query"],
+            summary=summary,
+            critic_review=state.get("critic_review"),
+            include_query=include_query,
         )
 
-        if "summary" in state:
-            persistence.save_message(
-                session_id=session_id,
-                content=state["summary"],
-                role="assistant"
-            )
-
-            persistence.save_summary(
-                session_id=session_id,
-                summary=state["summary"]
-            )
+        cache = get_semantic_cache()
+        if cache is not None and summary and not state.get("reused_from"):
+            await asyncio.to_thread(cache.add, session_id, state["query"], summary)
 
-        return {**state, "saved": True}
+        return {"saved": True}
     except Exception as e:
-        return {**state, "saved": False, "error": f"Failed to save: {str(e)}"}
+        return {"saved": False, "error": f"Failed to save: {str(e)}"}
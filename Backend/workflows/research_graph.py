@@ -1,40 +1,140 @@
-from langgraph.graph import StateGraph, END
+import asyncio
+import logging
+import time
+from functools import lru_cache
+
+from core.config import get_settings
+from core.metrics import timed_node
 from workflows import nodes
+from workflows.pipeline import pipelined_research_node
+from workflows.state import ResearchState
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+def critic_condition(state: ResearchState):
+    review = state.get("critic_review") or {}
+    if review.get("ok", True):
+        return "persist"
+    # Bounded: at most CRITIC_MAX_REFINES passes, each within the refine token budget
+    if (state.get("refine_iterations") or 0) >= settings.CRITIC_MAX_REFINES:
+        return "persist"
+    return "refine"
+
+
+def reuse_condition(state: ResearchState):
+    return "persist" if state.get("reused_from") else "fetch"
 
-def build_research_graph(db, user_id: int, query: str):
-    graph = StateGraph(dict)
 
-    graph.add_node("fetch", nodes.fetch_papers_node)
+def build_research_graph():
+    """Build and compile the research graph. Use get_research_graph() to share one instance."""
+    # Imported here: langgraph and langchain_core are slow to import and only needed once
+    from langgraph.graph import END, StateGraph
+    from workflows.checkpoint import SqliteCheckpointSaver
 
-    graph.add_node("summarize", nodes.summarize_node)
+    graph = StateGraph(ResearchState)
 
-    graph.add_node("critic", nodes.critic_node)
+    graph.add_node("lookup", timed_node("lookup", nodes.reuse_lookup_node))
 
-    graph.add_node("persist", nodes.persistence_node)
+    if settings.SUMMARY_PIPELINED:
+        # One node that overlaps fetching and per-source summarizing
+        graph.add_node("pipeline", timed_node("pipeline", pipelined_research_node))
+        research_entry, research_exit = "pipeline", "pipeline"
+    else:
+        graph.add_node("fetch", timed_node("fetch", nodes.fetch_papers_node))
 
-    graph.set_entry_point("fetch")
-    graph.add_edge("fetch", "summarize")
-    graph.add_edge("summarize", "critic")
+        graph.add_node("rank", timed_node("rank", nodes.rank_passages_node))
 
-    def critic_condition(state: dict):
-        review = state.get("critic_review", {})
-        return "summarize" if not review.get("ok", True) else "persist"
+        graph.add_node("summarize", timed_node("summarize", nodes.summarize_node))
+
+        graph.add_edge("fetch", "rank")
+        graph.add_edge("rank", "summarize")
+        research_entry, research_exit = "fetch", "summarize"
+
+    graph.add_node("critic", timed_node("critic", nodes.critic_node))
+
+    graph.add_node("refine", timed_node("refine", nodes.refine_node))
+
+    graph.add_node("persist", timed_node("persist", nodes.persistence_node))
+
+    graph.set_entry_point("lookup")
+    graph.add_conditional_edges(
+        "lookup",
+        reuse_condition,
+        {"fetch": research_entry, "persist": "persist"}
+    )
+    graph.add_edge(research_exit, "critic")
 
     graph.add_conditional_edges(
         "critic",
         critic_condition,
-        {"summarize": "summarize", "persist": "persist"}
+        {"refine": "refine", "persist": "persist"}
     )
+    graph.add_edge("refine", "critic")
 
     graph.add_edge("persist", END)
 
-    compiled_graph = graph.compile()
+    checkpointer = None
+    if settings.CHECKPOINT_ENABLED and settings.CHECKPOINT_PATH:
+        checkpointer = SqliteCheckpointSaver(
+            path=settings.CHECKPOINT_PATH, max_threads=settings.CHECKPOINT_MAX_THREADS,
+            compact_keys=("retrieved_docs", "context", "partial_summaries"),
+        )
+    return graph.compile(checkpointer=checkpointer)
+
+
+@lru_cache(maxsize=1)
+def get_research_graph():
+    """Process-wide compiled research graph, built on first use."""
+    started = time.perf_counter()
+    compiled_graph = build_research_graph()
+    logger.info(f"Research graph compiled in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return compiled_graph
+
+
+def research_inputs(query: str) -> ResearchState:
+    return {"query": query}
+
+
+def research_config(user_id: int, session_id: int, **extra) -> dict:
+    """
+    Run config carrying the per-request context nodes need. The session is
+    also the checkpoint thread, so a session's run can be resumed.
+    """
+    return {"configurable": {"user_id": user_id, "session_id": session_id, "thread_id": str(session_id), **extra}}
+
+
+# What a retry after a failed run keeps: the fetched documents, their ranking,
+# and whether the user message was already stored
+RESUMABLE_KEYS = ("retrieved_docs", "retrieval_timings", "context", "context_stats", "query_recorded")
 
-    initial_state = {
-        "db": db,
-        "user_id": user_id,
-        "query": query,
-        "session_id": None,
-    }
 
-    return compiled_graph, initial_state
+async def run_research(query: str, user_id: int, session_id: int, **extra) -> ResearchState:
+    """
+    Run the research graph for a session, picking up from its checkpoint when
+    there is one for the same query: an interrupted run resumes after its
+    last completed node, and a finished one returns its final state as-is.
+    A run that finished without a usable summary is run again from its
+    retrieved documents. A checkpoint for a different query is discarded.
+    """
+    graph = get_research_graph()
+    config = research_config(user_id, session_id, **extra)
+    thread_id = config["configurable"]["thread_id"]
+    saver = graph.checkpointer
+    inputs = research_inputs(query)
+    if saver is not None:
+        checkpoint = await saver.aget(config)
+        if checkpoint is not None:
+            values = checkpoint["channel_values"]
+            if values.get("query") == query:
+                if values.get("saved"):
+                    return {k: v for k, v in values.items() if k in ResearchState.__annotations__}
+                if "saved" not in values:
+                    logger.info(f"Resuming research run for session {session_id}")
+                    return await graph.ainvoke(None, config=config)
+                # Reached the end but failed (e.g. the model was down): start over, minus the fetch
+                logger.info(f"Retrying research run for session {session_id} from its retrieved documents")
+                inputs.update({k: values[k] for k in RESUMABLE_KEYS if values.get(k) is not None})
+            await asyncio.to_thread(saver.delete, thread_id)
+    return await graph.ainvoke(inputs, config=config)
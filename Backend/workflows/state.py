@@ -0,0 +1,23 @@
+from typing import Optional, TypedDict
+
+
+class ResearchState(TypedDict, total=False):
+    """
+    Graph state. Only plain data lives here; per-request context such as
+    session_id, user_id or the streaming emitter travels in the run config.
+    Nodes return just the keys they change.
+    """
+    query: str
+    retrieved_docs: dict
+    retrieval_timings: dict
+    context: str  # ranked, deduplicated passages handed to the summarizer
+    context_stats: dict
+    summary: str
+    partial_summaries: list  # chunk summaries behind the final reduce, reused by refine
+    critic_review: dict
+    refine_iterations: int
+    refine_tokens: int  # prompt tokens spent on refine passes
+    saved: bool
+    query_recorded: bool  # the user message is stored; a retry must not write it again
+    error: Optional[str]
+    reused_from: Optional[dict]  # {"session_id", "score"} when an earlier summary was reused
@@ -28,12 +28,17 @@ function App() {
   const {
     userId,
     history,
+    hasMoreHistory,
+    loadingMore,
     selectedSession,
     selectedSessionId,
     loading,
     error,
     submitting,
+    progress,
     refreshHistory,
+    loadMoreSessions,
+    loadMoreMessages,
     submitQuery,
     selectSession,
     updateUserId,
@@ -44,7 +49,6 @@ function App() {
   const [newQuery, setNewQuery] = useState('');
   const [followUp, setFollowUp] = useState('');
   const [showProgress, setShowProgress] = useState(false);
-  const [progressStep, setProgressStep] = useState(0);
   const [showSettings, setShowSettings] = useState(false);
 
   // Character count for inputs
@@ -57,44 +61,18 @@ function App() {
     if (!newQuery.trim() || queryCharCount.isOverLimit || submitting) return;
 
     setShowProgress(true);
-    setProgressStep(0);
-
-    // Simulate progress steps
-    const steps = [
-      'Connecting to research sources...',
-      'Retrieving relevant documents...',
-      'Analyzing information...',
-      'Generating AI summary...',
-    ];
-
-    const progressInterval = setInterval(() => {
-      setProgressStep(prev => {
-        if (prev < steps.length - 1) {
-          return prev + 1;
-        }
-        clearInterval(progressInterval);
-        return prev;
-      });
-    }, 1000);
 
     try {
       const result = await submitQuery(newQuery);
       if (result) {
         setNewQuery('');
-        setProgressStep(steps.length);
-        setTimeout(() => {
-          setShowProgress(false);
-          setProgressStep(0);
-        }, 1000);
       }
     } catch (err) {
       console.error('Failed to submit query:', err);
     } finally {
-      clearInterval(progressInterval);
       setTimeout(() => {
         setShowProgress(false);
-        setProgressStep(0);
-      }, 2000);
+      }, 1000);
     }
   };
 
@@ -122,6 +100,14 @@ function App() {
     selectSession(null);
   };
 
+  // Fetch older sessions as the sidebar list nears its end
+  const handleSessionsScroll = (e) => {
+    const { scrollTop, scrollHeight, clientHeight } = e.currentTarget;
+    if (hasMoreHistory && scrollHeight - scrollTop - clientHeight < 100) {
+      loadMoreSessions();
+    }
+  };
+
   const handleToggleSettings = () => {
     setShowSettings(!showSettings);
   };
@@ -148,21 +134,35 @@ function App() {
                 'Research completed!',
               ].map((step, index) => (
                 <div key={index} className="flex items-center space-x-3">
-                  {index < progressStep ? (
+                  {index < progress.stage ? (
                     <CheckCircle className="w-5 h-5 text-green-500" />
-                  ) : index === progressStep ? (
+                  ) : index === progress.stage ? (
                     <Loader2 className="w-5 h-5 text-blue-500 animate-spin" />
                   ) : (
                     <div className="w-5 h-5 rounded-full border-2 border-gray-200" />
                   )}
                   <span className={`text-sm ${
-                    index < progressStep ? 'text-green-600 font-medium' :
-                    index === progressStep ? 'text-blue-600 font-medium' : 'text-gray-500'
+                    index < progress.stage ? 'text-green-600 font-medium' :
+                    index === progress.stage ? 'text-blue-600 font-medium' : 'text-gray-500'
                   }`}>
                     {step}
                   </span>
                 </div>
               ))}
+              {Object.keys(progress.sources).length > 0 && (
+                <div className="flex flex-wrap gap-2">
+                  {Object.values(progress.sources).map((source) => (
+                    <Badge key={source.source} variant={source.status === 'ok' ? 'success' : 'warning'}>
+                      {source.source} · {source.elapsed}s
+                    </Badge>
+                  ))}
+                </div>
+              )}
+              {progress.partialSummary && (
+                <p className="text-sm text-gray-700 max-h-40 overflow-y-auto whitespace-pre-wrap">
+                  {progress.partialSummary}
+                </p>
+              )}
             </CardContent>
           </Card>
         </div>
@@ -195,7 +195,7 @@ function App() {
                 </Avatar>
                 <div className="flex-1">
                   <CardTitle className="text-lg">User #{userId}</CardTitle>
-                  <CardDescription>{history.length} research sessions</CardDescription>
+                  <CardDescription>{history.length}{hasMoreHistory ? '+' : ''} research sessions</CardDescription>
                 </div>
                 <Button variant="outline" size="sm" onClick={handleToggleSettings}>
                   <Settings className="w-4 h-4" />
@@ -223,12 +223,13 @@ function App() {
                 </CardTitle>
                 <CardDescription>Your previous research queries</CardDescription>
               </CardHeader>
-              <CardContent className="space-y-3 max-h-96 overflow-y-auto">
+              <CardContent className="space-y-3 max-h-96 overflow-y-auto" onScroll={handleSessionsScroll}>
                 <SessionList
                   sessions={history}
                   selectedSessionId={selectedSessionId}
                   onSessionSelect={selectSession}
                   loading={loading}
+                  loadingMore={loadingMore}
                 />
               </CardContent>
             </Card>
@@ -254,7 +255,7 @@ function App() {
                   <div className="flex items-center justify-between">
                     <div>
                       <p className="text-sm font-medium text-muted-foreground">Total Sessions</p>
-                      <p className="text-2xl font-bold">{history.length}</p>
+                      <p className="text-2xl font-bold">{history.length}{hasMoreHistory ? '+' : ''}</p>
                     </div>
                     <MessageSquare className="w-8 h-8 text-green-500" />
                   </div>
@@ -300,6 +301,7 @@ function App() {
                   session={selectedSession}
                   loading={loading}
                   error={error}
+                  onLoadMore={loadMoreMessages}
                 />
               </CardContent>
             </Card>
@@ -7,16 +7,29 @@ import { Badge } from '../ui/badge';
 /**
  * Chat container that displays all messages in a conversation
  */
-const ChatContainer = ({ session, loading, error }) => {
+const ChatContainer = ({ session, loading, error, onLoadMore }) => {
   const messagesEndRef = useRef(null);
   const containerRef = useRef(null);
+  const scrolledSessionRef = useRef(null);
 
-  // Auto-scroll to bottom when new messages arrive
+  // Auto-scroll to bottom once a session's first messages arrive; later pages
+  // are loaded by scrolling, so they must not pull the view down again
   useEffect(() => {
-    messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
-  }, [session?.messages]);
+    if (session?.messages?.length && scrolledSessionRef.current !== session.session_id) {
+      scrolledSessionRef.current = session.session_id;
+      messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
+    }
+  }, [session?.session_id, session?.messages]);
 
-  if (loading) {
+  // Fetch the next page of messages when the view nears the end of what is loaded
+  const handleScroll = (e) => {
+    const { scrollTop, scrollHeight, clientHeight } = e.currentTarget;
+    if (session?.hasMoreMessages && scrollHeight - scrollTop - clientHeight < 200) {
+      onLoadMore?.();
+    }
+  };
+
+  if (loading || (session?.loadingMessages && !session.messages?.length)) {
     return (
       <div className="flex-1 flex items-center justify-center">
         <div className="text-center space-y-4">
@@ -112,7 +125,7 @@ const ChatContainer = ({ session, loading, error }) => {
             Research Conversation
           </h2>
           <p className="text-muted-foreground mt-1">
-            Session #{session.session_id} • {messages.length} message{messages.length !== 1 ? 's' : ''}
+            Session #{session.session_id} • {session.message_count ?? messages.length} message{(session.message_count ?? messages.length) !== 1 ? 's' : ''}
           </p>
         </div>
         <Badge variant="success" className="flex items-center gap-1">
@@ -124,6 +137,7 @@ const ChatContainer = ({ session, loading, error }) => {
       {/* Messages container */}
       <div 
         ref={containerRef}
+        onScroll={handleScroll}
         className="flex-1 overflow-y-auto space-y-6 pr-2"
         style={{ maxHeight: 'calc(100vh - 500px)' }}
       >
@@ -133,6 +147,11 @@ const ChatContainer = ({ session, loading, error }) => {
             message={message} 
           />
         ))}
+        {session.hasMoreMessages && (
+          <p className="text-center text-xs text-muted-foreground">
+            {session.loadingMessages ? 'Loading more messages...' : 'Scroll for more messages'}
+          </p>
+        )}
         <div ref={messagesEndRef} />
       </div>
     </div>
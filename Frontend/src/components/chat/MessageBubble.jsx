@@ -3,7 +3,7 @@ import { cn } from '../../lib/utils';
 import { Card, CardContent } from '../ui/card';
 import { Avatar, AvatarFallback } from '../ui/avatar';
 import { Badge } from '../ui/badge';
-import { User, Brain, Settings } from 'lucide-react';
+import { User, Brain, Settings, ShieldCheck } from 'lucide-react';
 
 /**
  * Individual message bubble component with modern card-based design
@@ -31,6 +31,15 @@ const MessageBubble = ({ message }) => {
           badgeVariant: 'warning',
           textClass: 'text-amber-800'
         };
+      case 'critic':
+        return {
+          sender: 'Critic Review',
+          icon: <ShieldCheck className="w-4 h-4" />,
+          cardClass: 'mx-auto max-w-[90%] bg-slate-50 border-slate-200',
+          avatarClass: 'bg-slate-100 text-slate-600',
+          badgeVariant: 'outline',
+          textClass: 'text-slate-700 text-sm'
+        };
       default:
         return {
           sender: 'AI Assistant',
@@ -8,7 +8,7 @@ import { Badge } from '../ui/badge';
  * Session list item component with modern card design
  */
 const SessionItem = ({ session, isSelected, onClick }) => {
-  const { session_id, query, created_at, messages = [] } = session;
+  const { session_id, query, created_at, message_count = 0 } = session;
   
   return (
     <Card 
@@ -33,7 +33,7 @@ const SessionItem = ({ session, isSelected, onClick }) => {
           </div>
           <Badge variant="secondary" className="flex items-center gap-1">
             <MessageSquare className="h-3 w-3" />
-            {messages.length}
+            {message_count}
           </Badge>
         </div>
         
@@ -57,7 +57,8 @@ const SessionList = ({
   sessions = [], 
   selectedSessionId, 
   onSessionSelect, 
-  loading 
+  loading,
+  loadingMore = false,
 }) => {
   if (loading) {
     return (
@@ -94,6 +95,9 @@ const SessionList = ({
           onClick={onSessionSelect}
         />
       ))}
+      {loadingMore && (
+        <p className="text-center text-xs text-muted-foreground py-2">Loading older sessions...</p>
+      )}
     </div>
   );
 };
@@ -1,22 +1,50 @@
-import { useState, useEffect, useCallback } from 'react';
-import { getHistory, postChat } from '../services/api';
+import { useState, useEffect, useCallback, useRef } from 'react';
+import { getSessionMessages, getSessionsPage, streamChat } from '../services/api';
 import { safeAsync } from '../utils/helpers';
 
 const DEFAULT_USER_ID = parseInt(import.meta.env.VITE_USER_ID || '1', 10);
 
+// Progress stages reported while a research query streams in
+export const PROGRESS_STAGES = {
+  CONNECTING: 0,
+  RETRIEVING: 1,
+  ANALYZING: 2,
+  SUMMARIZING: 3,
+  COMPLETED: 4,
+};
+
+const INITIAL_PROGRESS = {
+  stage: PROGRESS_STAGES.CONNECTING,
+  sources: {},
+  partialSummary: '',
+};
+
 /**
  * Custom hook for managing research sessions and chat functionality
  */
 export const useResearch = () => {
   const [userId, setUserId] = useState(DEFAULT_USER_ID);
   const [history, setHistory] = useState([]);
+  const [historyCursor, setHistoryCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // session_id -> { messages, nextCursor, loading }; filled when a session is opened
+  const [messagesBySession, setMessagesBySession] = useState({});
+  const inflightMessages = useRef(new Set());
   const [selectedSessionId, setSelectedSessionId] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
   const [submitting, setSubmitting] = useState(false);
+  const [progress, setProgress] = useState(INITIAL_PROGRESS);
 
-  // Get selected session from history
-  const selectedSession = history.find(session => session.session_id === selectedSessionId) || null;
+  // Get selected session from history, with whatever of its messages has loaded
+  const selectedSummary = history.find(session => session.session_id === selectedSessionId) || null;
+  const selectedMessages = messagesBySession[selectedSessionId];
+  const selectedSession = selectedSummary && {
+    ...selectedSummary,
+    messages: selectedMessages?.messages || [],
+    hasMoreMessages: Boolean(selectedMessages?.nextCursor),
+    loadingMessages: !selectedMessages || selectedMessages.loading,
+  };
 
   /**
    * Clear any existing error
@@ -26,19 +54,24 @@ export const useResearch = () => {
   }, []);
 
   /**
-   * Fetch user's research history
+   * Fetch the first page of the user's sessions (messages load when a session is opened)
    */
   const refreshHistory = useCallback(async (selectSessionId = null) => {
     setLoading(true);
     clearError();
 
-    const [err, data] = await safeAsync(() => getHistory(userId));
+    const [err, page] = await safeAsync(() => getSessionsPage(userId));
+    const data = page?.sessions;
     
     if (err) {
       setError(err.message);
       setHistory([]);
+      setHistoryCursor(null);
     } else {
       setHistory(data || []);
+      setHistoryCursor(page.nextCursor);
+      // Sessions may have new messages: reload them when next opened
+      setMessagesBySession({});
       
       // Auto-select session logic
       if (selectSessionId) {
@@ -46,7 +79,7 @@ export const useResearch = () => {
       } else if (!selectedSessionId && data?.length > 0) {
         setSelectedSessionId(data[0].session_id);
       } else if (selectedSessionId && !data?.find(s => s.session_id === selectedSessionId)) {
-        // Selected session no longer exists, select first available
+        // Selected session is not on the first page, select first available
         setSelectedSessionId(data?.length > 0 ? data[0].session_id : null);
       }
     }
@@ -54,6 +87,103 @@ export const useResearch = () => {
     setLoading(false);
   }, [userId, selectedSessionId, clearError]);
 
+  /**
+   * Append the next page of older sessions, if there is one
+   */
+  const loadMoreSessions = useCallback(async () => {
+    if (!historyCursor || loadingMore) return;
+    setLoadingMore(true);
+
+    const [err, page] = await safeAsync(() => getSessionsPage(userId, historyCursor));
+
+    if (err) {
+      setError(err.message);
+    } else {
+      setHistory(prev => {
+        const seen = new Set(prev.map(s => s.session_id));
+        return [...prev, ...page.sessions.filter(s => !seen.has(s.session_id))];
+      });
+      setHistoryCursor(page.nextCursor);
+    }
+    setLoadingMore(false);
+  }, [userId, historyCursor, loadingMore]);
+
+  /**
+   * Fetch a page of a session's messages and append it to what is loaded
+   */
+  const loadMessages = useCallback(async (sessionId, cursor = null) => {
+    const key = `${sessionId}:${cursor || ''}`;
+    if (inflightMessages.current.has(key)) return;
+    inflightMessages.current.add(key);
+
+    setMessagesBySession(prev => ({
+      ...prev,
+      [sessionId]: { messages: [], nextCursor: null, ...prev[sessionId], loading: true },
+    }));
+
+    const [err, page] = await safeAsync(() => getSessionMessages(sessionId, cursor));
+    inflightMessages.current.delete(key);
+
+    if (err) {
+      setError(err.message);
+      setMessagesBySession(prev => ({ ...prev, [sessionId]: { ...prev[sessionId], loading: false } }));
+      return;
+    }
+    setMessagesBySession(prev => ({
+      ...prev,
+      [sessionId]: {
+        messages: [...(cursor ? prev[sessionId]?.messages || [] : []), ...page.messages],
+        nextCursor: page.nextCursor,
+        loading: false,
+      },
+    }));
+  }, []);
+
+  /**
+   * Load the next page of the selected session's messages, if there is one
+   */
+  const loadMoreMessages = useCallback(() => {
+    const entry = messagesBySession[selectedSessionId];
+    if (selectedSessionId && entry?.nextCursor && !entry.loading) {
+      loadMessages(selectedSessionId, entry.nextCursor);
+    }
+  }, [selectedSessionId, messagesBySession, loadMessages]);
+
+  // Fetch a session's first page of messages when it is opened
+  useEffect(() => {
+    if (selectedSessionId && !messagesBySession[selectedSessionId]) {
+      loadMessages(selectedSessionId);
+    }
+  }, [selectedSessionId, messagesBySession, loadMessages]);
+
+  /**
+   * Fold one streamed server event into the progress state
+   */
+  const handleStreamEvent = useCallback((event, data) => {
+    setProgress(prev => {
+      switch (event) {
+        case 'session':
+          return { ...prev, stage: PROGRESS_STAGES.RETRIEVING };
+        case 'source':
+          return { ...prev, sources: { ...prev.sources, [data.source]: data } };
+        case 'token':
+          return {
+            ...prev,
+            stage: PROGRESS_STAGES.SUMMARIZING,
+            partialSummary: prev.partialSummary + data.text,
+          };
+        case 'node':
+          if (data.node === 'fetch') return { ...prev, stage: PROGRESS_STAGES.ANALYZING };
+          if (data.node === 'summarize') return { ...prev, stage: PROGRESS_STAGES.SUMMARIZING };
+          return prev;
+        case 'done':
+          return { ...prev, stage: PROGRESS_STAGES.COMPLETED };
+        default:
+          return prev;
+      }
+    });
+  }, []);
+
   /**
    * Submit a new research query
    */
@@ -64,9 +194,10 @@ export const useResearch = () => {
     }
 
     setSubmitting(true);
+    setProgress(INITIAL_PROGRESS);
     clearError();
 
-    const [err, result] = await safeAsync(() => postChat(userId, query));
+    const [err, result] = await safeAsync(() => streamChat(userId, query, handleStreamEvent));
     
     if (err) {
       setError(err.message);
@@ -79,7 +210,7 @@ export const useResearch = () => {
     setSubmitting(false);
     
     return result;
-  }, [userId, refreshHistory, clearError]);
+  }, [userId, refreshHistory, clearError, handleStreamEvent]);
 
   /**
    * Select a different session
@@ -96,6 +227,8 @@ export const useResearch = () => {
     if (newUserId !== userId) {
       setUserId(newUserId);
       setHistory([]);
+      setHistoryCursor(null);
+      setMessagesBySession({});
       setSelectedSessionId(null);
       clearError();
     }
@@ -110,14 +243,19 @@ export const useResearch = () => {
     // State
     userId,
     history,
+    hasMoreHistory: Boolean(historyCursor),
+    loadingMore,
     selectedSession,
     selectedSessionId,
     loading,
     error,
     submitting,
+    progress,
     
     // Actions
     refreshHistory,
+    loadMoreSessions,
+    loadMoreMessages,
     submitQuery,
     selectSession,
     updateUserId,
@@ -62,16 +62,45 @@ api.interceptors.response.use(
 );
 
 /**
- * Fetch user's research history
+ * Fetch one page of a user's research sessions, newest first, without messages
  * @param {number} userId - User ID
- * @returns {Promise<Array>} Array of session objects
+ * @param {string|null} [cursor] - Cursor returned with the previous page
+ * @param {number} [limit] - Sessions per page (server maximum is 200)
+ * @returns {Promise<{sessions: Array, nextCursor: string|null}>}
  */
-export const getHistory = async (userId) => {
+export const getSessionsPage = async (userId, cursor = null, limit = 50) => {
   try {
-    const response = await api.get(`/api/history/${userId}`);
-    return response.data || [];
+    const response = await api.get(`/api/history/${userId}/sessions`, {
+      params: cursor ? { limit, cursor } : { limit },
+    });
+    return {
+      sessions: response.data?.sessions || [],
+      nextCursor: response.data?.next_cursor || null,
+    };
   } catch (error) {
-    console.error('Failed to fetch history:', error.message);
+    console.error('Failed to fetch sessions:', error.message);
+    throw error;
+  }
+};
+
+/**
+ * Fetch one page of a session's messages, oldest first
+ * @param {number} sessionId - Session ID
+ * @param {string|null} [cursor] - Cursor returned with the previous page
+ * @param {number} [limit] - Messages per page (server maximum is 200)
+ * @returns {Promise<{messages: Array, nextCursor: string|null}>}
+ */
+export const getSessionMessages = async (sessionId, cursor = null, limit = 50) => {
+  try {
+    const response = await api.get(`/api/sessions/${sessionId}/messages`, {
+      params: cursor ? { limit, cursor } : { limit },
+    });
+    return {
+      messages: response.data?.messages || [],
+      nextCursor: response.data?.next_cursor || null,
+    };
+  } catch (error) {
+    console.error('Failed to fetch messages:', error.message);
     throw error;
   }
 };
@@ -104,6 +133,89 @@ export const postChat = async (userId, query) => {
   }
 };
 
+/**
+ * Submit a research query and stream progress over Server-Sent Events
+ * @param {number} userId - User ID
+ * @param {string} query - Research query
+ * @param {Function} onEvent - Called with (eventName, data) for each event
+ * @param {AbortSignal} [signal] - Optional abort signal
+ * @returns {Promise<Object>} Final response object (same shape as postChat)
+ */
+export const streamChat = async (userId, query, onEvent, signal) => {
+  if (!query?.trim()) {
+    throw new Error('Please enter a research query.');
+  }
+
+  if (query.length > 1000) {
+    throw new Error('Query is too long. Please limit to 1000 characters.');
+  }
+
+  let response;
+  try {
+    response = await fetch(`${api.defaults.baseURL}/api/chat/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+      body: JSON.stringify({ user_id: userId, query: query.trim() }),
+      signal,
+    });
+  } catch (error) {
+    console.error('Failed to open chat stream:', error.message);
+    throw new Error('Cannot connect to server. Please check if the server is running.');
+  }
+
+  if (!response.ok || !response.body) {
+    let message = 'Server error occurred';
+    try {
+      const data = await response.json();
+      message = data?.detail || message;
+    } catch {
+      // Non-JSON error body
+    }
+    throw new Error(`${message} (${response.status})`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let result = null;
+
+  const handleBlock = (block) => {
+    let event = 'message';
+    const dataLines = [];
+    for (const line of block.split('\n')) {
+      if (line.startsWith('event:')) event = line.slice(6).trim();
+      else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+    }
+    if (!dataLines.length) return;
+
+    const data = JSON.parse(dataLines.join('\n'));
+    if (event === 'error') {
+      throw new Error(data.detail || 'Research processing failed');
+    }
+    if (event === 'done') {
+      result = data;
+    }
+    onEvent?.(event, data);
+  };
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      handleBlock(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+    }
+  }
+
+  if (!result) {
+    throw new Error('Research stream ended unexpectedly.');
+  }
+  return result;
+};
+
 /**
  * Health check endpoint
  * @returns {Promise<Object>} Server status